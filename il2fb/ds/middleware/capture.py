@@ -0,0 +1,115 @@
+# coding: utf-8
+
+import struct
+import time
+
+from typing import Any, Iterator
+
+from il2fb.commons.structures import BaseStructure
+
+from il2fb.ds.middleware.exceptions import DSMiddlewareException
+
+
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct('<8sH6x')
+
+
+class CapturedRecord(BaseStructure):
+    __slots__ = ['timestamp', 'direction', 'data', ]
+
+    def __init__(self, timestamp: float, direction: Any, data: bytes):
+        self.timestamp = timestamp
+        self.direction = direction
+        self.data = data
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} "
+            f"({self.direction.name}, {self.timestamp:.6f}, "
+            f"{len(self.data)} bytes)>"
+        )
+
+
+class Capture:
+    """
+    Base of writers of raw data exchanged with a server to a binary file.
+
+    A file starts with ``magic`` and version, followed by records: each one
+    is a ``record_header`` of monotonic time, code of direction and size,
+    followed by data. Subclasses define ``magic`` (8 bytes),
+    ``record_header``, ``directions`` (constants with integer values) and
+    ``error_class``.
+
+    Not thread-safe.
+
+    """
+    magic = None
+    record_header = None
+    directions = None
+    error_class = DSMiddlewareException
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(FILE_HEADER.pack(self.magic, FILE_VERSION))
+
+    def __enter__(self) -> 'Capture':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def write(self, direction: Any, data: bytes) -> None:
+        self._file.write(self.record_header.pack(
+            time.monotonic(), direction.value, len(data),
+        ))
+        self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    @classmethod
+    def read(cls, path: str) -> Iterator[CapturedRecord]:
+        directions = {
+            direction.value: direction
+            for direction in cls.directions.iterconstants()
+        }
+        record_header = cls.record_header
+
+        with open(path, 'rb') as f:
+            header = f.read(FILE_HEADER.size)
+
+            if len(header) < FILE_HEADER.size:
+                raise cls.error_class(f"file '{path}' is not a capture")
+
+            magic, version = FILE_HEADER.unpack(header)
+
+            if magic != cls.magic:
+                raise cls.error_class(f"file '{path}' is not a capture")
+
+            if version != FILE_VERSION:
+                raise cls.error_class(
+                    f"unsupported capture version {version}"
+                )
+
+            while True:
+                header = f.read(record_header.size)
+
+                if len(header) < record_header.size:
+                    # the last record is being written
+                    break
+
+                timestamp, direction, size = record_header.unpack(header)
+                data = f.read(size)
+
+                if len(data) < size:
+                    break
+
+                yield CapturedRecord(
+                    timestamp=timestamp,
+                    direction=directions[direction],
+                    data=data,
+                )
@@ -0,0 +1,82 @@
+# coding: utf-8
+
+import asyncio
+import struct
+
+from typing import Iterable, Iterator, List, Tuple
+
+from il2fb.ds.middleware.capture import Capture, CapturedRecord
+from il2fb.ds.middleware.console.constants import ChunkDirections
+from il2fb.ds.middleware.console.exceptions import ConsoleError
+
+
+class ConsoleCapture(Capture):
+    """
+    Write raw data exchanged by a console client to a binary file.
+
+    Inbound data is written as chunks received from the transport, so
+    boundaries of TCP reads are kept. Each chunk is prefixed with a 16-byte
+    header: monotonic time, direction and size.
+
+    Not thread-safe.
+
+    """
+    magic = b'IL2FBCSC'
+    record_header = struct.Struct('<dB3xI')
+    directions = ChunkDirections
+    error_class = ConsoleError
+
+
+def read_capture(path: str) -> Iterator[CapturedRecord]:
+    return ConsoleCapture.read(path)
+
+
+def load_inbound_chunks(path: str) -> List[bytes]:
+    return [
+        chunk.data
+        for chunk in read_capture(path)
+        if chunk.direction == ChunkDirections.inbound
+    ]
+
+
+class ReplayTransport(asyncio.Transport):
+    """
+    Transport of a replayed connection. Written data is discarded.
+
+    """
+
+    def __init__(self, peername: Tuple[str, int]=('127.0.0.1', 20000)):
+        super().__init__(extra={'peername': peername})
+        self._is_closing = False
+
+    def write(self, data: bytes) -> None:
+        pass
+
+    def is_closing(self) -> bool:
+        return self._is_closing
+
+    def close(self) -> None:
+        self._is_closing = True
+
+
+def replay_chunks(client: asyncio.Protocol, chunks: Iterable[bytes]) -> int:
+    """
+    Feed chunks into ``data_received`` of a client at full speed. The client
+    must be connected, e.g. to ``ReplayTransport``. Returns number of chunks.
+
+    Usage::
+
+        chunks = load_inbound_chunks('busy-night.csc')
+        client = ConsoleClient()
+        client.connection_made(ReplayTransport())
+        replay_chunks(client, chunks)
+
+    """
+    data_received = client.data_received
+    count = 0
+
+    for chunk in chunks:
+        data_received(chunk)
+        count += 1
+
+    return count
@@ -13,7 +13,9 @@ from il2fb.ds.middleware.console import events
 from il2fb.ds.middleware.console import requests
 from il2fb.ds.middleware.console import structures
 
+from il2fb.ds.middleware.console.capture import ConsoleCapture
 from il2fb.ds.middleware.console.constants import CHAT_MESSAGE_MAX_LENGTH
+from il2fb.ds.middleware.console.constants import ChunkDirections
 from il2fb.ds.middleware.console.constants import LINE_DELIMITER
 from il2fb.ds.middleware.console.constants import LINE_DELIMITER_LENGTH
 from il2fb.ds.middleware.console.constants import MESSAGE_DELIMITER
@@ -26,14 +28,21 @@ LOG = logging.getLogger(__name__)
 
 
 class ConsoleClient(asyncio.Protocol):
+    """
+    If ``capture`` is given, raw data exchanged with the server is written
+    to it, so it can be replayed later (see ``capture.replay_chunks``).
+
+    """
 
     def __init__(
         self,
         trace: bool=False,
         loop: asyncio.AbstractEventLoop=None,
+        capture: Optional[ConsoleCapture]=None,
     ):
         self._loop = loop
         self._trace = trace
+        self._capture = capture
 
         self._requests = asyncio.Queue(loop=self._loop)
         self._request = None
@@ -213,6 +222,9 @@ class ConsoleClient(asyncio.Protocol):
     def write_bytes(self, data: bytes) -> None:
         self._transport.write(data)
 
+        if self._capture is not None:
+            self._capture.write(ChunkDirections.outbound, data)
+
         if self._trace:
             LOG.debug(self._prefix_log_message(
                 f"dat --> {repr(data)}"
@@ -268,6 +280,9 @@ class ConsoleClient(asyncio.Protocol):
         raise StopAsyncIteration
 
     def data_received(self, data: bytes) -> None:
+        if self._capture is not None:
+            self._capture.write(ChunkDirections.inbound, data)
+
         if self._trace:
             LOG.debug(self._prefix_log_message(
                 f"dat <-- {repr(data)}"
@@ -1,5 +1,8 @@
 # coding: utf-8
 
+from candv import Values, ValueConstant, with_constant_class
+
+
 MESSAGE_DELIMITER = '\r\n'
 
 LINE_DELIMITER = '\\n'
@@ -16,3 +19,12 @@ KNOWN_COMMANDS = [
 CHAT_SENDER_SERVER = 'Server'
 CHAT_SENDER_SYSTEM = '---'
 CHAT_MESSAGE_MAX_LENGTH = 80
+
+
+class ChunkDirection(ValueConstant):
+    pass
+
+
+class ChunkDirections(with_constant_class(ChunkDirection), Values):
+    outbound = ChunkDirection(0)
+    inbound = ChunkDirection(1)
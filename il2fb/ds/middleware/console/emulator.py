@@ -0,0 +1,555 @@
+# coding: utf-8
+
+import asyncio
+import itertools
+import logging
+import re
+
+from collections import OrderedDict
+from typing import Awaitable, Iterable, Iterator, List, Optional
+
+from il2fb.commons.organization import Belligerent, Belligerents
+from il2fb.commons.structures import BaseStructure
+
+from il2fb.ds.middleware.console import structures
+from il2fb.ds.middleware.console.constants import CHAT_SENDER_SERVER
+from il2fb.ds.middleware.console.constants import LINE_DELIMITER
+from il2fb.ds.middleware.console.constants import MESSAGE_DELIMITER
+
+
+LOG = logging.getLogger(__name__)
+
+
+USERS_HEADER = " N       Name           Ping    Score   Army        Aircraft"
+
+STATISTICS_SEPARATOR = '-' * 55
+STATISTICS_LABELS = [
+    "Name", "Score", "State",
+    "Enemy Aircraft Kill", "Enemy Static Aircraft Kill", "Enemy Tank Kill",
+    "Enemy Car Kill", "Enemy Artillery Kill", "Enemy AAA Kill",
+    "Enemy Wagon Kill", "Enemy Ship Kill", "Enemy Radio Kill",
+    "Friend Aircraft Kill", "Friend Static Aircraft Kill",
+    "Friend Tank Kill", "Friend Car Kill", "Friend Artillery Kill",
+    "Friend AAA Kill", "Friend Wagon Kill", "Friend Ship Kill",
+    "Friend Radio Kill",
+    "Fire Bullets", "Hit Bullets", "Hit Air Bullets",
+    "Fire Roskets", "Hit Roskets",
+    "Fire Bombs", "Hit Bombs",
+]
+
+CHAT_COMMAND_REGEX = re.compile(r"^chat (?P<body>.*) (ALL|TO .+|ARMY \d+)$")
+
+
+def format_message(s: str) -> str:
+    return f"{s}{LINE_DELIMITER}{MESSAGE_DELIMITER}"
+
+
+def format_command_prompt(number: int) -> str:
+    return f"<consoleN><{number}>{MESSAGE_DELIMITER}"
+
+
+class EmulatedHuman(BaseStructure):
+    __slots__ = [
+        'callsign', 'channel', 'ip', 'port', 'ping', 'score', 'belligerent',
+        'aircraft',
+    ]
+
+    def __init__(
+        self,
+        callsign: str,
+        channel: int,
+        ip: str='127.0.0.1',
+        port: int=21000,
+        ping: int=0,
+        score: int=0,
+        belligerent: Belligerent=Belligerents.red,
+        aircraft: Optional[structures.Aircraft]=None,
+    ):
+        self.callsign = callsign
+        self.channel = channel
+        self.ip = ip
+        self.port = port
+        self.ping = ping
+        self.score = score
+        self.belligerent = belligerent
+        self.aircraft = aircraft
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} "
+            f"(callsign='{self.callsign}', channel={self.channel})>"
+        )
+
+
+class ConsoleEmulator:
+    """
+    Local stand-in of console of a server for load and latency testing.
+
+    Commands ``server``, ``user``, ``user STAT``, ``mission`` (including
+    ``LOAD``, ``BEGIN``, ``END`` and ``DESTROY``), ``kick``, ``kick#`` and
+    ``chat`` are answered by lines escaped as by DS and followed by a
+    command prompt. Commands of a connection are executed in order, each
+    after ``latency`` seconds.
+
+    Output is written in chunks of whole messages of up to ``chunk_size``
+    bytes with pauses of ``chunk_delay`` seconds, or at once if
+    ``chunk_size`` is not set. Messages are not split, as DS writes them
+    whole and framing of ``ConsoleClient`` relies on that.
+
+    Events of humans and chat are written to all connections, either as
+    side effects of commands or as floods (see ``emit_chat_flood`` and
+    ``emit_connection_flood``).
+
+    Usage::
+
+        emulator = ConsoleEmulator(humans_count=100, latency=0.01)
+        server = await loop.create_server(
+            emulator.make_protocol, '127.0.0.1', 20000,
+        )
+
+    Not thread-safe.
+
+    """
+
+    def __init__(
+        self,
+        humans_count: int=0,
+        latency: float=0.0,
+        chunk_size: Optional[int]=None,
+        chunk_delay: float=0.0,
+        server_name: str="Server",
+        server_description: str="",
+        loop: asyncio.AbstractEventLoop=None,
+    ):
+        self._loop = loop
+
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.server_name = server_name
+        self.server_description = server_description
+
+        self.mission_file_path = None
+        self.mission_is_playing = False
+
+        self._humans = OrderedDict()
+        self._channels = itertools.count(1)
+        self._callsign_numbers = itertools.count()
+        self._connections = set()
+
+        for i in range(humans_count):
+            self.add_human(emit=False)
+
+    @property
+    def humans(self) -> List[EmulatedHuman]:
+        return list(self._humans.values())
+
+    @property
+    def connections_count(self) -> int:
+        return len(self._connections)
+
+    def make_protocol(self) -> asyncio.Protocol:
+        return _ConsoleEmulatorProtocol(self, loop=self._loop)
+
+    def add_human(
+        self,
+        callsign: Optional[str]=None,
+        emit: bool=True,
+        **kwargs
+    ) -> EmulatedHuman:
+        """
+        Connect a human. Extra keyword arguments are passed to
+        ``EmulatedHuman``.
+
+        """
+        lines = []
+        human = self._add_human(callsign, lines, **kwargs)
+
+        if emit:
+            self._broadcast(lines)
+
+        return human
+
+    def _add_human(
+        self,
+        callsign: Optional[str],
+        lines: List[str],
+        **kwargs
+    ) -> EmulatedHuman:
+
+        if callsign is None:
+            callsign = f"User{next(self._callsign_numbers)}"
+
+        channel = next(self._channels)
+        kwargs.setdefault('port', 21000 + channel % 10000)
+
+        human = EmulatedHuman(callsign=callsign, channel=channel, **kwargs)
+        self._humans[callsign] = human
+
+        lines.append(
+            f"socket channel '{channel}' start creating: "
+            f"{human.ip}:{human.port}"
+        )
+        lines.append(
+            f"socket channel '{channel}', ip {human.ip}:{human.port}, "
+            f"{callsign}, is complete created"
+        )
+        return human
+
+    def remove_human(
+        self,
+        callsign: str,
+        reason: str="",
+        emit: bool=True,
+    ) -> Optional[EmulatedHuman]:
+
+        lines = []
+        human = self._remove_human(callsign, reason, lines)
+
+        if emit:
+            self._broadcast(lines)
+
+        return human
+
+    def _remove_human(
+        self,
+        callsign: str,
+        reason: str,
+        lines: List[str],
+    ) -> Optional[EmulatedHuman]:
+
+        human = self._humans.pop(callsign, None)
+
+        if human is not None:
+            lines.append(
+                f"socketConnection with {human.ip}:{human.port} on channel "
+                f"{human.channel} lost.  Reason: {reason}"
+            )
+
+        return human
+
+    def _broadcast(self, lines: Iterable[str]) -> None:
+        messages = [format_message(line) for line in lines]
+
+        if messages:
+            for connection in self._connections:
+                connection.write_messages(messages)
+
+    async def emit_lines(
+        self,
+        lines: Iterable[str],
+        batch_size: int=100,
+        interval: float=0.0,
+    ) -> int:
+        """
+        Write arbitrary lines to all connections in batches with pauses of
+        ``interval`` seconds. Returns number of lines.
+
+        """
+        count = 0
+        lines = iter(lines)
+
+        while True:
+            batch = list(itertools.islice(lines, batch_size))
+
+            if not batch:
+                break
+
+            self._broadcast(batch)
+            count += len(batch)
+
+            await asyncio.sleep(interval, loop=self._loop)
+
+        return count
+
+    def emit_chat_flood(
+        self,
+        count: int,
+        sender: str=CHAT_SENDER_SERVER,
+        body: str="message",
+        batch_size: int=100,
+        interval: float=0.0,
+    ) -> Awaitable[int]:
+
+        lines = (
+            f"Chat: {sender}: \\t{body} {i}"
+            for i in range(count)
+        )
+        return self.emit_lines(lines, batch_size, interval)
+
+    def emit_connection_flood(
+        self,
+        count: int,
+        disconnect: bool=True,
+        batch_size: int=100,
+        interval: float=0.0,
+    ) -> Awaitable[int]:
+        """
+        Connect ``count`` new humans and disconnect them afterwards unless
+        ``disconnect`` is false.
+
+        """
+        return self.emit_lines(
+            self._iter_connection_flood_lines(count, disconnect),
+            batch_size,
+            interval,
+        )
+
+    def _iter_connection_flood_lines(
+        self,
+        count: int,
+        disconnect: bool,
+    ) -> Iterator[str]:
+
+        lines = []
+        callsigns = []
+
+        for i in range(count):
+            callsigns.append(self._add_human(None, lines).callsign)
+            yield from lines
+            lines.clear()
+
+        if not disconnect:
+            return
+
+        for callsign in callsigns:
+            self._remove_human(callsign, "", lines)
+            yield from lines
+            lines.clear()
+
+    def execute(self, command: str) -> List[str]:
+        """
+        Execute a command and get lines of its output.
+
+        """
+        if not command:
+            return []
+
+        name, _, args = command.partition(' ')
+        handler = {
+            'server': self._on_server,
+            'user': self._on_user,
+            'mission': self._on_mission,
+            'kick': self._on_kick,
+            'kick#': self._on_kick_by_number,
+            'chat': self._on_chat,
+        }.get(name)
+
+        if handler is None:
+            return [f"Command not found: {command}"]
+
+        return handler(command, args)
+
+    def _on_server(self, command: str, args: str) -> List[str]:
+        return [
+            "Type: Local server",
+            f"Name: {self.server_name}",
+            f"Description: {self.server_description}",
+        ]
+
+    def _on_user(self, command: str, args: str) -> List[str]:
+        if args == 'STAT':
+            return self._get_statistics_lines()
+
+        lines = [USERS_HEADER]
+
+        for i, human in enumerate(self._humans.values(), start=1):
+            belligerent = human.belligerent
+            line = (
+                f" {i:<6} {human.callsign:<14}  {human.ping:<6}  "
+                f"{human.score:<6}  "
+                f"({belligerent.value}){belligerent.name.title():<9}"
+            )
+
+            if human.aircraft:
+                line += (
+                    f"  {human.aircraft.designation}  {human.aircraft.type}"
+                )
+
+            lines.append(line)
+
+        return lines
+
+    def _get_statistics_lines(self) -> List[str]:
+        lines = [STATISTICS_SEPARATOR]
+
+        for human in self._humans.values():
+            state = "In Flight" if human.aircraft else "IDLE"
+            values = [human.callsign, human.score, state]
+            values.extend([0] * (len(STATISTICS_LABELS) - len(values)))
+
+            lines.extend(
+                f"{label}: \\t\\t{value}"
+                for label, value in zip(STATISTICS_LABELS, values)
+            )
+            lines.append(STATISTICS_SEPARATOR)
+
+        return lines
+
+    def _on_mission(self, command: str, args: str) -> List[str]:
+        action, _, file_path = args.partition(' ')
+
+        if not action:
+            if self.mission_file_path is None:
+                return ["Mission NOT loaded"]
+
+            status = "Playing" if self.mission_is_playing else "Loaded"
+            return [f"Mission: {self.mission_file_path} is {status}"]
+
+        if action == 'LOAD':
+            self.mission_file_path = file_path
+            self.mission_is_playing = False
+            return [
+                f"Loading mission {file_path}...",
+                f"Mission: {file_path} is Loaded",
+            ]
+
+        if self.mission_file_path is None:
+            return ["ERROR mission: Mission NOT loaded"]
+
+        if action == 'BEGIN':
+            self.mission_is_playing = True
+            return [f"Mission: {self.mission_file_path} is Playing"]
+
+        if action == 'END':
+            self.mission_is_playing = False
+            return []
+
+        if action == 'DESTROY':
+            self.mission_file_path = None
+            self.mission_is_playing = False
+            return []
+
+        return [f"Command not found: {command}"]
+
+    def _on_kick(self, command: str, args: str) -> List[str]:
+        self.remove_human(args, reason="You have been kicked from the server.")
+        return []
+
+    def _on_kick_by_number(self, command: str, args: str) -> List[str]:
+        try:
+            i = int(args) - 1
+        except ValueError:
+            return []
+
+        if 0 <= i < len(self._humans):
+            callsign = list(self._humans)[i]
+            self._on_kick(command, callsign)
+
+        return []
+
+    def _on_chat(self, command: str, args: str) -> List[str]:
+        match = CHAT_COMMAND_REGEX.match(command)
+
+        if match:
+            body = match.group('body')
+            self._broadcast([f"Chat: {CHAT_SENDER_SERVER}: \\t{body}"])
+
+        return []
+
+    def iter_chunks(self, messages: List[str]) -> Iterator[bytes]:
+        if not self.chunk_size:
+            yield ''.join(messages).encode()
+            return
+
+        chunk = []
+        size = 0
+
+        for message in messages:
+            data = message.encode()
+
+            if chunk and size + len(data) > self.chunk_size:
+                yield b''.join(chunk)
+                chunk = []
+                size = 0
+
+            chunk.append(data)
+            size += len(data)
+
+        if chunk:
+            yield b''.join(chunk)
+
+    def close(self) -> None:
+        for connection in list(self._connections):
+            connection.close()
+
+
+class _ConsoleEmulatorProtocol(asyncio.Protocol):
+
+    def __init__(
+        self,
+        emulator: ConsoleEmulator,
+        loop: asyncio.AbstractEventLoop=None,
+    ):
+        self._emulator = emulator
+        self._loop = loop
+
+        self._transport = None
+        self._buffer = ''
+        self._commands = asyncio.Queue(loop=self._loop)
+        self._output = asyncio.Queue(loop=self._loop)
+        self._prompt_number = 0
+        self._tasks = []
+
+    def connection_made(self, transport) -> None:
+        self._transport = transport
+        self._emulator._connections.add(self)
+        self._tasks = [
+            asyncio.ensure_future(self._execute_commands(), loop=self._loop),
+            asyncio.ensure_future(self._write_output(), loop=self._loop),
+        ]
+
+    def data_received(self, data: bytes) -> None:
+        *commands, self._buffer = (self._buffer + data.decode()).split('\n')
+
+        for command in commands:
+            self._commands.put_nowait(command.strip())
+
+    def write_messages(self, messages: List[str]) -> None:
+        self._output.put_nowait(messages)
+
+    async def _execute_commands(self) -> None:
+        emulator = self._emulator
+
+        while True:
+            command = await self._commands.get()
+
+            if emulator.latency:
+                await asyncio.sleep(emulator.latency, loop=self._loop)
+
+            try:
+                lines = emulator.execute(command)
+            except Exception:
+                LOG.exception(f"failed to execute command {repr(command)}")
+                lines = []
+
+            self._prompt_number += 1
+
+            messages = [format_message(line) for line in lines]
+            messages.append(format_command_prompt(self._prompt_number))
+            self.write_messages(messages)
+
+    async def _write_output(self) -> None:
+        emulator = self._emulator
+
+        while True:
+            messages = await self._output.get()
+
+            for chunk in emulator.iter_chunks(messages):
+                if self._transport.is_closing():
+                    return
+
+                self._transport.write(chunk)
+
+                if emulator.chunk_delay:
+                    await asyncio.sleep(emulator.chunk_delay, loop=self._loop)
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+    def connection_lost(self, e: Exception=None) -> None:
+        self._emulator._connections.discard(self)
+
+        for task in self._tasks:
+            task.cancel()
@@ -0,0 +1,271 @@
+# coding: utf-8
+
+import math
+
+from typing import Any, Iterable, List, Optional, Tuple
+
+from il2fb.commons.spatial import Point3D
+from il2fb.commons.structures import BaseStructure
+
+from .constants import ActorCategories, PositionsFormats
+from .snapshots import ActorPositionItem, get_actor_coordinates
+
+
+class GroundColumn(BaseStructure):
+    """
+    Aggregated position of members of a ground units column.
+
+    ``heading`` is the direction from the rearmost member to the lead member
+    in degrees clockwise from the Y axis, or ``None`` if the column has a
+    single member. ``lead_index`` is the Device Link index of the lead
+    member, i.e. the member with the lowest member index.
+
+    """
+    __slots__ = [
+        'id',
+        'count',
+        'centroid',
+        'bbox',
+        'heading',
+        'lead_member_index',
+        'lead_index',
+        'lead_pos',
+    ]
+
+    def __init__(
+        self,
+        id: str,
+        count: int,
+        centroid: Point3D,
+        bbox: Tuple[float, float, float, float],
+        heading: Optional[float],
+        lead_member_index: int,
+        lead_index: int,
+        lead_pos: Point3D,
+    ):
+        self.id = id
+        self.count = count
+        self.centroid = centroid
+        self.bbox = bbox
+        self.heading = heading
+        self.lead_member_index = lead_member_index
+        self.lead_index = lead_index
+        self.lead_pos = lead_pos
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} "
+            f"(id='{self.id}', count={self.count})>"
+        )
+
+
+def get_heading(dx: float, dy: float) -> Optional[float]:
+    if not dx and not dy:
+        return None
+
+    return math.degrees(math.atan2(dx, dy)) % 360
+
+
+# accumulator fields
+(
+    _COUNT, _SUM_X, _SUM_Y, _SUM_Z, _MIN_X, _MIN_Y, _MAX_X, _MAX_Y,
+    _LEAD_MEMBER, _LEAD_INDEX, _LEAD_POS, _TAIL_MEMBER, _TAIL_POS,
+) = range(13)
+
+
+def aggregate_ground_columns(
+    items: Iterable[ActorPositionItem],
+) -> List[GroundColumn]:
+    """
+    Group positions of moving ground units by IDs of their columns in a
+    single pass. Accepts structures, records or columns.
+
+    """
+    accumulators = {}
+
+    for item in items:
+        x, y, z = get_actor_coordinates(item)
+        member_index = item.member_index
+        acc = accumulators.get(item.id)
+
+        if acc is None:
+            accumulators[item.id] = [
+                1, x, y, z, x, y, x, y,
+                member_index, item.index, (x, y, z),
+                member_index, (x, y, z),
+            ]
+            continue
+
+        acc[_COUNT] += 1
+        acc[_SUM_X] += x
+        acc[_SUM_Y] += y
+        acc[_SUM_Z] += z
+
+        if x < acc[_MIN_X]:
+            acc[_MIN_X] = x
+        elif x > acc[_MAX_X]:
+            acc[_MAX_X] = x
+
+        if y < acc[_MIN_Y]:
+            acc[_MIN_Y] = y
+        elif y > acc[_MAX_Y]:
+            acc[_MAX_Y] = y
+
+        if member_index < acc[_LEAD_MEMBER]:
+            acc[_LEAD_MEMBER] = member_index
+            acc[_LEAD_INDEX] = item.index
+            acc[_LEAD_POS] = (x, y, z)
+        elif member_index > acc[_TAIL_MEMBER]:
+            acc[_TAIL_MEMBER] = member_index
+            acc[_TAIL_POS] = (x, y, z)
+
+    return [
+        _make_column(id, acc)
+        for id, acc in accumulators.items()
+    ]
+
+
+def _make_column(id: str, acc: list) -> GroundColumn:
+    count = acc[_COUNT]
+    lead_x, lead_y, lead_z = acc[_LEAD_POS]
+    tail_x, tail_y, tail_z = acc[_TAIL_POS]
+
+    return GroundColumn(
+        id=id,
+        count=count,
+        centroid=Point3D(
+            acc[_SUM_X] / count,
+            acc[_SUM_Y] / count,
+            acc[_SUM_Z] / count,
+        ),
+        bbox=(acc[_MIN_X], acc[_MIN_Y], acc[_MAX_X], acc[_MAX_Y]),
+        heading=get_heading(lead_x - tail_x, lead_y - tail_y),
+        lead_member_index=acc[_LEAD_MEMBER],
+        lead_index=acc[_LEAD_INDEX],
+        lead_pos=Point3D(lead_x, lead_y, lead_z),
+    )
+
+
+class GroundColumnsAggregator:
+    """
+    Keep aggregated ground columns between full and lead-only polls.
+
+    Full polls aggregate all members. Lead-only polls request positions of
+    lead members only (see ``lead_indices``) and shift known columns by
+    displacements of their leads. Positions of rear members are unknown
+    then, so headings given by the last full poll are kept. If a lead is
+    not found at its index anymore, ``needs_full_update`` is set.
+
+    Not thread-safe.
+
+    """
+
+    def __init__(self):
+        self._columns = {}
+        self.needs_full_update = True
+
+    @property
+    def columns(self) -> List[GroundColumn]:
+        return list(self._columns.values())
+
+    @property
+    def lead_indices(self) -> List[int]:
+        return sorted(column.lead_index for column in self._columns.values())
+
+    def update(self, items: Iterable[ActorPositionItem]) -> List[GroundColumn]:
+        columns = aggregate_ground_columns(items)
+        self._columns = {column.id: column for column in columns}
+        self.needs_full_update = False
+        return columns
+
+    def update_leads(
+        self,
+        items: Iterable[ActorPositionItem],
+    ) -> List[GroundColumn]:
+
+        by_index = {
+            column.lead_index: column
+            for column in self._columns.values()
+        }
+        updated = {}
+
+        for item in items:
+            column = by_index.get(item.index)
+
+            if (
+                column is None
+                or column.id != item.id
+                or column.lead_member_index != item.member_index
+            ):
+                self.needs_full_update = True
+                continue
+
+            updated[column.id] = self._shift(column, item)
+
+        if len(updated) != len(self._columns):
+            self.needs_full_update = True
+
+        self._columns.update(updated)
+        return self.columns
+
+    @staticmethod
+    def _shift(
+        column: GroundColumn,
+        item: ActorPositionItem,
+    ) -> GroundColumn:
+
+        x, y, z = get_actor_coordinates(item)
+        dx = x - column.lead_pos.x
+        dy = y - column.lead_pos.y
+        dz = z - column.lead_pos.z
+        min_x, min_y, max_x, max_y = column.bbox
+
+        return GroundColumn(
+            id=column.id,
+            count=column.count,
+            centroid=Point3D(
+                column.centroid.x + dx,
+                column.centroid.y + dy,
+                column.centroid.z + dz,
+            ),
+            bbox=(min_x + dx, min_y + dy, max_x + dx, max_y + dy),
+            # a column is shifted as a whole, so the bearing from its rear
+            # member to its lead does not change
+            heading=column.heading,
+            lead_member_index=column.lead_member_index,
+            lead_index=column.lead_index,
+            lead_pos=Point3D(x, y, z),
+        )
+
+    async def refresh(
+        self,
+        client: Any,
+        timeout: Optional[float]=None,
+        leads_only: bool=False,
+    ) -> List[GroundColumn]:
+        """
+        Poll positions of ground units via a Device Link client. Lead-only
+        poll falls back to the full one if it is needed.
+
+        """
+        if leads_only and not self.needs_full_update and self._columns:
+            items = await client.get_positions(
+                ActorCategories.moving_ground_units,
+                indices=self.lead_indices,
+                timeout=timeout,
+                result_format=PositionsFormats.records,
+            )
+            columns = self.update_leads(items)
+
+            if not self.needs_full_update:
+                return columns
+
+        items = await client.get_all_moving_ground_units_positions(
+            timeout=timeout,
+            result_format=PositionsFormats.records,
+        )
+        return self.update(items)
+
+    def reset(self) -> None:
+        self._columns = {}
+        self.needs_full_update = True
@@ -0,0 +1,282 @@
+# coding: utf-8
+
+import logging
+import math
+import sys
+
+from array import array
+from typing import Any, Awaitable, Iterable, List, Optional
+
+from il2fb.commons.spatial import Point2D, Point3D
+
+from . import structures
+from .constants import HOUSE_STATUS_ALIVE, HOUSE_STATUS_DEAD
+from .constants import HOUSE_STATUS_UNKNOWN
+from .constants import HouseStatuses
+from .constants import PositionsFormats
+from .snapshots import ActorPositionItem, get_actor_coordinates
+
+
+LOG = logging.getLogger(__name__)
+
+
+class StaticGeometry:
+    """
+    IDs and coordinates of actors which do not move, stored in compact arrays
+    indexed by Device Link index.
+
+    """
+    __slots__ = ['ids', 'x', 'y', 'z', ]
+
+    def __init__(
+        self,
+        items: Iterable[ActorPositionItem],
+        count: int,
+        has_z: bool,
+    ):
+        nan = math.nan
+
+        self.ids = [None] * count
+        self.x = array('d', [nan]) * count
+        self.y = array('d', [nan]) * count
+        self.z = (array('d', [nan]) * count) if has_z else None
+
+        for item in items:
+            index = item.index
+            coordinates = get_actor_coordinates(item)
+
+            self.ids[index] = sys.intern(item.id)
+            self.x[index] = coordinates[0]
+            self.y[index] = coordinates[1]
+
+            if has_z:
+                self.z[index] = coordinates[2]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def has(self, index: int) -> bool:
+        return 0 <= index < len(self.ids) and self.ids[index] is not None
+
+    def get_pos(self, index: int) -> Any:
+        if self.z is None:
+            return Point2D(self.x[index], self.y[index])
+
+        return Point3D(self.x[index], self.y[index], self.z[index])
+
+
+class MissionObjectsCache:
+    """
+    Mission-scoped cache of houses and stationary objects.
+
+    Geometry is downloaded once. Later refreshes of houses only extract their
+    statuses and report newly destroyed houses. Everything is reloaded if the
+    number of objects changes or if another mission is set.
+
+    Not thread-safe.
+
+    """
+
+    def __init__(self, mission: Optional[Any]=None):
+        self._mission = mission
+        self._houses = None
+        self._houses_statuses = bytearray()
+        self._stationary_objects = None
+
+    @property
+    def mission(self) -> Optional[Any]:
+        return self._mission
+
+    def set_mission(self, mission: Optional[Any]) -> None:
+        """
+        Set identifier of current mission, e.g. path to its file. Cache gets
+        invalidated if the mission differs from the previous one.
+
+        """
+        if mission != self._mission:
+            self._mission = mission
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        self._houses = None
+        self._houses_statuses = bytearray()
+        self._stationary_objects = None
+
+    @property
+    def houses_count(self) -> int:
+        return len(self._houses) if self._houses is not None else 0
+
+    @property
+    def houses_statuses(self) -> bytearray:
+        return self._houses_statuses
+
+    def get_house(self, index: int) -> Optional[structures.HousePosition]:
+        houses = self._houses
+
+        if houses is None or not houses.has(index):
+            return None
+
+        status = self._houses_statuses[index]
+
+        if status == HOUSE_STATUS_UNKNOWN:
+            return None
+
+        return structures.HousePosition(
+            index=index,
+            id=houses.ids[index],
+            pos=houses.get_pos(index),
+            status=(
+                HouseStatuses.alive
+                if status == HOUSE_STATUS_ALIVE
+                else HouseStatuses.dead
+            ),
+        )
+
+    def get_houses(self) -> List[structures.HousePosition]:
+        houses = (self.get_house(i) for i in range(self.houses_count))
+        return [x for x in houses if x is not None]
+
+    def load_houses(
+        self,
+        items: Iterable[ActorPositionItem],
+        count: int,
+    ) -> None:
+        items = list(items)
+
+        self._houses = StaticGeometry(items, count, has_z=False)
+        self._houses_statuses = bytearray([HOUSE_STATUS_UNKNOWN]) * count
+
+        alive = HouseStatuses.alive
+
+        for item in items:
+            self._houses_statuses[item.index] = (
+                HOUSE_STATUS_ALIVE
+                if item.status == alive
+                else HOUSE_STATUS_DEAD
+            )
+
+    def update_houses_statuses(self, statuses: bytearray) -> List[int]:
+        """
+        Apply new statuses of houses and return indices of houses which have
+        been destroyed since the previous update.
+
+        """
+        if self._houses is None or len(statuses) != len(self._houses):
+            raise ValueError("houses are not loaded or their count differs")
+
+        previous = self._houses_statuses
+
+        if statuses == previous:
+            return []
+
+        destroyed = [
+            i
+            for i, (old, new) in enumerate(zip(previous, statuses))
+            if new == HOUSE_STATUS_DEAD and old == HOUSE_STATUS_ALIVE
+        ]
+
+        # keep last known statuses of houses which were not answered
+        self._houses_statuses = bytearray(
+            old if new == HOUSE_STATUS_UNKNOWN else new
+            for old, new in zip(previous, statuses)
+        )
+
+        return destroyed
+
+    async def refresh_houses(
+        self,
+        client: Any,
+        timeout: Optional[float]=None,
+    ) -> Awaitable[List[int]]:
+        """
+        Refresh houses using a DeviceLinkClient. Returns indices of newly
+        destroyed houses. Nothing is reported when houses are (re)loaded.
+
+        """
+        # the count is probed first, so houses are downloaded once only
+        count = await client.get_houses_count(timeout=timeout)
+
+        if self._houses is not None and count == len(self._houses):
+            statuses = await client.get_all_houses_statuses(
+                timeout=timeout,
+                count=count,
+            )
+            return self.update_houses_statuses(statuses)
+
+        LOG.debug(f"load geometry of {count} houses")
+
+        items = await client.get_all_houses_positions(
+            timeout=timeout,
+            result_format=PositionsFormats.records,
+        )
+        count = max([count, *(item.index + 1 for item in items)])
+        self.load_houses(items, count)
+
+        return []
+
+    @property
+    def stationary_objects_count(self) -> int:
+        objects = self._stationary_objects
+        return len(objects) if objects is not None else 0
+
+    def get_stationary_object(
+        self,
+        index: int,
+    ) -> Optional[structures.StationaryObjectPosition]:
+
+        objects = self._stationary_objects
+
+        if objects is None or not objects.has(index):
+            return None
+
+        return structures.StationaryObjectPosition(
+            index=index,
+            id=objects.ids[index],
+            pos=objects.get_pos(index),
+        )
+
+    def get_stationary_objects(
+        self,
+    ) -> List[structures.StationaryObjectPosition]:
+
+        objects = (
+            self.get_stationary_object(i)
+            for i in range(self.stationary_objects_count)
+        )
+        return [x for x in objects if x is not None]
+
+    def load_stationary_objects(
+        self,
+        items: Iterable[ActorPositionItem],
+        count: int,
+    ) -> None:
+        self._stationary_objects = StaticGeometry(items, count, has_z=True)
+
+    async def refresh_stationary_objects(
+        self,
+        client: Any,
+        timeout: Optional[float]=None,
+    ) -> Awaitable[bool]:
+        """
+        Reload stationary objects using a DeviceLinkClient if their count has
+        changed. Returns True if objects were reloaded.
+
+        """
+        count = await client.get_stationary_objects_count(timeout=timeout)
+
+        if (
+            self._stationary_objects is not None
+            and count == len(self._stationary_objects)
+        ):
+            return False
+
+        LOG.debug(f"load geometry of {count} stationary objects")
+
+        items = await client.get_all_stationary_objects_positions(
+            timeout=timeout,
+            result_format=PositionsFormats.records,
+        )
+        count = max([count, *(item.index + 1 for item in items)])
+        self.load_stationary_objects(items, count)
+
+        return True
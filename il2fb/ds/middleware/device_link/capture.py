@@ -0,0 +1,31 @@
+# coding: utf-8
+
+import struct
+
+from typing import Iterator
+
+from il2fb.ds.middleware.capture import Capture, CapturedRecord
+
+from .constants import DatagramDirections
+from .exceptions import DeviceLinkError
+
+
+class DatagramCapture(Capture):
+    """
+    Write datagrams sent and received by a client to a binary file.
+
+    Each datagram is prefixed with a 12-byte header: monotonic time,
+    direction and size. Writes are buffered, so capturing costs a couple of
+    memory copies per datagram on the event loop.
+
+    Not thread-safe.
+
+    """
+    magic = b'IL2FBDLC'
+    record_header = struct.Struct('<dBxH')
+    directions = DatagramDirections
+    error_class = DeviceLinkError
+
+
+def read_capture(path: str) -> Iterator[CapturedRecord]:
+    return DatagramCapture.read(path)
@@ -1,13 +1,27 @@
 # coding: utf-8
 
 import asyncio
+import concurrent.futures
 import logging
 
-from typing import Tuple, Awaitable, List
+from typing import (
+    Tuple, AsyncIterator, Awaitable, Dict, Iterable, List, Optional, Union,
+)
 
+from il2fb.ds.middleware.device_link import columns
+from il2fb.ds.middleware.device_link import records
 from il2fb.ds.middleware.device_link import requests
 from il2fb.ds.middleware.device_link import messages as msg
 from il2fb.ds.middleware.device_link import structures
+from il2fb.ds.middleware.device_link.capture import DatagramCapture
+from il2fb.ds.middleware.device_link.constants import ActorCategory
+from il2fb.ds.middleware.device_link.constants import ActorCategories
+from il2fb.ds.middleware.device_link.constants import DatagramDirections
+from il2fb.ds.middleware.device_link.constants import PositionsFormat
+from il2fb.ds.middleware.device_link.constants import PositionsFormats
+from il2fb.ds.middleware.device_link.helpers import clear_actor_id_caches
+from il2fb.ds.middleware.device_link.helpers import get_actor_id_caches_info
+from il2fb.ds.middleware.device_link.rtt import RTTEstimator
 
 
 LOG = logging.getLogger(__name__)
@@ -17,15 +31,38 @@ Address = Tuple[str, int]
 
 
 class DeviceLinkClient(asyncio.DatagramProtocol):
+    """
+    Results of positions requests can be extracted in an ``executor`` (thread
+    or process pool) or in chunks of ``extraction_chunk_size`` items, so that
+    large snapshots do not block the event loop for long. Results of process
+    pools are unpickled on the event loop, which is cheap for records and
+    columns but not for structures.
+
+    If ``rtt_estimator`` is given, each group of messages gets a timeout
+    derived from round-trip time of the server, and groups are paced when
+    the server slows down. Timeout of whole requests still applies.
+
+    If ``capture`` is given, all datagrams exchanged with the server are
+    written to it, so they can be replayed by ``DeviceLinkReplayServer``.
+
+    """
 
     def __init__(
         self,
         remote_address: Address,
         trace: bool=False,
         loop: asyncio.AbstractEventLoop=None,
+        executor: Optional[concurrent.futures.Executor]=None,
+        extraction_chunk_size: Optional[int]=None,
+        rtt_estimator: Optional[RTTEstimator]=None,
+        capture: Optional[DatagramCapture]=None,
     ):
         self._loop = loop
         self._trace = trace
+        self._executor = executor
+        self._extraction_chunk_size = extraction_chunk_size
+        self._rtt_estimator = rtt_estimator
+        self._capture = capture
 
         self._remote_address = remote_address
         self._requests = asyncio.Queue(loop=self._loop)
@@ -45,6 +82,14 @@ class DeviceLinkClient(asyncio.DatagramProtocol):
     def remote_address(self):
         return self._remote_address
 
+    @property
+    def rtt_estimator(self) -> Optional[RTTEstimator]:
+        return self._rtt_estimator
+
+    @property
+    def capture(self) -> Optional[DatagramCapture]:
+        return self._capture
+
     @staticmethod
     def _make_log_message_prefix_format(remote_address) -> str:
         addr, port = remote_address
@@ -120,13 +165,19 @@ class DeviceLinkClient(asyncio.DatagramProtocol):
             ))
 
         try:
-            await self._request.execute(self._write_bytes)
+            await self._request.execute(
+                self._write_bytes,
+                rtt_estimator=self._rtt_estimator,
+            )
         finally:
             self._request = None
 
     def _write_bytes(self, data: bytes) -> None:
         self._transport.sendto(data)
 
+        if self._capture is not None:
+            self._capture.write(DatagramDirections.sent, data)
+
         if self._trace:
             LOG.debug(self._prefix_log_message(
                 f"dat --> {repr(data)}"
@@ -140,6 +191,9 @@ class DeviceLinkClient(asyncio.DatagramProtocol):
                 ))
             return
 
+        if self._capture is not None:
+            self._capture.write(DatagramDirections.received, data)
+
         if self._trace:
             LOG.debug(self._prefix_log_message(
                 f"dat <-- {repr(data)}"
@@ -168,6 +222,18 @@ class DeviceLinkClient(asyncio.DatagramProtocol):
         if self._request:
             self._request.set_exception(e)
 
+    @staticmethod
+    def clear_caches() -> None:
+        """
+        Must be called when a mission is loaded or unloaded.
+
+        """
+        clear_actor_id_caches()
+
+    @staticmethod
+    def get_caches_info() -> Dict[str, Dict[str, Union[int, float]]]:
+        return get_actor_id_caches_info()
+
     def schedule_request(self, request: requests.DeviceLinkRequest) -> None:
         if self._do_close:
             raise ConnectionAbortedError(
@@ -230,17 +296,37 @@ class DeviceLinkClient(asyncio.DatagramProtocol):
     async def get_all_moving_aircrafts_positions(
         self,
         timeout: float=None,
-    ) -> Awaitable[List[structures.MovingAircraftPosition]]:
+        partial: bool=False,
+        result_format: PositionsFormat=PositionsFormats.structures,
+        timestamped: bool=False,
+    ) -> Awaitable[Union[
+        List[structures.MovingAircraftPosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+        structures.PartialActorPositions,
+        structures.TimedActorPositions,
+    ]]:
+
+        request_class = requests.GetMovingAircraftsPositionsRequest
 
         count = await self.get_moving_aircrafts_count()
         if not count:
-            return []
+            return request_class.make_empty_result(
+                result_format,
+                timestamped,
+                partial,
+            )
 
         indices = range(count)
-        r = requests.GetMovingAircraftsPositionsRequest(
+        r = request_class(
             loop=self._loop,
             indices=indices,
             timeout=timeout,
+            partial=partial,
+            result_format=result_format,
+            timestamped=timestamped,
+            executor=self._executor,
+            chunk_size=self._extraction_chunk_size,
             trace=self._trace,
         )
 
@@ -278,17 +364,37 @@ class DeviceLinkClient(asyncio.DatagramProtocol):
     async def get_all_moving_ground_units_positions(
         self,
         timeout: float=None,
-    ) -> Awaitable[List[structures.MovingGroundUnitPosition]]:
+        partial: bool=False,
+        result_format: PositionsFormat=PositionsFormats.structures,
+        timestamped: bool=False,
+    ) -> Awaitable[Union[
+        List[structures.MovingGroundUnitPosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+        structures.PartialActorPositions,
+        structures.TimedActorPositions,
+    ]]:
+
+        request_class = requests.GetMovingGroundUnitsPositionsRequest
 
         count = await self.get_moving_ground_units_count()
         if not count:
-            return []
+            return request_class.make_empty_result(
+                result_format,
+                timestamped,
+                partial,
+            )
 
         indices = range(count)
-        r = requests.GetMovingGroundUnitsPositionsRequest(
+        r = request_class(
             loop=self._loop,
             indices=indices,
             timeout=timeout,
+            partial=partial,
+            result_format=result_format,
+            timestamped=timestamped,
+            executor=self._executor,
+            chunk_size=self._extraction_chunk_size,
             trace=self._trace,
         )
 
@@ -326,17 +432,37 @@ class DeviceLinkClient(asyncio.DatagramProtocol):
     async def get_all_ships_positions(
         self,
         timeout: float=None,
-    ) -> Awaitable[List[structures.ShipPosition]]:
+        partial: bool=False,
+        result_format: PositionsFormat=PositionsFormats.structures,
+        timestamped: bool=False,
+    ) -> Awaitable[Union[
+        List[structures.ShipPosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+        structures.PartialActorPositions,
+        structures.TimedActorPositions,
+    ]]:
+
+        request_class = requests.GetShipsPositionsRequest
 
         count = await self.get_ships_count()
         if not count:
-            return []
+            return request_class.make_empty_result(
+                result_format,
+                timestamped,
+                partial,
+            )
 
         indices = range(count)
-        r = requests.GetShipsPositionsRequest(
+        r = request_class(
             loop=self._loop,
             indices=indices,
             timeout=timeout,
+            partial=partial,
+            result_format=result_format,
+            timestamped=timestamped,
+            executor=self._executor,
+            chunk_size=self._extraction_chunk_size,
             trace=self._trace,
         )
 
@@ -374,17 +500,37 @@ class DeviceLinkClient(asyncio.DatagramProtocol):
     async def get_all_stationary_objects_positions(
         self,
         timeout: float=None,
-    ) -> Awaitable[List[structures.StationaryObjectPosition]]:
+        partial: bool=False,
+        result_format: PositionsFormat=PositionsFormats.structures,
+        timestamped: bool=False,
+    ) -> Awaitable[Union[
+        List[structures.StationaryObjectPosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+        structures.PartialActorPositions,
+        structures.TimedActorPositions,
+    ]]:
+
+        request_class = requests.GetStationaryObjectsPositionsRequest
 
         count = await self.get_stationary_objects_count()
         if not count:
-            return []
+            return request_class.make_empty_result(
+                result_format,
+                timestamped,
+                partial,
+            )
 
         indices = range(count)
-        r = requests.GetStationaryObjectsPositionsRequest(
+        r = request_class(
             loop=self._loop,
             indices=indices,
             timeout=timeout,
+            partial=partial,
+            result_format=result_format,
+            timestamped=timestamped,
+            executor=self._executor,
+            chunk_size=self._extraction_chunk_size,
             trace=self._trace,
         )
 
@@ -422,19 +568,205 @@ class DeviceLinkClient(asyncio.DatagramProtocol):
     async def get_all_houses_positions(
         self,
         timeout: float=None,
-    ) -> Awaitable[List[structures.HousePosition]]:
+        partial: bool=False,
+        result_format: PositionsFormat=PositionsFormats.structures,
+        timestamped: bool=False,
+    ) -> Awaitable[Union[
+        List[structures.HousePosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+        structures.PartialActorPositions,
+        structures.TimedActorPositions,
+    ]]:
+
+        request_class = requests.GetHousesPositionsRequest
 
         count = await self.get_houses_count()
         if not count:
-            return []
+            return request_class.make_empty_result(
+                result_format,
+                timestamped,
+                partial,
+            )
 
         indices = range(count)
-        r = requests.GetHousesPositionsRequest(
+        r = request_class(
             loop=self._loop,
             indices=indices,
             timeout=timeout,
+            partial=partial,
+            result_format=result_format,
+            timestamped=timestamped,
+            executor=self._executor,
+            chunk_size=self._extraction_chunk_size,
+            trace=self._trace,
+        )
+
+        self.schedule_request(r)
+        return (await r.result())
+
+    async def get_all_houses_statuses(
+        self,
+        timeout: float=None,
+        count: Optional[int]=None,
+    ) -> Awaitable[bytearray]:
+        """
+        Get statuses of houses, see ``GetHousesStatusesRequest``. Number of
+        houses is requested unless it is given.
+
+        """
+        if count is None:
+            count = await self.get_houses_count()
+
+        if not count:
+            return bytearray()
+
+        r = requests.GetHousesStatusesRequest(
+            loop=self._loop,
+            count=count,
+            timeout=timeout,
             trace=self._trace,
         )
 
         self.schedule_request(r)
         return (await r.result())
+
+    def get_count(
+        self,
+        category: ActorCategory,
+        timeout: float=None,
+    ) -> Awaitable[int]:
+
+        getter = {
+            ActorCategories.moving_aircrafts: self.get_moving_aircrafts_count,
+            ActorCategories.moving_ground_units: (
+                self.get_moving_ground_units_count
+            ),
+            ActorCategories.ships: self.get_ships_count,
+            ActorCategories.stationary_objects: (
+                self.get_stationary_objects_count
+            ),
+            ActorCategories.houses: self.get_houses_count,
+        }[category]
+        return getter(timeout=timeout)
+
+    @staticmethod
+    def _get_positions_request_class(category: ActorCategory) -> type:
+        return {
+            ActorCategories.moving_aircrafts: (
+                requests.GetMovingAircraftsPositionsRequest
+            ),
+            ActorCategories.moving_ground_units: (
+                requests.GetMovingGroundUnitsPositionsRequest
+            ),
+            ActorCategories.ships: requests.GetShipsPositionsRequest,
+            ActorCategories.stationary_objects: (
+                requests.GetStationaryObjectsPositionsRequest
+            ),
+            ActorCategories.houses: requests.GetHousesPositionsRequest,
+        }[category]
+
+    def get_positions(
+        self,
+        category: ActorCategory,
+        indices: Iterable[int],
+        timeout: float=None,
+        partial: bool=False,
+        result_format: PositionsFormat=PositionsFormats.structures,
+        timestamped: bool=False,
+    ) -> Awaitable[Union[
+        List[structures.ActorPosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+        structures.PartialActorPositions,
+        structures.TimedActorPositions,
+    ]]:
+        """
+        Get positions of actors of a category by their indices. Indices which
+        are not valid anymore are skipped.
+
+        """
+        request_class = self._get_positions_request_class(category)
+        r = request_class(
+            loop=self._loop,
+            indices=indices,
+            timeout=timeout,
+            partial=partial,
+            result_format=result_format,
+            timestamped=timestamped,
+            executor=self._executor,
+            chunk_size=self._extraction_chunk_size,
+            trace=self._trace,
+        )
+        self.schedule_request(r)
+        return r.result()
+
+    async def iter_positions(
+        self,
+        category: ActorCategory,
+        timeout: float=None,
+        result_format: PositionsFormat=PositionsFormats.records,
+    ) -> AsyncIterator[Union[
+        List[structures.ActorPosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+    ]]:
+        """
+        Iterate over batches of positions of all actors of a category as
+        they arrive. Other requests are not executed until the iteration is
+        over, so batches should be consumed promptly.
+
+        """
+        count = await self.get_count(category)
+        if not count:
+            return
+
+        r = requests.StreamPositionsRequest(
+            positions_request_class=self._get_positions_request_class(
+                category,
+            ),
+            loop=self._loop,
+            indices=range(count),
+            timeout=timeout,
+            result_format=result_format,
+            trace=self._trace,
+        )
+        self.schedule_request(r)
+
+        async for batch in r.iter_batches():
+            yield batch
+
+    def get_all_positions(
+        self,
+        category: ActorCategory,
+        timeout: float=None,
+        partial: bool=False,
+        result_format: PositionsFormat=PositionsFormats.structures,
+        timestamped: bool=False,
+    ) -> Awaitable[Union[
+        List[structures.ActorPosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+        structures.PartialActorPositions,
+        structures.TimedActorPositions,
+    ]]:
+
+        getter = {
+            ActorCategories.moving_aircrafts: (
+                self.get_all_moving_aircrafts_positions
+            ),
+            ActorCategories.moving_ground_units: (
+                self.get_all_moving_ground_units_positions
+            ),
+            ActorCategories.ships: self.get_all_ships_positions,
+            ActorCategories.stationary_objects: (
+                self.get_all_stationary_objects_positions
+            ),
+            ActorCategories.houses: self.get_all_houses_positions,
+        }[category]
+        return getter(
+            timeout=timeout,
+            partial=partial,
+            result_format=result_format,
+            timestamped=timestamped,
+        )
@@ -0,0 +1,385 @@
+# coding: utf-8
+
+from typing import Hashable, Iterator, List, Optional, Tuple
+
+from il2fb.commons.spatial import Point2D, Point3D
+
+from . import structures
+from .constants import ACTOR_DATA_SEPARATOR
+from .constants import STATIC_AIRCRAFT_WITH_HUMAN_SPAWNED_IN
+from .constants import HouseStatuses
+from .exceptions import DeviceLinkError, DeviceLinkValueError
+from .helpers import split_aircraft_id, split_ground_unit_id
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+ActorPositionData = Tuple[int, str]
+
+HOUSE_STATUS_VALUES = frozenset(x.value for x in HouseStatuses.iterconstants())
+
+
+def check_numpy_is_available() -> None:
+    if np is None:
+        raise DeviceLinkError(
+            "NumPy is required for columnar positions, install it via "
+            "'pip install il2fb-ds-middleware[numpy]'"
+        )
+
+
+class ActorPositionsColumns:
+    """
+    Positions of actors of a single category stored as contiguous arrays.
+
+    IDs are dictionary-encoded: ``id_codes`` holds indices of values in
+    ``id_values``. Columns which are not applicable to a category are set to
+    ``None``. Member indices which are not applicable to a particular actor
+    are equal to ``-1``.
+
+    """
+    __slots__ = [
+        'structure_class',
+        'index',
+        'id_codes',
+        'id_values',
+        'member_index',
+        'is_human',
+        'is_stationary',
+        'is_alive',
+        'x',
+        'y',
+        'z',
+    ]
+
+    def __init__(
+        self,
+        structure_class: type,
+        index: 'np.ndarray',
+        id_codes: 'np.ndarray',
+        id_values: List[str],
+        x: 'np.ndarray',
+        y: 'np.ndarray',
+        z: Optional['np.ndarray']=None,
+        member_index: Optional['np.ndarray']=None,
+        is_human: Optional['np.ndarray']=None,
+        is_stationary: Optional['np.ndarray']=None,
+        is_alive: Optional['np.ndarray']=None,
+    ):
+        self.structure_class = structure_class
+        self.index = index
+        self.id_codes = id_codes
+        self.id_values = id_values
+        self.member_index = member_index
+        self.is_human = is_human
+        self.is_stationary = is_stationary
+        self.is_alive = is_alive
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[structures.ActorPosition]:
+        return map(self.get_structure, range(len(self)))
+
+    def __getitem__(self, i: int) -> structures.ActorPosition:
+        return self.get_structure(i)
+
+    @property
+    def ids(self) -> 'np.ndarray':
+        return np.array(self.id_values, dtype=object)[self.id_codes]
+
+    def get_id(self, i: int) -> str:
+        return self.id_values[self.id_codes[i]]
+
+    def get_keys(self) -> List[Hashable]:
+        """
+        Get keys of actors equal to ones given by ``get_actor_key()`` for
+        structures.
+
+        """
+        ids = [self.id_values[code] for code in self.id_codes.tolist()]
+
+        if self.member_index is None:
+            return ids
+
+        member_indices = self.member_index.tolist()
+
+        if self.is_human is not None:
+            member_indices = [
+                None if is_human else member_index
+                for member_index, is_human
+                in zip(member_indices, self.is_human.tolist())
+            ]
+
+        return list(zip(ids, member_indices))
+
+    def get_structure(self, i: int) -> structures.ActorPosition:
+        cls = self.structure_class
+        index = int(self.index[i])
+        id = self.get_id(i)
+
+        if self.z is None:
+            pos = Point2D(self.x[i], self.y[i])
+        else:
+            pos = Point3D(self.x[i], self.y[i], self.z[i])
+
+        if cls is structures.MovingAircraftPosition:
+            is_human = bool(self.is_human[i])
+            member_index = int(self.member_index[i])
+            return cls(
+                index=index,
+                id=id,
+                is_human=is_human,
+                member_index=None if is_human else member_index,
+                pos=pos,
+            )
+
+        if cls is structures.MovingGroundUnitPosition:
+            return cls(
+                index=index,
+                id=id,
+                member_index=int(self.member_index[i]),
+                pos=pos,
+            )
+
+        if cls is structures.ShipPosition:
+            return cls(
+                index=index,
+                id=id,
+                is_stationary=bool(self.is_stationary[i]),
+                pos=pos,
+            )
+
+        if cls is structures.HousePosition:
+            status = (
+                HouseStatuses.alive
+                if self.is_alive[i]
+                else HouseStatuses.dead
+            )
+            return cls(index=index, id=id, pos=pos, status=status)
+
+        return cls(index=index, id=id, pos=pos)
+
+    def to_structures(self) -> List[structures.ActorPosition]:
+        return list(self)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} "
+            f"({self.structure_class.__name__}, {len(self)} items)>"
+        )
+
+
+def _encode_ids(raw_ids: List[str]) -> Tuple['np.ndarray', List[str]]:
+    codes = {}
+    id_codes = np.fromiter(
+        (codes.setdefault(x, len(codes)) for x in raw_ids),
+        dtype=np.int32,
+        count=len(raw_ids),
+    )
+    return id_codes, list(codes)
+
+
+def _split_items(
+    items: List[ActorPositionData],
+    coordinates_count: int,
+    with_status: bool=False,
+) -> Tuple[
+    'np.ndarray', List[str], 'np.ndarray', Optional[List[str]],
+]:
+    """
+    Split actor data into columns parsing all numeric values in bulk.
+
+    """
+    count = len(items)
+    index = np.fromiter(
+        (i for i, data in items),
+        dtype=np.int32,
+        count=count,
+    )
+
+    raw_ids = []
+    raw_coordinates = []
+    statuses = [] if with_status else None
+
+    for i, data in items:
+        id, _, rest = data.partition(ACTOR_DATA_SEPARATOR)
+
+        if with_status:
+            rest, _, status = rest.rpartition(ACTOR_DATA_SEPARATOR)
+            statuses.append(status)
+
+        raw_ids.append(id)
+        raw_coordinates.append(rest)
+
+    if count:
+        coordinates = np.fromstring(
+            ACTOR_DATA_SEPARATOR.join(raw_coordinates),
+            dtype=np.float64,
+            sep=ACTOR_DATA_SEPARATOR,
+        )
+    else:
+        coordinates = np.empty(0, dtype=np.float64)
+
+    coordinates = coordinates.reshape(count, coordinates_count)
+    return index, raw_ids, coordinates, statuses
+
+
+def _xyz(coordinates: 'np.ndarray') -> Tuple['np.ndarray', ...]:
+    return tuple(
+        np.ascontiguousarray(coordinates[:, i])
+        for i in range(coordinates.shape[1])
+    )
+
+
+def make_moving_aircrafts_columns(
+    items: List[ActorPositionData],
+) -> ActorPositionsColumns:
+
+    index, raw_ids, coordinates, _ = _split_items(items, 3)
+    raw_id_codes, raw_id_values = _encode_ids(raw_ids)
+
+    # each distinct raw ID is parsed only once
+    id_values = {}
+    raw_id_to_id = np.empty(len(raw_id_values), dtype=np.int32)
+    raw_id_to_member_index = np.full(len(raw_id_values), -1, dtype=np.int16)
+    raw_id_to_is_human = np.zeros(len(raw_id_values), dtype=bool)
+
+    for i, raw_id in enumerate(raw_id_values):
+        id, member_index, is_human = split_aircraft_id(raw_id)
+
+        if not is_human:
+            raw_id_to_member_index[i] = member_index
+
+        raw_id_to_id[i] = id_values.setdefault(id, len(id_values))
+        raw_id_to_is_human[i] = is_human
+
+    x, y, z = _xyz(coordinates)
+    return ActorPositionsColumns(
+        structure_class=structures.MovingAircraftPosition,
+        index=index,
+        id_codes=raw_id_to_id[raw_id_codes],
+        id_values=list(id_values),
+        member_index=raw_id_to_member_index[raw_id_codes],
+        is_human=raw_id_to_is_human[raw_id_codes],
+        x=x,
+        y=y,
+        z=z,
+    )
+
+
+def make_moving_ground_units_columns(
+    items: List[ActorPositionData],
+) -> ActorPositionsColumns:
+
+    index, raw_ids, coordinates, _ = _split_items(items, 3)
+    raw_id_codes, raw_id_values = _encode_ids(raw_ids)
+
+    id_values = {}
+    raw_id_to_id = np.empty(len(raw_id_values), dtype=np.int32)
+    raw_id_to_member_index = np.empty(len(raw_id_values), dtype=np.int16)
+
+    for i, raw_id in enumerate(raw_id_values):
+        id, member_index = split_ground_unit_id(raw_id)
+        raw_id_to_id[i] = id_values.setdefault(id, len(id_values))
+        raw_id_to_member_index[i] = member_index
+
+    x, y, z = _xyz(coordinates)
+    return ActorPositionsColumns(
+        structure_class=structures.MovingGroundUnitPosition,
+        index=index,
+        id_codes=raw_id_to_id[raw_id_codes],
+        id_values=list(id_values),
+        member_index=raw_id_to_member_index[raw_id_codes],
+        x=x,
+        y=y,
+        z=z,
+    )
+
+
+def make_ships_columns(
+    items: List[ActorPositionData],
+) -> ActorPositionsColumns:
+
+    index, raw_ids, coordinates, _ = _split_items(items, 2)
+    id_codes, id_values = _encode_ids(raw_ids)
+
+    is_stationary = np.array(
+        [x.endswith('_Static') for x in id_values],
+        dtype=bool,
+    )
+
+    x, y = _xyz(coordinates)
+    return ActorPositionsColumns(
+        structure_class=structures.ShipPosition,
+        index=index,
+        id_codes=id_codes,
+        id_values=id_values,
+        is_stationary=is_stationary[id_codes],
+        x=x,
+        y=y,
+    )
+
+
+def make_stationary_objects_columns(
+    items: List[ActorPositionData],
+) -> ActorPositionsColumns:
+
+    items = [
+        item for item in items
+        if item[1] != STATIC_AIRCRAFT_WITH_HUMAN_SPAWNED_IN
+    ]
+    index, raw_ids, coordinates, _ = _split_items(items, 3)
+    id_codes, id_values = _encode_ids(raw_ids)
+
+    x, y, z = _xyz(coordinates)
+    return ActorPositionsColumns(
+        structure_class=structures.StationaryObjectPosition,
+        index=index,
+        id_codes=id_codes,
+        id_values=id_values,
+        x=x,
+        y=y,
+        z=z,
+    )
+
+
+def make_houses_columns(
+    items: List[ActorPositionData],
+) -> ActorPositionsColumns:
+
+    index, raw_ids, coordinates, statuses = _split_items(
+        items, 2, with_status=True,
+    )
+    id_codes, id_values = _encode_ids(raw_ids)
+
+    # unknown statuses are rejected just like by structures and records
+    unknown_statuses = set(statuses).difference(HOUSE_STATUS_VALUES)
+
+    if unknown_statuses:
+        raise DeviceLinkValueError(
+            f"unknown house statuses {sorted(unknown_statuses)}"
+        )
+
+    alive = HouseStatuses.alive.value
+    is_alive = np.fromiter(
+        (x == alive for x in statuses),
+        dtype=bool,
+        count=len(statuses),
+    )
+
+    x, y = _xyz(coordinates)
+    return ActorPositionsColumns(
+        structure_class=structures.HousePosition,
+        index=index,
+        id_codes=id_codes,
+        id_values=id_values,
+        is_alive=is_alive,
+        x=x,
+        y=y,
+    )
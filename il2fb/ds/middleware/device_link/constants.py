@@ -12,6 +12,46 @@ class HouseStatuses(with_constant_class(HouseStatus), Values):
     dead = HouseStatus("D")
 
 
+class ActorCategory(ValueConstant):
+    pass
+
+
+class ActorCategories(with_constant_class(ActorCategory), Values):
+    moving_aircrafts = ActorCategory("moving_aircrafts")
+    moving_ground_units = ActorCategory("moving_ground_units")
+    ships = ActorCategory("ships")
+    stationary_objects = ActorCategory("stationary_objects")
+    houses = ActorCategory("houses")
+
+
+class PositionsFormat(ValueConstant):
+    pass
+
+
+class PositionsFormats(with_constant_class(PositionsFormat), Values):
+    structures = PositionsFormat("structures")
+    records = PositionsFormat("records")
+    columns = PositionsFormat("columns")
+
+
+class GeofenceEventType(ValueConstant):
+    pass
+
+
+class GeofenceEventTypes(with_constant_class(GeofenceEventType), Values):
+    entered = GeofenceEventType("entered")
+    left = GeofenceEventType("left")
+
+
+class DatagramDirection(ValueConstant):
+    pass
+
+
+class DatagramDirections(with_constant_class(DatagramDirection), Values):
+    sent = DatagramDirection(0)
+    received = DatagramDirection(1)
+
+
 MESSAGE_TYPE_SEPARATOR = b'/'
 MESSAGE_SEPARATOR = b'/'
 MESSAGE_GROUP_MAX_SIZE = 40
@@ -27,3 +67,12 @@ ACTOR_STATUS_ERROR = 'INVALID'
 ACTOR_DATA_SEPARATOR = ';'
 
 STATIC_AIRCRAFT_WITH_HUMAN_SPAWNED_IN = 'INAIR'
+
+# values of items of house statuses maps
+HOUSE_STATUS_DEAD = 0
+HOUSE_STATUS_ALIVE = 1
+HOUSE_STATUS_UNKNOWN = 0xFF
+
+ACTOR_ID_CACHE_MAX_SIZE = 4096
+REQUEST_DATAGRAM_CACHE_MAX_SIZE = 4096
+MAP_GRID_LABELS_CACHE_MAX_SIZE = 4096
@@ -14,8 +14,10 @@ LOG = logging.getLogger(__name__)
 def actor_index_is_valid(
     item: PreparsedActorPosition,
 ) -> Optional[PreparsedActorPosition]:
-    if item.data == ACTOR_INDEX_ERROR:
-        LOG.error(f"invalid actor index (index={item.index})")
+    index, data = item
+
+    if data == ACTOR_INDEX_ERROR:
+        LOG.error(f"invalid actor index (index={index})")
         return False
 
     return item
@@ -24,8 +26,10 @@ def actor_index_is_valid(
 def actor_status_is_valid(
     item: PreparsedActorPosition,
 ) -> Optional[PreparsedActorPosition]:
-    if item.data == ACTOR_STATUS_ERROR:
-        LOG.error(f"invalid actor state (index={item.index})")
+    index, data = item
+
+    if data == ACTOR_STATUS_ERROR:
+        LOG.error(f"invalid actor state (index={index})")
         return False
 
     return item
@@ -0,0 +1,367 @@
+# coding: utf-8
+
+import bisect
+import math
+
+from collections import defaultdict
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+
+from il2fb.commons.structures import BaseStructure
+
+from .columns import ActorPositionsColumns, check_numpy_is_available
+from .constants import GeofenceEventType, GeofenceEventTypes
+from .snapshots import ActorKey, ActorPositionItem
+from .snapshots import get_actor_coordinates, get_actor_key
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+Snapshot = Union[Iterable[ActorPositionItem], ActorPositionsColumns]
+
+
+class Zone(BaseStructure):
+    """
+    Polygonal zone. Vertices are given as ``(x, y)`` pairs, the polygon is
+    closed implicitly.
+
+    """
+    __slots__ = ['name', 'vertices', ]
+
+    def __init__(
+        self,
+        name: Any,
+        vertices: Sequence[Tuple[float, float]],
+    ):
+        if len(vertices) < 3:
+            raise ValueError("zone must have at least 3 vertices")
+
+        self.name = name
+        self.vertices = vertices
+
+    def get_bbox(self) -> Tuple[float, float, float, float]:
+        xs = [x for x, y in self.vertices]
+        ys = [y for x, y in self.vertices]
+        return min(xs), min(ys), max(xs), max(ys)
+
+
+class GeofenceEvent(BaseStructure):
+    """
+    Event of crossing of a zone border by an actor. ``item`` is the latest
+    known position of the actor.
+
+    """
+    __slots__ = ['type', 'zone', 'key', 'item', ]
+
+    def __init__(
+        self,
+        type: GeofenceEventType,
+        zone: Zone,
+        key: ActorKey,
+        item: Optional[ActorPositionItem],
+    ):
+        self.type = type
+        self.zone = zone
+        self.key = key
+        self.item = item
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} "
+            f"({self.type.name}, zone={self.zone.name!r}, key={self.key!r})>"
+        )
+
+
+class _CompiledZone:
+    __slots__ = ['zone', 'x1', 'y1', 'x2', 'y2', 'bbox', ]
+
+    def __init__(self, zone: Zone):
+        vertices = np.asarray(zone.vertices, dtype=np.float64)
+
+        self.zone = zone
+        self.x1 = vertices[:, 0]
+        self.y1 = vertices[:, 1]
+        self.x2 = np.roll(self.x1, -1)
+        self.y2 = np.roll(self.y1, -1)
+        self.bbox = zone.get_bbox()
+
+    def contains(self, x: 'np.ndarray', y: 'np.ndarray') -> 'np.ndarray':
+        """
+        Even-odd test of many points against the polygon. Loops over edges
+        only, points are processed in bulk.
+
+        """
+        min_x, min_y, max_x, max_y = self.bbox
+        inside = np.zeros(len(x), dtype=bool)
+
+        candidates = np.flatnonzero(
+            (x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y)
+        )
+        if not len(candidates):
+            return inside
+
+        px = x[candidates]
+        py = y[candidates]
+        result = np.zeros(len(candidates), dtype=bool)
+
+        for x1, y1, x2, y2 in zip(
+            self.x1.tolist(), self.y1.tolist(),
+            self.x2.tolist(), self.y2.tolist(),
+        ):
+            if y1 == y2:
+                continue
+
+            crosses = (y1 > py) != (y2 > py)
+            intersection_x = x1 + (py - y1) * ((x2 - x1) / (y2 - y1))
+            result ^= crosses & (px < intersection_x)
+
+        inside[candidates] = result
+        return inside
+
+
+class _Sources:
+    """
+    Snapshots of a single update. Their items are addressed by global
+    indices, so structures are created only for actors which get into
+    events.
+
+    """
+    __slots__ = ['starts', 'snapshots', ]
+
+    def __init__(self):
+        self.starts = []
+        self.snapshots = []
+
+    def add(self, start: int, snapshot: Union[List[Any], Any]) -> None:
+        self.starts.append(start)
+        self.snapshots.append(snapshot)
+
+    def get_item(self, j: int) -> ActorPositionItem:
+        n = bisect.bisect_right(self.starts, j) - 1
+        snapshot = self.snapshots[n]
+        i = j - self.starts[n]
+
+        if isinstance(snapshot, ActorPositionsColumns):
+            return snapshot.get_structure(i)
+
+        return snapshot[i]
+
+
+class Geofence:
+    """
+    Track presence of actors inside of polygonal zones.
+
+    Zones are registered in a uniform grid by their bounding boxes, so every
+    actor is tested only against zones which may contain it. Point-in-polygon
+    tests are made in bulk for all candidate actors of a zone at once.
+
+    Events are emitted only for changes of state since the previous update.
+    Actors which have disappeared from snapshots leave all their zones.
+
+    Not thread-safe.
+
+    """
+
+    def __init__(
+        self,
+        zones: Iterable[Zone],
+        cell_size: float=10000.0,
+    ):
+        check_numpy_is_available()
+
+        if cell_size <= 0:
+            raise ValueError("cell size must be positive")
+
+        self.cell_size = cell_size
+        self._zones = [_CompiledZone(zone) for zone in zones]
+        self._cells = defaultdict(list)
+
+        for i, compiled in enumerate(self._zones):
+            min_x, min_y, max_x, max_y = compiled.bbox
+            min_i, min_j = self._get_cell(min_x, min_y)
+            max_i, max_j = self._get_cell(max_x, max_y)
+
+            for ci in range(min_i, max_i + 1):
+                for cj in range(min_j, max_j + 1):
+                    self._cells[(ci, cj)].append(i)
+
+        self._inside = set()  # pairs of zone index and actor key
+        self._indices = {}  # global indices of actors inside of zones
+        self._sources = _Sources()
+
+    @property
+    def zones(self) -> List[Zone]:
+        return [compiled.zone for compiled in self._zones]
+
+    def _get_cell(self, x: float, y: float) -> Tuple[int, int]:
+        return (
+            int(math.floor(x / self.cell_size)),
+            int(math.floor(y / self.cell_size)),
+        )
+
+    def get_zones_of(self, key: ActorKey) -> List[Zone]:
+        return [
+            self._zones[i].zone
+            for i, inside_key in self._inside
+            if inside_key == key
+        ]
+
+    def update(self, *snapshots: Snapshot) -> List[GeofenceEvent]:
+        """
+        Process current snapshots of all categories of interest and get
+        events of entering and leaving of zones.
+
+        """
+        keys, sources, x, y = self._collect(snapshots)
+        inside = set()
+        indices = {}
+
+        for i, point_indices in self._get_candidates(x, y):
+            compiled = self._zones[i]
+            mask = compiled.contains(x[point_indices], y[point_indices])
+
+            for j in point_indices[mask].tolist():
+                key = keys[j]
+                inside.add((i, key))
+                indices[key] = j
+
+        entered = inside - self._inside
+        left = self._inside - inside
+
+        # actors which have left zones, but are still present in snapshots
+        current_indices = indices
+        left_keys = {key for i, key in left}.difference(indices)
+
+        if left_keys:
+            current_indices = dict(indices)
+            current_indices.update(
+                (key, j)
+                for j, key in enumerate(keys)
+                if key in left_keys
+            )
+
+        # structures are created only for actors which get into events
+        items = {}
+
+        for i, key in entered | left:
+            if key in items:
+                continue
+
+            if key in current_indices:
+                items[key] = sources.get_item(current_indices[key])
+            else:
+                # actor has disappeared, use its latest known position
+                items[key] = self._sources.get_item(self._indices[key])
+
+        events = [
+            GeofenceEvent(
+                type=GeofenceEventTypes.entered,
+                zone=self._zones[i].zone,
+                key=key,
+                item=items[key],
+            )
+            for i, key in entered
+        ]
+        events.extend(
+            GeofenceEvent(
+                type=GeofenceEventTypes.left,
+                zone=self._zones[i].zone,
+                key=key,
+                item=items[key],
+            )
+            for i, key in left
+        )
+
+        self._inside = inside
+        self._indices = indices
+        self._sources = sources
+
+        return events
+
+    def reset(self) -> None:
+        self._inside = set()
+        self._indices = {}
+        self._sources = _Sources()
+
+    @staticmethod
+    def _collect(
+        snapshots: Sequence[Snapshot],
+    ) -> Tuple[List[ActorKey], _Sources, 'np.ndarray', 'np.ndarray']:
+
+        keys = []
+        sources = _Sources()
+        xs = []
+        ys = []
+
+        for snapshot in snapshots:
+            if isinstance(snapshot, ActorPositionsColumns):
+                sources.add(len(keys), snapshot)
+                keys.extend(snapshot.get_keys())
+                xs.append(snapshot.x)
+                ys.append(snapshot.y)
+                continue
+
+            snapshot = list(snapshot)
+            coordinates = [
+                get_actor_coordinates(item)[:2]
+                for item in snapshot
+            ]
+            sources.add(len(keys), snapshot)
+            keys.extend(get_actor_key(item) for item in snapshot)
+
+            if coordinates:
+                coordinates = np.array(coordinates, dtype=np.float64)
+                xs.append(coordinates[:, 0])
+                ys.append(coordinates[:, 1])
+
+        if xs:
+            x = np.concatenate(xs)
+            y = np.concatenate(ys)
+        else:
+            x = y = np.empty(0, dtype=np.float64)
+
+        return keys, sources, x, y
+
+    def _get_candidates(
+        self,
+        x: 'np.ndarray',
+        y: 'np.ndarray',
+    ) -> Iterable[Tuple[int, 'np.ndarray']]:
+        """
+        Get indices of points which may be inside of each zone using the
+        grid.
+
+        """
+        if not len(x) or not self._zones:
+            return []
+
+        ci = np.floor(x / self.cell_size).astype(np.int64)
+        cj = np.floor(y / self.cell_size).astype(np.int64)
+
+        cells, inverse = np.unique(
+            np.stack((ci, cj), axis=1),
+            axis=0,
+            return_inverse=True,
+        )
+        inverse = inverse.ravel()
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.searchsorted(inverse[order], np.arange(len(cells) + 1))
+
+        candidates = defaultdict(list)
+
+        for n, (i, j) in enumerate(cells.tolist()):
+            zone_indices = self._cells.get((i, j))
+            if not zone_indices:
+                continue
+
+            point_indices = order[bounds[n]:bounds[n + 1]]
+
+            for zone_index in zone_indices:
+                candidates[zone_index].append(point_indices)
+
+        return [
+            (zone_index, np.sort(np.concatenate(chunks)))
+            for zone_index, chunks in candidates.items()
+        ]
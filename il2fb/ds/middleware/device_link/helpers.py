@@ -1,26 +1,36 @@
 # coding: utf-8
 
+import functools
 import re
+import sys
 
-from typing import List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional, Union
 
 from .constants import (
     REQUEST_PREFIX, ANSWER_PREFIX, MESSAGE_SEPARATOR, VALUE_SEPARATOR,
+    ACTOR_INDEX_SEPARATOR, ACTOR_ID_CACHE_MAX_SIZE, MESSAGE_GROUP_MAX_SIZE,
+    REQUEST_DATAGRAM_CACHE_MAX_SIZE,
 )
 from .exceptions import DeviceLinkValueError
 from .messages import DeviceLinkMessage, make_message
 
 
-def decompose_data(data: bytes) -> List[DeviceLinkMessage]:
+# messages separated by message separators which are not escaped
+MESSAGE_REGEX = re.compile(rb"(?:[^\\/]|\\.)+", re.DOTALL)
+AIRCRAFT_ID_REGEX = re.compile(r"(.*?)(?:_\d+|$)")
+GROUND_UNIT_ID_REGEX = re.compile(r"(\d+_Chief)(\d+)")
+
+
+def _validate_prefix(data: bytes) -> None:
     if not (data.startswith(REQUEST_PREFIX) or data.startswith(ANSWER_PREFIX)):
         raise DeviceLinkValueError(f"malformed device link data {data}")
 
-    data = data[2:]  # strip prefix
 
-    if b'\\/' in data:
-        chunks = re.findall(b'(\d+\\\\\d+:.+?(?:;\d+)+)', data)
-    else:
-        chunks = data.split(MESSAGE_SEPARATOR)
+def decompose_data(data: bytes) -> List[DeviceLinkMessage]:
+    _validate_prefix(data)
+
+    data = data[2:]  # strip prefix
+    chunks = split_messages(data)
 
     args_list = map(parse_data, chunks)
 
@@ -30,10 +40,70 @@ def decompose_data(data: bytes) -> List[DeviceLinkMessage]:
     ]
 
 
+def scan_actor_positions(data: bytes) -> List[Tuple[int, str]]:
+    """
+    Fast path for answers to positions requests: returns pairs of actor index
+    and unescaped actor data without building intermediate messages.
+
+    Messages are split and unescaped by the same rules as in
+    ``decompose_data()``, but data which cannot be parsed raises an error.
+
+    """
+    _validate_prefix(data)
+
+    body = data[2:]  # strip prefix
+
+    if not body:
+        return []
+
+    if b'\\/' in body:
+        chunks = [chunk.decode() for chunk in split_messages(body)]
+    else:
+        chunks = body.decode().split('/')
+
+    results = []
+
+    for chunk in chunks:
+        opcode, separator, value = chunk.partition('\\')
+        index, index_separator, value = value.partition(ACTOR_INDEX_SEPARATOR)
+
+        if not (separator and index_separator and index.isdigit()):
+            raise DeviceLinkValueError(
+                f"malformed actor position {repr(chunk)} in {data}"
+            )
+
+        if '\\' in value:
+            value = unescape_value(value)
+
+        results.append((int(index), value))
+
+    return results
+
+
+def split_messages(data: bytes) -> List[bytes]:
+    """
+    Split body of a datagram by message separators which are not escaped.
+
+    """
+    if b'\\/' not in data:
+        return data.split(MESSAGE_SEPARATOR)
+
+    chunks = MESSAGE_REGEX.findall(data)
+
+    if MESSAGE_SEPARATOR.join(chunks) != data:
+        raise DeviceLinkValueError(f"unparsed device link data {data}")
+
+    return chunks
+
+
+def unescape_value(value: str) -> str:
+    return value.replace('\\/', '/').replace('\\\\', '\\')
+
+
 def parse_data(data: bytes) -> Tuple[int, Optional[str]]:
     if VALUE_SEPARATOR in data:
         opcode, value = data.split(VALUE_SEPARATOR, 1)
-        value = value.decode().replace('\\/', '/').replace('\\\\', '\\')
+        value = unescape_value(value.decode())
     else:
         opcode, value = data, None
 
@@ -53,6 +123,113 @@ def compose_answer(messages: List[DeviceLinkMessage]) -> bytes:
     return ANSWER_PREFIX + compose_body(messages)
 
 
+def compose_positions_requests(
+    opcode: int,
+    indices: Iterable[int],
+    group_size: int=MESSAGE_GROUP_MAX_SIZE,
+) -> List[Tuple[bytes, int]]:
+    """
+    Compose request datagrams for positions of actors with given indices.
+
+    Returns pairs of datagram and number of messages in it. Datagrams for
+    contiguous ranges of indices are cached, as they are the same on every
+    poll.
+
+    """
+    if isinstance(indices, range) and indices.step == 1:
+        return [
+            _compose_index_range_request(
+                opcode,
+                start,
+                min(start + group_size, indices.stop),
+            )
+            for start in range(indices.start, indices.stop, group_size)
+        ]
+
+    indices = list(indices)
+    return [
+        _compose_indices_request(opcode, indices[start:start + group_size])
+        for start in range(0, len(indices), group_size)
+    ]
+
+
+@functools.lru_cache(maxsize=REQUEST_DATAGRAM_CACHE_MAX_SIZE)
+def _compose_index_range_request(
+    opcode: int,
+    start: int,
+    stop: int,
+) -> Tuple[bytes, int]:
+    return _compose_indices_request(opcode, range(start, stop))
+
+
+def _compose_indices_request(
+    opcode: int,
+    indices: Iterable[int],
+) -> Tuple[bytes, int]:
+    prefix = b'%d' % opcode + VALUE_SEPARATOR
+    data = bytearray(REQUEST_PREFIX)
+    count = 0
+
+    for i in indices:
+        if count:
+            data += MESSAGE_SEPARATOR
+
+        data += prefix
+        data += b'%d' % i
+        count += 1
+
+    return bytes(data), count
+
+
 def normalize_aircraft_id(s: str) -> str:
-    m = re.match(r"(.*?)(?:_\d+|$)", s)
+    m = AIRCRAFT_ID_REGEX.match(s)
     return m.groups()[0]
+
+
+# Same IDs are repeated on every poll, so results of splitting are memoized.
+# Each distinct raw ID always gives the same tuple with an interned ID.
+@functools.lru_cache(maxsize=ACTOR_ID_CACHE_MAX_SIZE)
+def split_aircraft_id(s: str) -> Tuple[str, Optional[int], bool]:
+    id = normalize_aircraft_id(s)
+    is_human = (id != s)
+
+    if is_human:
+        member_index = None
+    else:
+        id, member_index = id[:-1], int(id[-1:])
+
+    return sys.intern(id), member_index, is_human
+
+
+@functools.lru_cache(maxsize=ACTOR_ID_CACHE_MAX_SIZE)
+def split_ground_unit_id(s: str) -> Tuple[str, int]:
+    id, member_index = GROUND_UNIT_ID_REGEX.match(s).groups()
+    return sys.intern(id), int(member_index)
+
+
+_ACTOR_ID_SPLITTERS = {
+    'aircrafts': split_aircraft_id,
+    'ground_units': split_ground_unit_id,
+}
+
+
+def clear_actor_id_caches() -> None:
+    for splitter in _ACTOR_ID_SPLITTERS.values():
+        splitter.cache_clear()
+
+
+def get_actor_id_caches_info() -> Dict[str, Dict[str, Union[int, float]]]:
+    result = {}
+
+    for name, splitter in _ACTOR_ID_SPLITTERS.items():
+        info = splitter.cache_info()
+        total = info.hits + info.misses
+        result[name] = {
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_rate': (info.hits / total) if total else 0.0,
+            'size': info.currsize,
+            'max_size': info.maxsize,
+        }
+
+    return result
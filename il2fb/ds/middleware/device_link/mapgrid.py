@@ -0,0 +1,151 @@
+# coding: utf-8
+
+import functools
+import string
+
+from collections import namedtuple
+from typing import Iterable, List, Optional, Tuple, Union
+
+from .columns import ActorPositionsColumns, check_numpy_is_available
+from .constants import MAP_GRID_LABELS_CACHE_MAX_SIZE
+from .snapshots import ActorPositionItem, get_actor_coordinates
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+class MapGrid(namedtuple('MapGrid', [
+    'square_size', 'origin_x', 'origin_y', 'keypad_levels',
+])):
+    """
+    Parameters of a map grid.
+
+    Columns of squares are labelled by letters from west to east, rows are
+    numbered from south to north starting from 1. Each square is split into
+    3 x 3 subsquares numbered as keys of a numeric keypad (7 is north-west),
+    ``keypad_levels`` times recursively.
+
+    """
+    __slots__ = ()
+
+    def __new__(
+        cls,
+        square_size: float=10000.0,
+        origin_x: float=0.0,
+        origin_y: float=0.0,
+        keypad_levels: int=1,
+    ):
+        return super().__new__(
+            cls, square_size, origin_x, origin_y, keypad_levels,
+        )
+
+
+DEFAULT_MAP_GRID = MapGrid()
+
+
+def get_column_letters(i: int) -> str:
+    """
+    Get letters of a column: A, B, ..., Z, AA, AB and so on.
+
+    """
+    letters = ''
+    i += 1
+
+    while i:
+        i, remainder = divmod(i - 1, 26)
+        letters = string.ascii_uppercase[remainder] + letters
+
+    return letters
+
+
+@functools.lru_cache(maxsize=MAP_GRID_LABELS_CACHE_MAX_SIZE)
+def format_map_grid_label(
+    column: int,
+    row: int,
+    keypads: Tuple[int, ...]=(),
+) -> str:
+    label = f"{get_column_letters(column)}{row + 1}"
+
+    if keypads:
+        label += " kp" + ".".join(map(str, keypads))
+
+    return label
+
+
+def label_positions(
+    snapshot: Union[
+        Iterable[ActorPositionItem],
+        ActorPositionsColumns,
+        Tuple['np.ndarray', 'np.ndarray'],
+    ],
+    grid: MapGrid=DEFAULT_MAP_GRID,
+) -> List[Optional[str]]:
+    """
+    Get map grid labels, e.g. "C7 kp5", of many positions at once.
+
+    Positions can be given as a snapshot of any format or as a pair of
+    arrays of coordinates. Cells are computed in bulk and a label is
+    formatted once per distinct cell. Labels of positions outside of the
+    grid are ``None``.
+
+    """
+    check_numpy_is_available()
+
+    x, y = _get_xy(snapshot)
+
+    if not len(x):
+        return []
+
+    fx = (x - grid.origin_x) / grid.square_size
+    fy = (y - grid.origin_y) / grid.square_size
+
+    column = np.floor(fx)
+    row = np.floor(fy)
+    outside = (column < 0) | (row < 0)
+
+    # parts of a cell code: column, row, keypads of every level
+    parts = [column, row]
+    fx -= column
+    fy -= row
+
+    for i in range(grid.keypad_levels):
+        kx = np.minimum(np.floor(fx * 3), 2)
+        ky = np.minimum(np.floor(fy * 3), 2)
+        parts.append(ky * 3 + kx + 1)
+        fx = fx * 3 - kx
+        fy = fy * 3 - ky
+
+    cells = np.stack(parts, axis=1).astype(np.int64)
+    cells[outside] = -1
+
+    unique_cells, inverse = np.unique(cells, axis=0, return_inverse=True)
+
+    labels = [
+        None
+        if cell[0] < 0
+        else format_map_grid_label(cell[0], cell[1], tuple(cell[2:]))
+        for cell in unique_cells.tolist()
+    ]
+    return [labels[i] for i in inverse.ravel().tolist()]
+
+
+def _get_xy(snapshot) -> Tuple['np.ndarray', 'np.ndarray']:
+    if isinstance(snapshot, ActorPositionsColumns):
+        return snapshot.x, snapshot.y
+
+    if isinstance(snapshot, tuple) and len(snapshot) == 2:
+        x, y = snapshot
+
+        if isinstance(x, np.ndarray):
+            return (
+                np.asarray(x, dtype=np.float64),
+                np.asarray(y, dtype=np.float64),
+            )
+
+    coordinates = np.array(
+        [get_actor_coordinates(item)[:2] for item in snapshot],
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    return coordinates[:, 0], coordinates[:, 1]
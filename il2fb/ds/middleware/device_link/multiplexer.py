@@ -0,0 +1,209 @@
+# coding: utf-8
+
+import asyncio
+import logging
+
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from il2fb.ds.middleware.device_link.client import DeviceLinkClient
+
+
+LOG = logging.getLogger(__name__)
+
+
+Address = Tuple[str, int]
+
+
+class _SharedTransport:
+    """
+    View of a shared datagram transport bound to a single remote address.
+
+    Closing of the view detaches a client only, the shared transport stays
+    opened.
+
+    """
+
+    def __init__(
+        self,
+        transport: asyncio.DatagramTransport,
+        remote_address: Address,
+        on_close: Callable[[], None],
+    ):
+        self._transport = transport
+        self._remote_address = remote_address
+        self._on_close = on_close
+        self._is_closing = False
+
+    def sendto(self, data: bytes, addr: Optional[Address]=None) -> None:
+        self._transport.sendto(data, self._remote_address)
+
+    def get_extra_info(self, name: str, default: Any=None) -> Any:
+        if name == 'peername':
+            return self._remote_address
+
+        return self._transport.get_extra_info(name, default)
+
+    def is_closing(self) -> bool:
+        return self._is_closing or self._transport.is_closing()
+
+    def close(self) -> None:
+        if not self._is_closing:
+            self._is_closing = True
+            self._on_close()
+
+    def abort(self) -> None:
+        self.close()
+
+
+class DeviceLinkMultiplexer(asyncio.DatagramProtocol):
+    """
+    Serve Device Link of many servers over a single UDP socket.
+
+    Datagrams are demultiplexed by source address into per-server clients,
+    so each server keeps its own queue and state of requests, and requests
+    to different servers are executed concurrently. Remote addresses must be
+    given as IP addresses, as they are matched with sources of datagrams.
+
+    Usage::
+
+        mux = DeviceLinkMultiplexer()
+        await loop.create_datagram_endpoint(
+            lambda: mux, local_addr=('0.0.0.0', 0),
+        )
+        client = mux.add_client(('10.0.0.2', 10000))
+
+    """
+
+    def __init__(
+        self,
+        trace: bool=False,
+        loop: asyncio.AbstractEventLoop=None,
+    ):
+        self._loop = loop
+        self._trace = trace
+
+        self._transport = None
+        self._clients = {}
+
+        self._do_close = False
+        self._connected_ack = asyncio.Future(loop=self._loop)
+        self._closed_ack = asyncio.Future(loop=self._loop)
+
+    @property
+    def clients(self) -> Dict[Address, DeviceLinkClient]:
+        return dict(self._clients)
+
+    def get_client(
+        self,
+        remote_address: Address,
+    ) -> Optional[DeviceLinkClient]:
+        return self._clients.get(remote_address)
+
+    def add_client(
+        self,
+        remote_address: Address,
+        **kwargs
+    ) -> DeviceLinkClient:
+        """
+        Create a client of a server. Extra keyword arguments are passed to
+        ``DeviceLinkClient``.
+
+        """
+        if self._do_close:
+            raise ConnectionAbortedError(
+                "multiplexer is closed and does not accept clients"
+            )
+
+        if remote_address in self._clients:
+            raise ValueError(
+                f"client of {remote_address} is already added"
+            )
+
+        kwargs.setdefault('trace', self._trace)
+        kwargs.setdefault('loop', self._loop)
+
+        client = DeviceLinkClient(remote_address, **kwargs)
+        self._clients[remote_address] = client
+
+        if self._transport is not None:
+            self._attach(client)
+
+        return client
+
+    def _attach(self, client: DeviceLinkClient) -> None:
+        remote_address = client.remote_address
+        transport = _SharedTransport(
+            transport=self._transport,
+            remote_address=remote_address,
+            on_close=lambda: self._detach(remote_address),
+        )
+        client.connection_made(transport)
+
+    def _detach(self, remote_address: Address) -> None:
+        client = self._clients.pop(remote_address, None)
+
+        if client is not None:
+            client.connection_lost(None)
+
+        if self._do_close and not self._clients and self._transport:
+            self._transport.close()
+
+    def connection_made(self, transport) -> None:
+        LOG.debug("device link multiplexer transport was opened")
+
+        self._transport = transport
+
+        for client in list(self._clients.values()):
+            self._attach(client)
+
+        self._connected_ack.set_result(None)
+
+    def wait_connected(self) -> Awaitable[None]:
+        return self._connected_ack
+
+    def wait_closed(self) -> Awaitable[None]:
+        return self._closed_ack
+
+    def datagram_received(self, data: bytes, addr: Address) -> None:
+        client = self._clients.get(addr)
+
+        if client is None:
+            if self._trace:
+                LOG.warning(f"dat <-? unknown sender {addr}, skip")
+            return
+
+        client.datagram_received(data, addr)
+
+    def error_received(self, e) -> None:
+        # errors of unconnected sockets cannot be attributed to servers
+        LOG.error(f"device link multiplexer error: {e}")
+
+    def close(self) -> None:
+        """
+        Close all clients and the socket after they stop.
+
+        """
+        self._do_close = True
+
+        if self._transport is None:
+            self._clients.clear()
+            return
+
+        if not self._clients:
+            self._transport.close()
+            return
+
+        for client in list(self._clients.values()):
+            client.close()
+
+    def connection_lost(self, e: Exception=None) -> None:
+        for client in list(self._clients.values()):
+            client.connection_lost(e)
+
+        self._clients.clear()
+        self._closed_ack.set_result(e)
+
+        LOG.debug(
+            f"device link multiplexer transport was closed "
+            f"(details={e or 'N/A'})"
+        )
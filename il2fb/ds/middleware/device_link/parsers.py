@@ -1,15 +1,14 @@
 # coding: utf-8
 
-import re
-
 from il2fb.commons.spatial import Point2D, Point3D
 
+from . import records
 from . import structures
 from .constants import ACTOR_INDEX_SEPARATOR
 from .constants import ACTOR_DATA_SEPARATOR
 from .constants import STATIC_AIRCRAFT_WITH_HUMAN_SPAWNED_IN
 from .constants import HouseStatuses
-from .helpers import normalize_aircraft_id
+from .helpers import split_aircraft_id, split_ground_unit_id
 
 
 def preparse_actor_position(message: str) -> structures.PreparsedActorPosition:
@@ -21,20 +20,14 @@ def preparse_actor_position(message: str) -> structures.PreparsedActorPosition:
 def parse_moving_aircraft_position(
     item: structures.PreparsedActorPosition,
 ) -> structures.MovingAircraftPosition:
-    id, x, y, z = item.data.split(ACTOR_DATA_SEPARATOR)
-    normalized_id = normalize_aircraft_id(id)
-    is_human = (normalized_id != id)
+    index, data = item
+    id, x, y, z = data.split(ACTOR_DATA_SEPARATOR)
+    id, member_index, is_human = split_aircraft_id(id)
     pos = Point3D(float(x), float(y), float(z))
 
-    if is_human:
-        member_index = None
-    else:
-        normalized_id, member_index = normalized_id[:-1], normalized_id[-1:]
-        member_index = int(member_index)
-
     return structures.MovingAircraftPosition(
-        index=item.index,
-        id=normalized_id,
+        index=index,
+        id=id,
         is_human=is_human,
         member_index=member_index,
         pos=pos,
@@ -44,12 +37,12 @@ def parse_moving_aircraft_position(
 def parse_moving_ground_unit_position(
     item: structures.PreparsedActorPosition,
 ) -> structures.MovingGroundUnitPosition:
-    id, x, y, z = item.data.split(ACTOR_DATA_SEPARATOR)
-    id, member_index = re.match(r"(\d+_Chief)(\d+)", id).groups()
-    member_index = int(member_index)
+    index, data = item
+    id, x, y, z = data.split(ACTOR_DATA_SEPARATOR)
+    id, member_index = split_ground_unit_id(id)
     pos = Point3D(float(x), float(y), float(z))
     return structures.MovingGroundUnitPosition(
-        index=item.index,
+        index=index,
         id=id,
         member_index=member_index,
         pos=pos,
@@ -59,11 +52,12 @@ def parse_moving_ground_unit_position(
 def parse_ship_position(
     item: structures.PreparsedActorPosition,
 ) -> structures.ShipPosition:
-    id, x, y = item.data.split(ACTOR_DATA_SEPARATOR)
+    index, data = item
+    id, x, y = data.split(ACTOR_DATA_SEPARATOR)
     is_stationary = (id.endswith('_Static'))
     pos = Point2D(float(x), float(y))
     return structures.ShipPosition(
-        index=item.index,
+        index=index,
         id=id,
         is_stationary=is_stationary,
         pos=pos,
@@ -74,7 +68,7 @@ def parse_stationary_object_position(
     item: structures.PreparsedActorPosition,
 ) -> structures.StationaryObjectPosition:
 
-    data = item.data
+    index, data = item
 
     if data == STATIC_AIRCRAFT_WITH_HUMAN_SPAWNED_IN:
         return
@@ -83,7 +77,7 @@ def parse_stationary_object_position(
     pos = Point3D(float(x), float(y), float(z))
 
     return structures.StationaryObjectPosition(
-        index=item.index,
+        index=index,
         id=id,
         pos=pos,
     )
@@ -92,12 +86,67 @@ def parse_stationary_object_position(
 def parse_house_position(
     item: structures.PreparsedActorPosition,
 ) -> structures.HousePosition:
-    id, x, y, status = item.data.split(ACTOR_DATA_SEPARATOR)
+    index, data = item
+    id, x, y, status = data.split(ACTOR_DATA_SEPARATOR)
     status = HouseStatuses.get_by_value(status)
     pos = Point2D(float(x), float(y))
     return structures.HousePosition(
-        index=item.index,
+        index=index,
         id=id,
         pos=pos,
         status=status,
     )
+
+
+def parse_moving_aircraft_record(
+    item: structures.PreparsedActorPosition,
+) -> records.MovingAircraftRecord:
+    index, data = item
+    id, x, y, z = data.split(ACTOR_DATA_SEPARATOR)
+    id, member_index, is_human = split_aircraft_id(id)
+    return records.MovingAircraftRecord(
+        index, id, is_human, member_index, float(x), float(y), float(z),
+    )
+
+
+def parse_moving_ground_unit_record(
+    item: structures.PreparsedActorPosition,
+) -> records.MovingGroundUnitRecord:
+    index, data = item
+    id, x, y, z = data.split(ACTOR_DATA_SEPARATOR)
+    id, member_index = split_ground_unit_id(id)
+    return records.MovingGroundUnitRecord(
+        index, id, member_index, float(x), float(y), float(z),
+    )
+
+
+def parse_ship_record(
+    item: structures.PreparsedActorPosition,
+) -> records.ShipRecord:
+    index, data = item
+    id, x, y = data.split(ACTOR_DATA_SEPARATOR)
+    is_stationary = (id.endswith('_Static'))
+    return records.ShipRecord(index, id, is_stationary, float(x), float(y))
+
+
+def parse_stationary_object_record(
+    item: structures.PreparsedActorPosition,
+) -> records.StationaryObjectRecord:
+    index, data = item
+
+    if data == STATIC_AIRCRAFT_WITH_HUMAN_SPAWNED_IN:
+        return
+
+    id, x, y, z = data.split(ACTOR_DATA_SEPARATOR)
+    return records.StationaryObjectRecord(
+        index, id, float(x), float(y), float(z),
+    )
+
+
+def parse_house_record(
+    item: structures.PreparsedActorPosition,
+) -> records.HouseRecord:
+    index, data = item
+    id, x, y, status = data.split(ACTOR_DATA_SEPARATOR)
+    status = HouseStatuses.get_by_value(status)
+    return records.HouseRecord(index, id, float(x), float(y), status)
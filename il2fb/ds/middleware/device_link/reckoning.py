@@ -0,0 +1,192 @@
+# coding: utf-8
+
+import time
+
+from typing import Iterable, List, Optional, Union
+
+from il2fb.commons.structures import BaseStructure
+
+from .columns import check_numpy_is_available
+from .snapshots import ActorKey, ActorPositionItem
+from .snapshots import get_actor_coordinates, get_actor_key
+from .structures import TimedActorPositions
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+class EstimatedPositions(BaseStructure):
+    """
+    Estimated positions of tracked actors. Arrays are aligned with ``keys``.
+
+    """
+    __slots__ = ['keys', 'x', 'y', 'z', ]
+
+    def __init__(
+        self,
+        keys: List[ActorKey],
+        x: 'np.ndarray',
+        y: 'np.ndarray',
+        z: 'np.ndarray',
+    ):
+        self.keys = keys
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} ({len(self)} items)>"
+
+
+class DeadReckoner:
+    """
+    Estimate positions of actors of a category between polls.
+
+    Velocities are estimated from two consecutive observations of the same
+    actor using times of receiving of datagrams which contained them (see
+    ``timestamped`` argument of positions getters of ``DeviceLinkClient``).
+    Positions are extrapolated for at most ``horizon`` seconds after the last
+    observation. Z coordinates of 2D actors are equal to zero.
+
+    Observations are updated once per poll, while ``position_at()`` is
+    computed for all tracked actors at once and is meant to be called at
+    rendering rate.
+
+    Not thread-safe.
+
+    """
+
+    def __init__(
+        self,
+        horizon: float=2.0,
+        min_interval: float=0.05,
+    ):
+        check_numpy_is_available()
+
+        self.horizon = horizon
+        self.min_interval = min_interval
+
+        self._keys = []
+        self._slots = {}
+
+        self._t = np.empty(0, dtype=np.float64)
+        self._pos = np.empty((0, 3), dtype=np.float64)
+        self._vel = np.empty((0, 3), dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def keys(self) -> List[ActorKey]:
+        return self._keys
+
+    @property
+    def velocities(self) -> 'np.ndarray':
+        """
+        Estimated velocities in meters per second, shape is ``(n, 3)``.
+
+        """
+        return self._vel
+
+    def update(
+        self,
+        snapshot: Union[TimedActorPositions, Iterable[ActorPositionItem]],
+        received_at: Optional[float]=None,
+    ) -> None:
+        """
+        Observe a full snapshot of a category. Actors absent in the snapshot
+        stop being tracked.
+
+        If the snapshot is not timestamped, all its actors are treated as
+        received at ``received_at``, which defaults to the current monotonic
+        time.
+
+        """
+        if isinstance(snapshot, TimedActorPositions):
+            items = snapshot.items
+            receive_times = snapshot.receive_times
+        else:
+            items = snapshot
+            receive_times = {}
+
+        if received_at is None:
+            received_at = time.monotonic()
+
+        keys = []
+        slots = {}
+        previous_slots = []
+        t = []
+        pos = []
+
+        for item in items:
+            key = get_actor_key(item)
+
+            if key in slots:
+                continue
+
+            slots[key] = len(keys)
+            keys.append(key)
+            previous_slots.append(self._slots.get(key, -1))
+            t.append(receive_times.get(item.index, received_at))
+
+            coordinates = get_actor_coordinates(item)
+            if len(coordinates) == 2:
+                coordinates += (0.0, )
+
+            pos.append(coordinates)
+
+        count = len(keys)
+        t = np.array(t, dtype=np.float64)
+        pos = np.array(pos, dtype=np.float64).reshape(count, 3)
+        vel = np.zeros((count, 3), dtype=np.float64)
+
+        previous_slots = np.array(previous_slots, dtype=np.intp)
+        known = previous_slots >= 0
+
+        if known.any():
+            previous = previous_slots[known]
+            dt = t[known] - self._t[previous]
+            displacement = pos[known] - self._pos[previous]
+
+            fresh = dt >= self.min_interval
+            estimated = self._vel[previous]
+            estimated[fresh] = displacement[fresh] / dt[fresh, np.newaxis]
+
+            vel[known] = estimated
+
+        self._keys = keys
+        self._slots = slots
+        self._t = t
+        self._pos = pos
+        self._vel = vel
+
+    def position_at(self, t: Optional[float]=None) -> EstimatedPositions:
+        """
+        Estimate positions of all tracked actors at monotonic time ``t``,
+        which defaults to the current one.
+
+        """
+        if t is None:
+            t = time.monotonic()
+
+        dt = np.clip(t - self._t, 0.0, self.horizon)
+        pos = self._pos + self._vel * dt[:, np.newaxis]
+
+        return EstimatedPositions(
+            keys=self._keys,
+            x=pos[:, 0],
+            y=pos[:, 1],
+            z=pos[:, 2],
+        )
+
+    def reset(self) -> None:
+        self._keys = []
+        self._slots = {}
+        self._t = np.empty(0, dtype=np.float64)
+        self._pos = np.empty((0, 3), dtype=np.float64)
+        self._vel = np.empty((0, 3), dtype=np.float64)
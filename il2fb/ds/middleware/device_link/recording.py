@@ -0,0 +1,439 @@
+# coding: utf-8
+
+import logging
+import mmap
+import os
+import struct
+import time
+
+from typing import Iterable, Iterator, List, Optional, Union
+
+from il2fb.commons.structures import BaseStructure
+
+from .columns import ActorPositionsColumns, check_numpy_is_available
+from .constants import ActorCategory, ActorCategories, HouseStatuses
+from .exceptions import DeviceLinkError
+from .snapshots import ActorPositionItem, get_actor_coordinates
+from .structures import TimedActorPositions
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+LOG = logging.getLogger(__name__)
+
+
+FILE_MAGIC = b'IL2FBDLS'
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct('<8sHH4x')
+
+CHUNK_MAGIC = b'SNAP'
+CHUNK_HEADER = struct.Struct('<4sB3xIIId4x')
+
+FLAG_IS_HUMAN = 1
+FLAG_IS_STATIONARY = 2
+FLAG_IS_ALIVE = 4
+
+NO_MEMBER_INDEX = -1
+
+CATEGORIES = list(ActorCategories.iterconstants())
+CATEGORY_CODES = {category: i for i, category in enumerate(CATEGORIES)}
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([
+        ('index', '<i4'),
+        ('id', '<i4'),
+        ('member_index', '<i2'),
+        ('flags', 'u1'),
+        ('reserved', 'u1'),
+        ('x', '<f4'),
+        ('y', '<f4'),
+        ('z', '<f4'),
+    ])
+else:  # pragma: no cover
+    RECORD_DTYPE = None
+
+Snapshot = Union[
+    Iterable[ActorPositionItem],
+    ActorPositionsColumns,
+    TimedActorPositions,
+]
+
+
+def _pad(size: int, alignment: int=8) -> int:
+    return -size % alignment
+
+
+class SnapshotRecorder:
+    """
+    Append snapshots of actors to a binary file. An incomplete chunk at the
+    end of an existing file is dropped before appending. Existing files
+    which are not recordings are not overwritten.
+
+    Every snapshot is written as a chunk: a fixed header with time,
+    category and number of records, IDs which were not seen in the file
+    before, and an array of fixed-size records (see ``RECORD_DTYPE``). IDs
+    are dictionary-encoded for the whole file and coordinates are stored as
+    float32. Member indices which are not applicable are equal to ``-1``.
+
+    Not thread-safe.
+
+    """
+
+    def __init__(self, path: str):
+        check_numpy_is_available()
+
+        self.path = path
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+
+        if 0 < size < FILE_HEADER.size:
+            raise DeviceLinkError(f"file '{path}' is not a recording")
+
+        if size:
+            with SnapshotReader(path) as reader:
+                self._ids = {id: i for i, id in enumerate(reader.ids)}
+                end = reader.end
+
+            # drop a chunk which was left incomplete, e.g. by a crash
+            self._file = open(path, 'r+b')
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._ids = {}
+            self._file = open(path, 'wb')
+            self._file.write(FILE_HEADER.pack(
+                FILE_MAGIC, FILE_VERSION, RECORD_DTYPE.itemsize,
+            ))
+
+    def __enter__(self) -> 'SnapshotRecorder':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def record(
+        self,
+        category: ActorCategory,
+        snapshot: Snapshot,
+        timestamp: Optional[float]=None,
+    ) -> int:
+        """
+        Append a snapshot of a category. Time defaults to the current one.
+        Returns number of written records.
+
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        if isinstance(snapshot, TimedActorPositions):
+            snapshot = snapshot.items
+
+        new_ids = []
+
+        if isinstance(snapshot, ActorPositionsColumns):
+            records = self._encode_columns(snapshot, new_ids)
+        else:
+            records = self._encode_items(snapshot, new_ids)
+
+        ids_blob = '\n'.join(new_ids).encode() if new_ids else b''
+        ids_blob += b'\0' * _pad(len(ids_blob))
+
+        self._file.write(CHUNK_HEADER.pack(
+            CHUNK_MAGIC,
+            CATEGORY_CODES[category],
+            len(records),
+            len(new_ids),
+            len(ids_blob),
+            timestamp,
+        ))
+        self._file.write(ids_blob)
+        self._file.write(records.tobytes())
+
+        return len(records)
+
+    def _encode_id(self, id: str, new_ids: List[str]) -> int:
+        code = self._ids.get(id)
+
+        if code is None:
+            code = self._ids[id] = len(self._ids)
+            new_ids.append(id)
+
+        return code
+
+    def _encode_items(
+        self,
+        items: Iterable[ActorPositionItem],
+        new_ids: List[str],
+    ) -> 'np.ndarray':
+
+        items = list(items)
+        records = np.zeros(len(items), dtype=RECORD_DTYPE)
+
+        rows = []
+
+        for item in items:
+            coordinates = get_actor_coordinates(item)
+            member_index = getattr(item, 'member_index', None)
+            flags = 0
+
+            if getattr(item, 'is_human', False):
+                flags |= FLAG_IS_HUMAN
+
+            if getattr(item, 'is_stationary', False):
+                flags |= FLAG_IS_STATIONARY
+
+            if getattr(item, 'status', None) == HouseStatuses.alive:
+                flags |= FLAG_IS_ALIVE
+
+            rows.append((
+                item.index,
+                self._encode_id(item.id, new_ids),
+                NO_MEMBER_INDEX if member_index is None else member_index,
+                flags,
+                0,
+                coordinates[0],
+                coordinates[1],
+                coordinates[2] if len(coordinates) > 2 else 0.0,
+            ))
+
+        if rows:
+            records[:] = rows
+
+        return records
+
+    def _encode_columns(
+        self,
+        columns: ActorPositionsColumns,
+        new_ids: List[str],
+    ) -> 'np.ndarray':
+
+        count = len(columns)
+        records = np.zeros(count, dtype=RECORD_DTYPE)
+
+        codes = np.array(
+            [self._encode_id(id, new_ids) for id in columns.id_values],
+            dtype=np.int32,
+        )
+
+        records['index'] = columns.index
+        records['id'] = codes[columns.id_codes] if count else []
+        records['x'] = columns.x
+        records['y'] = columns.y
+
+        if columns.z is not None:
+            records['z'] = columns.z
+
+        if columns.member_index is not None:
+            records['member_index'] = columns.member_index
+        else:
+            records['member_index'] = NO_MEMBER_INDEX
+
+        flags = records['flags']
+
+        if columns.is_human is not None:
+            flags |= columns.is_human.astype(np.uint8) * FLAG_IS_HUMAN
+            records['member_index'][columns.is_human] = NO_MEMBER_INDEX
+
+        if columns.is_stationary is not None:
+            is_stationary = columns.is_stationary.astype(np.uint8)
+            flags |= is_stationary * FLAG_IS_STATIONARY
+
+        if columns.is_alive is not None:
+            flags |= columns.is_alive.astype(np.uint8) * FLAG_IS_ALIVE
+
+        return records
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class RecordedSnapshot(BaseStructure):
+    """
+    Snapshot read from a file. ``records`` is a view of the file.
+
+    """
+    __slots__ = ['timestamp', 'category', 'records', ]
+
+    def __init__(
+        self,
+        timestamp: float,
+        category: ActorCategory,
+        records: 'np.ndarray',
+    ):
+        self.timestamp = timestamp
+        self.category = category
+        self.records = records
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} "
+            f"({self.category.name}, {len(self.records)} records)>"
+        )
+
+
+class SnapshotReader:
+    """
+    Read snapshots written by ``SnapshotRecorder`` via ``mmap``.
+
+    Opening scans chunk headers and IDs only, records are accessed as
+    NumPy views of mapped memory and are not copied. Views must be released
+    before the reader is closed. Reading stops at the first incomplete or
+    invalid chunk, ``end`` is the offset where it stops.
+
+    """
+
+    def __init__(self, path: str):
+        check_numpy_is_available()
+
+        self.path = path
+        self._file = open(path, 'rb')
+
+        try:
+            self._mmap = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ,
+            )
+        except ValueError:
+            self._file.close()
+            raise DeviceLinkError(f"file '{path}' is empty")
+
+        self.ids = []
+
+        offsets = []
+        timestamps = []
+        categories = []
+        counts = []
+
+        try:
+            self._read_file_header()
+        except Exception:
+            self.close()
+            raise
+
+        self.end = FILE_HEADER.size
+
+        for offset, header in self._iter_chunk_headers():
+            magic, category, count, ids_count, ids_size, timestamp = header
+            ids_offset = offset + CHUNK_HEADER.size
+
+            if ids_count:
+                blob = self._mmap[ids_offset:ids_offset + ids_size]
+                self.ids.extend(blob.rstrip(b'\0').decode().split('\n'))
+
+            offsets.append(ids_offset + ids_size)
+            timestamps.append(timestamp)
+            categories.append(category)
+            counts.append(count)
+
+            self.end = offsets[-1] + count * RECORD_DTYPE.itemsize
+
+        self._offsets = np.array(offsets, dtype=np.int64)
+        self._timestamps = np.array(timestamps, dtype=np.float64)
+        self._categories = np.array(categories, dtype=np.uint8)
+        self._counts = np.array(counts, dtype=np.int64)
+
+    def __enter__(self) -> 'SnapshotReader':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    @property
+    def timestamps(self) -> 'np.ndarray':
+        return self._timestamps
+
+    def _read_file_header(self) -> None:
+        if len(self._mmap) < FILE_HEADER.size:
+            raise DeviceLinkError(f"file '{self.path}' is not a recording")
+
+        magic, version, record_size = FILE_HEADER.unpack_from(self._mmap, 0)
+
+        if magic != FILE_MAGIC:
+            raise DeviceLinkError(f"file '{self.path}' is not a recording")
+
+        if version != FILE_VERSION or record_size != RECORD_DTYPE.itemsize:
+            raise DeviceLinkError(
+                f"unsupported recording version {version} "
+                f"(record size={record_size})"
+            )
+
+    def _iter_chunk_headers(self) -> Iterator[tuple]:
+        offset = FILE_HEADER.size
+        size = len(self._mmap)
+
+        while offset + CHUNK_HEADER.size <= size:
+            header = CHUNK_HEADER.unpack_from(self._mmap, offset)
+
+            if header[0] != CHUNK_MAGIC:
+                LOG.warning(
+                    f"invalid chunk at offset {offset} of '{self.path}', "
+                    f"stop reading"
+                )
+                break
+
+            count, ids_size = header[2], header[4]
+            end = (
+                offset
+                + CHUNK_HEADER.size
+                + ids_size
+                + count * RECORD_DTYPE.itemsize
+            )
+
+            if end > size:
+                # the last chunk is being written or was left incomplete
+                break
+
+            yield offset, header
+            offset = end
+
+    def get_snapshot(self, i: int) -> RecordedSnapshot:
+        records = np.frombuffer(
+            self._mmap,
+            dtype=RECORD_DTYPE,
+            count=int(self._counts[i]),
+            offset=int(self._offsets[i]),
+        )
+        return RecordedSnapshot(
+            timestamp=float(self._timestamps[i]),
+            category=CATEGORIES[self._categories[i]],
+            records=records,
+        )
+
+    def query(
+        self,
+        start: Optional[float]=None,
+        end: Optional[float]=None,
+        category: Optional[ActorCategory]=None,
+    ) -> List[RecordedSnapshot]:
+        """
+        Get snapshots within time range ``[start, end]``, optionally of a
+        single category only.
+
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        if start is not None:
+            mask &= self._timestamps >= start
+
+        if end is not None:
+            mask &= self._timestamps <= end
+
+        if category is not None:
+            mask &= self._categories == CATEGORY_CODES[category]
+
+        return [self.get_snapshot(i) for i in np.flatnonzero(mask).tolist()]
+
+    def get_ids(self, records: 'np.ndarray') -> List[str]:
+        ids = self.ids
+        return [ids[code] for code in records['id'].tolist()]
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
@@ -0,0 +1,125 @@
+# coding: utf-8
+
+from collections import namedtuple
+
+from il2fb.commons.spatial import Point2D, Point3D
+from il2fb.commons.structures import BaseStructure
+
+from . import structures
+
+
+class ActorPositionRecord:
+    """
+    Lightweight tuple-backed counterpart of ActorPosition.
+
+    Coordinates are stored as plain floats and points are constructed only
+    when ``pos`` is accessed.
+
+    """
+    __slots__ = ()
+
+    structure_class = None
+
+    @property
+    def pos(self):
+        raise NotImplementedError
+
+    def _pos_to_primitive(self) -> dict:
+        raise NotImplementedError
+
+    def to_primitive(self, context=None) -> dict:
+        primitive = {}
+
+        for key in self.structure_class.__slots__:
+            if key == 'pos':
+                value = self._pos_to_primitive()
+            else:
+                value = getattr(self, key)
+                value = BaseStructure._to_primitive(value, context)
+
+            primitive[key] = value
+
+        return primitive
+
+    def to_structure(self) -> structures.ActorPosition:
+        return self.structure_class(**{
+            key: getattr(self, key)
+            for key in self.structure_class.__slots__
+        })
+
+
+class Actor2DPositionRecord(ActorPositionRecord):
+    __slots__ = ()
+
+    @property
+    def pos(self) -> Point2D:
+        return Point2D(self.x, self.y)
+
+    def _pos_to_primitive(self) -> dict:
+        return {'x': self.x, 'y': self.y}
+
+
+class Actor3DPositionRecord(ActorPositionRecord):
+    __slots__ = ()
+
+    @property
+    def pos(self) -> Point3D:
+        return Point3D(self.x, self.y, self.z)
+
+    def _pos_to_primitive(self) -> dict:
+        return {'x': self.x, 'y': self.y, 'z': self.z}
+
+
+class MovingAircraftRecord(
+    Actor3DPositionRecord,
+    namedtuple(
+        'MovingAircraftRecord',
+        ['index', 'id', 'is_human', 'member_index', 'x', 'y', 'z'],
+    ),
+):
+    __slots__ = ()
+    structure_class = structures.MovingAircraftPosition
+
+
+class MovingGroundUnitRecord(
+    Actor3DPositionRecord,
+    namedtuple(
+        'MovingGroundUnitRecord',
+        ['index', 'id', 'member_index', 'x', 'y', 'z'],
+    ),
+):
+    __slots__ = ()
+    structure_class = structures.MovingGroundUnitPosition
+
+
+class ShipRecord(
+    Actor2DPositionRecord,
+    namedtuple(
+        'ShipRecord',
+        ['index', 'id', 'is_stationary', 'x', 'y'],
+    ),
+):
+    __slots__ = ()
+    structure_class = structures.ShipPosition
+
+
+class StationaryObjectRecord(
+    Actor3DPositionRecord,
+    namedtuple(
+        'StationaryObjectRecord',
+        ['index', 'id', 'x', 'y', 'z'],
+    ),
+):
+    __slots__ = ()
+    structure_class = structures.StationaryObjectPosition
+
+
+class HouseRecord(
+    Actor2DPositionRecord,
+    namedtuple(
+        'HouseRecord',
+        ['index', 'id', 'x', 'y', 'status'],
+    ),
+):
+    __slots__ = ()
+    structure_class = structures.HousePosition
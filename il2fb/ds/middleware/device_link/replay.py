@@ -0,0 +1,116 @@
+# coding: utf-8
+
+import asyncio
+import collections
+import logging
+
+from typing import Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+from il2fb.ds.middleware.capture import CapturedRecord
+
+from .capture import read_capture
+from .constants import DatagramDirections
+
+
+LOG = logging.getLogger(__name__)
+
+
+Address = Tuple[str, int]
+Answers = List[Tuple[float, bytes]]
+
+
+class DeviceLinkReplayServer(asyncio.DatagramProtocol):
+    """
+    Local stand-in of Device Link of a server which answers requests from a
+    capture made by ``DatagramCapture``.
+
+    Datagrams received after a request and before the next one are treated
+    as its answers. Repeated requests get recorded answers in the order of
+    capture, starting over after the last one. Answers are delayed as they
+    were during capture divided by ``speed``, or are sent immediately if
+    ``speed`` is ``None``. Unknown requests are not answered.
+
+    Usage::
+
+        server = DeviceLinkReplayServer('session.dlc', speed=None)
+        await loop.create_datagram_endpoint(
+            lambda: server, local_addr=('127.0.0.1', 10000),
+        )
+
+    """
+
+    def __init__(
+        self,
+        capture: Union[str, Iterable[CapturedRecord]],
+        speed: Optional[float]=1.0,
+        loop: asyncio.AbstractEventLoop=None,
+    ):
+        if isinstance(capture, str):
+            capture = read_capture(capture)
+
+        self._loop = loop
+        self._speed = speed
+        self._answers = self._pair_answers(capture)
+
+        self._transport = None
+        self.requests_count = 0
+        self.unknown_requests_count = 0
+
+    @staticmethod
+    def _pair_answers(
+        capture: Iterable[CapturedRecord],
+    ) -> Dict[bytes, Deque[Answers]]:
+
+        result = collections.defaultdict(collections.deque)
+        answers = None
+        sent_at = None
+
+        for datagram in capture:
+            if datagram.direction == DatagramDirections.sent:
+                answers = []
+                sent_at = datagram.timestamp
+                result[datagram.data].append(answers)
+            elif answers is not None:
+                delay = max(datagram.timestamp - sent_at, 0.0)
+                answers.append((delay, datagram.data))
+
+        return dict(result)
+
+    def connection_made(self, transport) -> None:
+        self._transport = transport
+
+    def datagram_received(self, data: bytes, addr: Address) -> None:
+        self.requests_count += 1
+        queue = self._answers.get(data)
+
+        if queue is None:
+            self.unknown_requests_count += 1
+            LOG.warning(f"unknown request {repr(data)}, skip")
+            return
+
+        answers = queue[0]
+        queue.rotate(-1)
+
+        loop = self._loop or asyncio.get_event_loop()
+
+        for delay, answer in answers:
+            if self._speed:
+                loop.call_later(
+                    delay / self._speed, self._send, answer, addr,
+                )
+            else:
+                self._send(answer, addr)
+
+    def _send(self, data: bytes, addr: Address) -> None:
+        if self._transport is not None and not self._transport.is_closing():
+            self._transport.sendto(data, addr)
+
+    def error_received(self, e) -> None:
+        LOG.error(f"device link replay server error: {e}")
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+    def connection_lost(self, e: Exception=None) -> None:
+        self._transport = None
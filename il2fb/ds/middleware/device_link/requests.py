@@ -1,19 +1,38 @@
 # coding: utf-8
 
 import asyncio
+import collections
+import concurrent.futures
 import logging
-import operator
 import time
 
-from typing import List, Awaitable, Callable, Any, Optional, Iterable
+from typing import (
+    List, Awaitable, Callable, Any, Optional, Iterable, Iterator, Tuple, Union,
+    AsyncIterator,
+)
 
+from il2fb.ds.middleware.device_link import columns
 from il2fb.ds.middleware.device_link import messages as msg
 from il2fb.ds.middleware.device_link import parsers
+from il2fb.ds.middleware.device_link import records
+from il2fb.ds.middleware.device_link import structures
+from il2fb.ds.middleware.device_link.constants import ACTOR_DATA_SEPARATOR
+from il2fb.ds.middleware.device_link.constants import HOUSE_STATUS_ALIVE
+from il2fb.ds.middleware.device_link.constants import HOUSE_STATUS_DEAD
+from il2fb.ds.middleware.device_link.constants import HOUSE_STATUS_UNKNOWN
+from il2fb.ds.middleware.device_link.constants import HouseStatuses
 from il2fb.ds.middleware.device_link.constants import MESSAGE_GROUP_MAX_SIZE
+from il2fb.ds.middleware.device_link.constants import MESSAGE_SEPARATOR
+from il2fb.ds.middleware.device_link.constants import REQUEST_PREFIX
+from il2fb.ds.middleware.device_link.constants import PositionsFormat
+from il2fb.ds.middleware.device_link.constants import PositionsFormats
 from il2fb.ds.middleware.device_link.filters import actor_index_is_valid
 from il2fb.ds.middleware.device_link.filters import actor_status_is_valid
+from il2fb.ds.middleware.device_link.helpers import compose_positions_requests
 from il2fb.ds.middleware.device_link.helpers import compose_request
 from il2fb.ds.middleware.device_link.helpers import decompose_data
+from il2fb.ds.middleware.device_link.helpers import scan_actor_positions
+from il2fb.ds.middleware.device_link.rtt import RTTEstimator
 from il2fb.ds.middleware.text import plural_noun, truncate
 
 
@@ -21,6 +40,7 @@ LOG = logging.getLogger(__name__)
 
 
 class DeviceLinkRequest:
+    supports_rtt_estimation = True
 
     def __init__(
         self,
@@ -42,6 +62,7 @@ class DeviceLinkRequest:
 
         self._start_time = None
         self._timeout = timeout
+        self._rtt_estimator = None
 
         self._continue_event = asyncio.Event(loop=loop)
         self._continue_event.set()
@@ -52,10 +73,14 @@ class DeviceLinkRequest:
     async def execute(
         self,
         writer: Callable[[bytes], None],
+        rtt_estimator: Optional[RTTEstimator]=None,
     ) -> Awaitable[None]:
 
         LOG.debug("device link request execution start")
 
+        if self.supports_rtt_estimation:
+            self._rtt_estimator = rtt_estimator
+
         try:
             future = self._execute(writer)
 
@@ -66,12 +91,16 @@ class DeviceLinkRequest:
                     loop=self._loop,
                 )
 
-            await future
+            is_complete = await future
+        except (TimeoutError, asyncio.TimeoutError) as e:
+            await self._on_timeout(e)
         except Exception as e:
-            if self._future.done():
-                LOG.exception("failed to execute device link request")
-            else:
-                self._future.set_exception(e)
+            self._on_exception(e)
+        else:
+            # timeout covers receiving only, so received data is not lost
+            # because of slow extraction
+            if is_complete:
+                await self._resolve()
         finally:
             execution_time = time.monotonic() - self._start_time
             LOG.debug(
@@ -79,25 +108,39 @@ class DeviceLinkRequest:
                 .format(execution_time)
             )
 
+    async def _on_timeout(self, e: Exception) -> Awaitable[None]:
+        self._on_exception(e)
+
+    def _on_exception(self, e: Exception) -> None:
+        if self._future.done():
+            LOG.exception("failed to execute device link request")
+        else:
+            self._future.set_exception(e)
+
     async def _execute(
         self,
         writer: Callable[[bytes], None],
-    ) -> Awaitable[None]:
+    ) -> Awaitable[bool]:
         self._start_time = time.monotonic()
 
-        messages = self._request_messages
-        messages_total_count = len(messages)
+        messages_total_count = self._count_messages()
         messages_sent_count = 0
+        rtt_estimator = self._rtt_estimator
 
-        for group in self._group_messages(messages):
-            data = compose_request(group)
-            group_requires_response = self._messages_require_response(group)
-
+        for data, group_requires_response, count in self._iter_datagrams():
             future = self._continue_event.wait()
 
             if group_requires_response:
+                if rtt_estimator is not None and messages_sent_count:
+                    await self._pace(rtt_estimator)
+
                 self._continue_event.clear()
+                sent_at = time.monotonic()
                 writer(data)
+
+                if rtt_estimator is not None:
+                    future = self._wait_group(future, rtt_estimator)
+
                 future = self._maybe_wrap_with_timeout(future)
             else:
                 writer(data)
@@ -108,7 +151,10 @@ class DeviceLinkRequest:
             if self._future.done():
                 break
 
-            messages_sent_count += len(group)
+            if group_requires_response and rtt_estimator is not None:
+                rtt_estimator.update(time.monotonic() - sent_at)
+
+            messages_sent_count += count
 
             LOG.debug(
                 f"msg count: {messages_sent_count} out of "
@@ -117,11 +163,53 @@ class DeviceLinkRequest:
 
         if (messages_sent_count != messages_total_count):
             LOG.debug("device link request was aborted")
-        elif self._request_requires_response:
-            result = self._extract_result(self._response_messages)
-            self._future.set_result(result)
+            return False
+
+        return True
+
+    async def _resolve(self) -> Awaitable[None]:
+        if not self._request_requires_response:
+            if not self._future.done():
+                self._future.set_result(None)
+            return
+
+        try:
+            result = await self._extract_result_async(self._response_messages)
+        except Exception as e:
+            self._on_exception(e)
         else:
-            self._future.set_result(None)
+            if not self._future.done():
+                self._future.set_result(result)
+
+    async def _pace(self, rtt_estimator: RTTEstimator) -> None:
+        delay = rtt_estimator.get_pacing_delay()
+
+        if delay:
+            LOG.debug(f"pause before next group: {delay:.6f} s")
+            await asyncio.sleep(delay, loop=self._loop)
+
+    async def _wait_group(
+        self,
+        future: Awaitable[Any],
+        rtt_estimator: RTTEstimator,
+    ) -> None:
+        try:
+            await asyncio.wait_for(future, rtt_estimator.rto, loop=self._loop)
+        except asyncio.TimeoutError:
+            LOG.debug(
+                f"group was not answered within {rtt_estimator.rto:.6f} s"
+            )
+            rtt_estimator.backoff()
+            raise
+
+    def _count_messages(self) -> int:
+        return len(self._request_messages)
+
+    def _iter_datagrams(self) -> Iterator[Tuple[bytes, bool, int]]:
+        for group in self._group_messages(self._request_messages):
+            data = compose_request(group)
+            group_requires_response = self._messages_require_response(group)
+            yield data, group_requires_response, len(group)
 
     @staticmethod
     def _messages_require_response(
@@ -155,7 +243,7 @@ class DeviceLinkRequest:
 
     def data_received(self, data: bytes) -> None:
         try:
-            messages = decompose_data(data)
+            messages = self._decompose_data(data)
         except Exception:
             LOG.exception(f"failed to decompose data {repr(data)}")
         else:
@@ -169,6 +257,10 @@ class DeviceLinkRequest:
 
         self._continue_event.set()
 
+    @staticmethod
+    def _decompose_data(data: bytes) -> List[Any]:
+        return decompose_data(data)
+
     def set_exception(self, e: Exception=None) -> None:
         if not self._future.done():
             self._future.set_exception(e)
@@ -178,13 +270,19 @@ class DeviceLinkRequest:
     def _extract_result(self, messages: List[msg.DeviceLinkMessage]) -> Any:
         return messages
 
+    async def _extract_result_async(
+        self,
+        messages: List[msg.DeviceLinkMessage],
+    ) -> Awaitable[Any]:
+        return self._extract_result(messages)
+
     def __str__(self) -> str:
         s = compose_request(self._request_messages).decode()
         return truncate(s, max_length=200)
 
     def __repr__(self) -> str:
         value = str(self)
-        count = len(self._request_messages)
+        count = self._count_messages()
         message_noun = plural_noun("message", count)
         return (
             f"<{self.__class__.__name__} "
@@ -229,31 +327,294 @@ class PositionsRequestMixin:
     def item_parser(self):
         raise NotImplementedError
 
+    @property
+    def record_parser(self):
+        raise NotImplementedError
+
+    @property
+    def columns_builder(self):
+        raise NotImplementedError
+
     def __init__(
         self,
         indices: Iterable[int],
         loop: asyncio.AbstractEventLoop=None,
         timeout: Optional[float]=None,
+        partial: bool=False,
+        result_format: PositionsFormat=PositionsFormats.structures,
+        timestamped: bool=False,
+        executor: Optional[concurrent.futures.Executor]=None,
+        chunk_size: Optional[int]=None,
         trace: bool=False,
     ):
-        messages = [
-            self.request_message_class(value=i) for i in indices
-        ]
+        if result_format == PositionsFormats.columns:
+            columns.check_numpy_is_available()
+
+        self._partial = partial
+        self._result_format = result_format
+        self._receive_times = {} if timestamped else None
+        self._executor = executor
+        self._chunk_size = chunk_size
+
+        if not (isinstance(indices, range) and indices.step == 1):
+            indices = list(indices)
+
+        self._indices = indices
+
+        # request messages are not built: datagrams are composed directly
         super().__init__(
             loop=loop,
-            messages=messages,
+            messages=[],
             timeout=timeout,
             trace=trace,
         )
+        self._request_requires_response = bool(indices)
+
+    @classmethod
+    def make_empty_result(
+        cls,
+        result_format: PositionsFormat=PositionsFormats.structures,
+        timestamped: bool=False,
+        partial: bool=False,
+    ) -> Union[
+        List[structures.ActorPosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+        structures.PartialActorPositions,
+        structures.TimedActorPositions,
+    ]:
+
+        if result_format == PositionsFormats.columns:
+            columns.check_numpy_is_available()
+            result = cls.columns_builder([])
+        else:
+            result = []
 
-    def _extract_result(self, messages: List[msg.DeviceLinkMessage]) -> None:
-        items = map(operator.attrgetter('value'), messages)
-        items = map(parsers.preparse_actor_position, items)
-        items = filter(actor_index_is_valid, items)
-        items = filter(actor_status_is_valid, items)
-        items = map(self.__class__.item_parser, items)
-        items = filter(bool, items)
-        return list(items)
+        if timestamped:
+            result = structures.TimedActorPositions(
+                items=result,
+                receive_times={},
+            )
+
+        if partial:
+            result = structures.PartialActorPositions(
+                items=result,
+                missing_indices=[],
+            )
+
+        return result
+
+    async def _resolve(self) -> Awaitable[None]:
+        if not self._partial:
+            await super()._resolve()
+            return
+
+        # result type does not depend on timeouts
+        try:
+            result = await self._extract_partial_result_async(
+                self._response_messages,
+            )
+        except Exception as e:
+            self._on_exception(e)
+        else:
+            if not self._future.done():
+                self._future.set_result(result)
+
+    async def _on_timeout(self, e: Exception) -> Awaitable[None]:
+        if not self._partial or self._future.done():
+            await super()._on_timeout(e)
+            return
+
+        try:
+            result = await self._extract_partial_result_async(
+                self._response_messages,
+            )
+        except Exception as e:
+            self._on_exception(e)
+        else:
+            LOG.debug(
+                f"device link request timed out, resolve partial result "
+                f"(missing {len(result.missing_indices)} out of "
+                f"{len(self._indices)})"
+            )
+            self._future.set_result(result)
+
+    def _count_messages(self) -> int:
+        return len(self._indices)
+
+    def _iter_datagrams(self) -> Iterator[Tuple[bytes, bool, int]]:
+        datagrams = compose_positions_requests(
+            opcode=self.request_message_class.opcode,
+            indices=self._indices,
+        )
+        for data, count in datagrams:
+            yield data, True, count
+
+    @staticmethod
+    def _decompose_data(
+        data: bytes,
+    ) -> List[structures.PreparsedActorPosition]:
+        return scan_actor_positions(data)
+
+    def data_received(self, data: bytes) -> None:
+        if self._receive_times is None:
+            super().data_received(data)
+            return
+
+        received_at = time.monotonic()
+        start = len(self._response_messages)
+
+        super().data_received(data)
+
+        receive_times = self._receive_times
+        for index, value in self._response_messages[start:]:
+            receive_times[index] = received_at
+
+    def __str__(self) -> str:
+        datagrams = compose_positions_requests(
+            opcode=self.request_message_class.opcode,
+            indices=self._indices,
+        )
+        s = REQUEST_PREFIX + MESSAGE_SEPARATOR.join(
+            data[len(REQUEST_PREFIX):] for data, count in datagrams
+        )
+        return truncate(s.decode(), max_length=200)
+
+    def _extract_result(
+        self,
+        items: List[structures.PreparsedActorPosition],
+    ) -> Union[
+        List[structures.ActorPosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+        structures.TimedActorPositions,
+    ]:
+
+        return self._wrap_result(self._extract_items(items))
+
+    async def _extract_result_async(
+        self,
+        items: List[structures.PreparsedActorPosition],
+    ) -> Awaitable[Union[
+        List[structures.ActorPosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+        structures.TimedActorPositions,
+    ]]:
+        """
+        Extract result without blocking the event loop for long: either in
+        an executor or in chunks with switching to other coroutines between
+        them.
+
+        """
+        if self._executor is not None:
+            loop = self._loop or asyncio.get_event_loop()
+            result = await loop.run_in_executor(
+                self._executor,
+                self.__class__.extract_items,
+                items,
+                self._result_format,
+            )
+        elif (
+            self._chunk_size
+            and self._result_format != PositionsFormats.columns
+        ):
+            result = []
+            chunk_size = self._chunk_size
+
+            for start in range(0, len(items), chunk_size):
+                chunk = items[start:start + chunk_size]
+                result.extend(self._extract_items(chunk))
+                await asyncio.sleep(0, loop=self._loop)
+        else:
+            return self._extract_result(items)
+
+        return self._wrap_result(result)
+
+    def _wrap_result(
+        self,
+        result: Union[
+            List[structures.ActorPosition],
+            List[records.ActorPositionRecord],
+            columns.ActorPositionsColumns,
+        ],
+    ) -> Union[
+        List[structures.ActorPosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+        structures.TimedActorPositions,
+    ]:
+
+        if self._receive_times is None:
+            return result
+
+        return structures.TimedActorPositions(
+            items=result,
+            receive_times=self._receive_times,
+        )
+
+    def _extract_items(
+        self,
+        items: List[structures.PreparsedActorPosition],
+    ) -> Union[
+        List[structures.ActorPosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+    ]:
+        return self.__class__.extract_items(items, self._result_format)
+
+    @classmethod
+    def extract_items(
+        cls,
+        items: List[structures.PreparsedActorPosition],
+        result_format: PositionsFormat=PositionsFormats.structures,
+    ) -> Union[
+        List[structures.ActorPosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+    ]:
+        """
+        Parse answered positions. Depends on arguments only, so can be run in
+        a process pool.
+
+        """
+        if result_format == PositionsFormats.columns:
+            items = [
+                item for item in items
+                if actor_index_is_valid(item) and actor_status_is_valid(item)
+            ]
+            return cls.columns_builder(items)
+
+        parser = (
+            cls.record_parser
+            if result_format == PositionsFormats.records
+            else cls.item_parser
+        )
+        results = []
+
+        for item in items:
+            if actor_index_is_valid(item) and actor_status_is_valid(item):
+                result = parser(item)
+
+                if result:
+                    results.append(result)
+
+        return results
+
+    async def _extract_partial_result_async(
+        self,
+        items: List[structures.PreparsedActorPosition],
+    ) -> Awaitable[structures.PartialActorPositions]:
+
+        answered_indices = {index for index, data in items}
+        missing_indices = [
+            i for i in self._indices
+            if i not in answered_indices
+        ]
+        return structures.PartialActorPositions(
+            items=await self._extract_result_async(items),
+            missing_indices=missing_indices,
+        )
 
 
 class RefreshRadarRequest(DeviceLinkRequest):
@@ -284,6 +645,8 @@ class GetMovingAircraftsPositionsRequest(
 ):
     request_message_class = msg.MovingAircraftPositionRequestMessage
     item_parser = parsers.parse_moving_aircraft_position
+    record_parser = parsers.parse_moving_aircraft_record
+    columns_builder = columns.make_moving_aircrafts_columns
 
 
 class GetMovingGroundUnitsCountRequest(
@@ -299,6 +662,8 @@ class GetMovingGroundUnitsPositionsRequest(
 ):
     request_message_class = msg.MovingGroundUnitPositionRequestMessage
     item_parser = parsers.parse_moving_ground_unit_position
+    record_parser = parsers.parse_moving_ground_unit_record
+    columns_builder = columns.make_moving_ground_units_columns
 
 
 class GetShipsCountRequest(CountingRequestMixin, DeviceLinkRequest):
@@ -308,6 +673,8 @@ class GetShipsCountRequest(CountingRequestMixin, DeviceLinkRequest):
 class GetShipsPositionsRequest(PositionsRequestMixin, DeviceLinkRequest):
     request_message_class = msg.ShipPositionRequestMessage
     item_parser = parsers.parse_ship_position
+    record_parser = parsers.parse_ship_record
+    columns_builder = columns.make_ships_columns
 
 
 class GetStationaryObjectsCountRequest(
@@ -323,6 +690,8 @@ class GetStationaryObjectsPositionsRequest(
 ):
     request_message_class = msg.StationaryObjectPositionRequestMessage
     item_parser = parsers.parse_stationary_object_position
+    record_parser = parsers.parse_stationary_object_record
+    columns_builder = columns.make_stationary_objects_columns
 
 
 class GetHousesCountRequest(CountingRequestMixin, DeviceLinkRequest):
@@ -332,3 +701,165 @@ class GetHousesCountRequest(CountingRequestMixin, DeviceLinkRequest):
 class GetHousesPositionsRequest(PositionsRequestMixin, DeviceLinkRequest):
     request_message_class = msg.HousePositionRequestMessage
     item_parser = parsers.parse_house_position
+    record_parser = parsers.parse_house_record
+    columns_builder = columns.make_houses_columns
+
+
+class GetHousesStatusesRequest(PositionsRequestMixin, DeviceLinkRequest):
+    """
+    Get statuses of houses without parsing their IDs and coordinates.
+
+    Result is a bytearray indexed by house index, see HOUSE_STATUS_*.
+
+    """
+    request_message_class = msg.HousePositionRequestMessage
+
+    def __init__(
+        self,
+        count: int,
+        loop: asyncio.AbstractEventLoop=None,
+        timeout: Optional[float]=None,
+        trace: bool=False,
+    ):
+        super().__init__(
+            indices=range(count),
+            loop=loop,
+            timeout=timeout,
+            trace=trace,
+        )
+
+    def _extract_result(
+        self,
+        items: List[structures.PreparsedActorPosition],
+    ) -> bytearray:
+
+        statuses = bytearray([HOUSE_STATUS_UNKNOWN]) * len(self._indices)
+        alive_suffix = ACTOR_DATA_SEPARATOR + HouseStatuses.alive.value
+        dead_suffix = ACTOR_DATA_SEPARATOR + HouseStatuses.dead.value
+
+        for index, data in items:
+            if data.endswith(alive_suffix):
+                statuses[index] = HOUSE_STATUS_ALIVE
+            elif data.endswith(dead_suffix):
+                statuses[index] = HOUSE_STATUS_DEAD
+
+        return statuses
+
+
+class StreamPositionsRequest(DeviceLinkRequest):
+    """
+    Get positions of actors in batches parsed as soon as each group of
+    positions is answered.
+
+    The next group is requested only when the previous batch is taken by the
+    consumer, so memory usage does not depend on the number of actors. Note,
+    that timeout includes time spent by the consumer, so RTT estimation is
+    not supported.
+
+    """
+    supports_rtt_estimation = False
+
+    def __init__(
+        self,
+        positions_request_class: type,
+        indices: Iterable[int],
+        loop: asyncio.AbstractEventLoop=None,
+        timeout: Optional[float]=None,
+        result_format: PositionsFormat=PositionsFormats.records,
+        trace: bool=False,
+    ):
+        if result_format == PositionsFormats.columns:
+            columns.check_numpy_is_available()
+
+        self._positions_request_class = positions_request_class
+        self._result_format = result_format
+
+        if not (isinstance(indices, range) and indices.step == 1):
+            indices = list(indices)
+
+        self._indices = indices
+
+        super().__init__(
+            loop=loop,
+            messages=[],
+            timeout=timeout,
+            trace=trace,
+        )
+        self._request_requires_response = bool(indices)
+
+        self._batches = collections.deque()
+        self._batch_ready = asyncio.Event(loop=loop)
+        self._future.add_done_callback(lambda f: self._batch_ready.set())
+
+    def _count_messages(self) -> int:
+        return len(self._indices)
+
+    def _iter_datagrams(self) -> Iterator[Tuple[bytes, bool, int]]:
+        datagrams = compose_positions_requests(
+            opcode=self._positions_request_class.request_message_class.opcode,
+            indices=self._indices,
+        )
+        for data, count in datagrams:
+            yield data, True, count
+
+    def data_received(self, data: bytes) -> None:
+        try:
+            items = scan_actor_positions(data)
+            batch = self._positions_request_class.extract_items(
+                items,
+                self._result_format,
+            )
+        except Exception:
+            LOG.exception(f"failed to handle data {repr(data)}")
+            self._continue_event.set()
+            return
+
+        if self._trace:
+            count = len(batch)
+            item_noun = plural_noun("item", count)
+            LOG.debug(f"batch <<< {count} {item_noun}")
+
+        self._batches.append(batch)
+        self._batch_ready.set()
+
+    def _extract_result(self, items: List[Any]) -> None:
+        return None
+
+    async def iter_batches(self) -> AsyncIterator[Union[
+        List[structures.ActorPosition],
+        List[records.ActorPositionRecord],
+        columns.ActorPositionsColumns,
+    ]]:
+
+        try:
+            while True:
+                if self._batches:
+                    batch = self._batches.popleft()
+
+                    # request next group while the batch is being consumed
+                    self._continue_event.set()
+
+                    yield batch
+                    continue
+
+                if self._future.done():
+                    self._future.result()
+                    return
+
+                self._batch_ready.clear()
+                await self._batch_ready.wait()
+        finally:
+            if not self._future.done():
+                # consumer has stopped iterating
+                self._future.cancel()
+                self._continue_event.set()
+
+    def __str__(self) -> str:
+        datagrams = compose_positions_requests(
+            opcode=self._positions_request_class.request_message_class.opcode,
+            indices=self._indices,
+        )
+        s = REQUEST_PREFIX + MESSAGE_SEPARATOR.join(
+            data[len(REQUEST_PREFIX):] for data, count in datagrams
+        )
+        return truncate(s.decode(), max_length=200)
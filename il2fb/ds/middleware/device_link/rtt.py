@@ -0,0 +1,104 @@
+# coding: utf-8
+
+import math
+
+from typing import Optional
+
+
+class RTTEstimator:
+    """
+    Estimate round-trip time of Device Link of a single server.
+
+    Smoothed RTT and its variation are computed as in TCP (RFC 6298) and
+    give retransmission timeout ``rto``, which is used as a timeout of each
+    group of messages. Timeouts double ``rto`` until a new sample arrives.
+
+    If smoothed RTT grows more than ``pacing_threshold`` times above the
+    minimal observed RTT, the server is treated as loaded and a pause equal
+    to the excess delay is made between groups of messages.
+
+    Not thread-safe.
+
+    """
+
+    def __init__(
+        self,
+        initial_rto: float=1.0,
+        min_rto: float=0.2,
+        max_rto: float=20.0,
+        alpha: float=1 / 8,
+        beta: float=1 / 4,
+        k: float=4.0,
+        pacing_threshold: float=2.0,
+        max_pacing_delay: float=1.0,
+    ):
+        self.initial_rto = initial_rto
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.alpha = alpha
+        self.beta = beta
+        self.k = k
+        self.pacing_threshold = pacing_threshold
+        self.max_pacing_delay = max_pacing_delay
+
+        self.reset()
+
+    @property
+    def srtt(self) -> Optional[float]:
+        return self._srtt
+
+    @property
+    def rttvar(self) -> Optional[float]:
+        return self._rttvar
+
+    @property
+    def min_rtt(self) -> Optional[float]:
+        return self._min_rtt
+
+    @property
+    def rto(self) -> float:
+        return self._rto
+
+    def update(self, sample: float) -> None:
+        if self._srtt is None:
+            self._srtt = sample
+            self._rttvar = sample / 2
+        else:
+            self._rttvar = (
+                (1 - self.beta) * self._rttvar
+                + self.beta * abs(self._srtt - sample)
+            )
+            self._srtt = (1 - self.alpha) * self._srtt + self.alpha * sample
+
+        if self._min_rtt is None or sample < self._min_rtt:
+            self._min_rtt = sample
+
+        self._rto = self._clip(self._srtt + self.k * self._rttvar)
+
+    def backoff(self) -> None:
+        self._rto = self._clip(self._rto * 2)
+
+    def _clip(self, rto: float) -> float:
+        return min(max(rto, self.min_rto), self.max_rto)
+
+    def get_pacing_delay(self) -> float:
+        if self._srtt is None or not self._min_rtt:
+            return 0.0
+
+        if self._srtt <= self._min_rtt * self.pacing_threshold:
+            return 0.0
+
+        return min(self._srtt - self._min_rtt, self.max_pacing_delay)
+
+    def reset(self) -> None:
+        self._srtt = None
+        self._rttvar = None
+        self._min_rtt = None
+        self._rto = self.initial_rto
+
+    def __repr__(self) -> str:
+        srtt = math.nan if self._srtt is None else self._srtt
+        return (
+            f"<{self.__class__.__name__} "
+            f"(srtt={srtt:.4f}, rto={self._rto:.4f})>"
+        )
@@ -0,0 +1,342 @@
+# coding: utf-8
+
+import asyncio
+import logging
+import math
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from il2fb.commons.structures import BaseStructure
+
+from .constants import ActorCategory, ActorCategories
+from .constants import MESSAGE_GROUP_MAX_SIZE
+from .constants import PositionsFormat, PositionsFormats
+from .snapshots import SnapshotDiffer
+
+
+LOG = logging.getLogger(__name__)
+
+
+class PollingPolicy(BaseStructure):
+    """
+    Polling periods of a single category of actors, in seconds.
+
+    The period is decreased when more than ``activity_threshold`` of actors
+    have changed since the previous poll, and increased when nothing has
+    changed. Actors are treated as changed if they appeared, disappeared,
+    were displaced by more than ``distance_threshold`` meters or changed
+    their status (e.g. houses were destroyed).
+
+    """
+    __slots__ = [
+        'period',
+        'min_period',
+        'max_period',
+        'distance_threshold',
+        'activity_threshold',
+    ]
+
+    def __init__(
+        self,
+        period: float,
+        min_period: Optional[float]=None,
+        max_period: Optional[float]=None,
+        distance_threshold: float=10.0,
+        activity_threshold: float=0.05,
+    ):
+        self.period = period
+        self.min_period = min_period if min_period is not None else period
+        self.max_period = max_period if max_period is not None else period
+        self.distance_threshold = distance_threshold
+        self.activity_threshold = activity_threshold
+
+
+DEFAULT_POLLING_POLICIES = {
+    ActorCategories.moving_aircrafts: PollingPolicy(
+        period=1.0, min_period=0.5, max_period=5.0,
+    ),
+    ActorCategories.moving_ground_units: PollingPolicy(
+        period=5.0, min_period=2.0, max_period=30.0,
+    ),
+    ActorCategories.ships: PollingPolicy(
+        period=10.0, min_period=5.0, max_period=60.0,
+    ),
+    ActorCategories.stationary_objects: PollingPolicy(
+        period=30.0, min_period=10.0, max_period=120.0,
+    ),
+    # destruction of any house speeds polling up
+    ActorCategories.houses: PollingPolicy(
+        period=30.0, min_period=10.0, max_period=120.0,
+        activity_threshold=0.0,
+    ),
+}
+
+
+class MergedSnapshot(BaseStructure):
+    """
+    Latest known positions of all polled categories.
+
+    """
+    __slots__ = ['items', 'timestamps', 'updated_categories', ]
+
+    def __init__(
+        self,
+        items: Dict[ActorCategory, List[Any]],
+        timestamps: Dict[ActorCategory, float],
+        updated_categories: List[ActorCategory],
+    ):
+        self.items = items
+        self.timestamps = timestamps
+        self.updated_categories = updated_categories
+
+
+class _CategoryState:
+    __slots__ = [
+        'policy', 'period', 'last_time', 'due_time', 'cost', 'differ',
+    ]
+
+    def __init__(self, policy: PollingPolicy):
+        self.policy = policy
+        self.period = policy.period
+        self.last_time = None
+        self.due_time = 0.0
+        self.cost = 1
+        self.differ = SnapshotDiffer(threshold=policy.distance_threshold)
+
+
+class AdaptivePollingScheduler:
+    """
+    Poll categories of Device Link actors at individual rates.
+
+    Polling period of every category adapts to the observed activity of its
+    actors within ``[min_period, max_period]`` of its policy. If ``budget``
+    is set, all adaptive periods are multiplied by a common factor to keep
+    the estimated number of sent datagrams per second within it, so budget
+    takes precedence over ``max_period``. Merged snapshots are published to
+    subscribers after every poll.
+
+    Not thread-safe.
+
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        policies: Optional[Dict[ActorCategory, PollingPolicy]]=None,
+        budget: Optional[float]=None,
+        timeout: Optional[float]=None,
+        result_format: PositionsFormat=PositionsFormats.structures,
+        loop: asyncio.AbstractEventLoop=None,
+    ):
+        self._client = client
+        self._budget = budget
+        self._timeout = timeout
+        self._result_format = result_format
+        self._loop = loop
+
+        if policies is None:
+            policies = DEFAULT_POLLING_POLICIES
+
+        if not policies:
+            raise ValueError("at least one polling policy is required")
+
+        self._budget_factor = 1.0
+        self._states = {
+            category: _CategoryState(policy)
+            for category, policy in policies.items()
+        }
+
+        self._items = {category: [] for category in self._states}
+        self._timestamps = {}
+        self._subscribers = []
+
+        self._do_stop = False
+        self._wake_up = asyncio.Event(loop=loop)
+        self._stopped_ack = asyncio.Future(loop=loop)
+
+    def subscribe(self, subscriber: Callable[[MergedSnapshot], None]) -> None:
+        """
+        Not thread-safe.
+
+        """
+        self._subscribers.append(subscriber)
+
+    def unsubscribe(
+        self,
+        subscriber: Callable[[MergedSnapshot], None],
+    ) -> None:
+        """
+        Not thread-safe.
+
+        """
+        self._subscribers.remove(subscriber)
+
+    def get_periods(self) -> Dict[ActorCategory, float]:
+        """
+        Actual polling periods, i.e. adaptive ones stretched by budget.
+
+        """
+        factor = self._budget_factor
+        return {
+            category: state.period * factor
+            for category, state in self._states.items()
+        }
+
+    def get_estimated_rate(self) -> float:
+        """
+        Estimated number of sent datagrams per second.
+
+        """
+        return self._get_rate(self._budget_factor)
+
+    def _get_rate(self, factor: float=1.0) -> float:
+        return sum(
+            state.cost / (state.period * factor)
+            for state in self._states.values()
+        )
+
+    def _now(self) -> float:
+        return (self._loop or asyncio.get_event_loop()).time()
+
+    async def run(self) -> Awaitable[None]:
+        try:
+            while not self._do_stop:
+                now = self._now()
+                due = [
+                    category
+                    for category, state in self._states.items()
+                    if state.due_time <= now
+                ]
+
+                if due:
+                    await self._poll(due)
+                    continue
+
+                delay = min(s.due_time for s in self._states.values()) - now
+                self._wake_up.clear()
+
+                try:
+                    await asyncio.wait_for(
+                        self._wake_up.wait(),
+                        delay,
+                        loop=self._loop,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._stopped_ack.set_result(None)
+
+    def stop(self) -> None:
+        self._do_stop = True
+        self._wake_up.set()
+
+    def wait_stopped(self) -> Awaitable[None]:
+        return self._stopped_ack
+
+    async def _poll(self, categories: List[ActorCategory]) -> None:
+        try:
+            await self._client.refresh_radar()
+        except Exception:
+            LOG.exception("failed to refresh radar")
+
+        updated = []
+
+        for category in categories:
+            state = self._states[category]
+            start_time = self._now()
+
+            try:
+                items = await self._client.get_all_positions(
+                    category,
+                    timeout=self._timeout,
+                    result_format=self._result_format,
+                )
+            except Exception as e:
+                LOG.warning(
+                    f"failed to get positions of {category.value}: "
+                    f"{str(e) or e.__class__.__name__}"
+                )
+                state.last_time = self._now()
+                state.due_time = state.last_time + self._get_period(state)
+                continue
+
+            self._items[category] = items
+            self._timestamps[category] = start_time
+            updated.append(category)
+
+            # a count request plus groups of position requests
+            state.cost = 1 + math.ceil(len(items) / MESSAGE_GROUP_MAX_SIZE)
+
+            self._adapt_period(state, items)
+            state.last_time = start_time
+            state.due_time = start_time + self._get_period(state)
+
+        self._apply_budget()
+
+        if updated:
+            self._publish(updated)
+
+    def _adapt_period(self, state: _CategoryState, items: List[Any]) -> None:
+        previous_count = len(state.differ.last)
+        diff = state.differ.update(items)
+        changed = (
+            len(diff.added)
+            + len(diff.removed)
+            + len(diff.moved)
+            + len(diff.status_changed)
+        )
+        activity = changed / max(len(items), previous_count, 1)
+
+        policy = state.policy
+
+        if activity > policy.activity_threshold:
+            period = state.period / 2
+        elif not changed:
+            period = state.period * 1.25
+        else:
+            period = state.period
+
+        state.period = min(max(period, policy.min_period), policy.max_period)
+
+    def _get_period(self, state: _CategoryState) -> float:
+        return state.period * self._budget_factor
+
+    def _apply_budget(self) -> None:
+        """
+        Update the factor of periods from adaptive periods, which stay
+        unchanged, and reschedule categories accordingly.
+
+        """
+        if not self._budget:
+            return
+
+        rate = self._get_rate()
+        factor = max(rate / self._budget, 1.0)
+
+        if factor == self._budget_factor:
+            return
+
+        LOG.debug(
+            f"estimated rate {rate:.1f} datagrams/s, budget "
+            f"{self._budget:.1f}, stretch polling periods by {factor:.2f}"
+        )
+        self._budget_factor = factor
+
+        for state in self._states.values():
+            if state.last_time is not None:
+                state.due_time = state.last_time + self._get_period(state)
+
+    def _publish(self, updated: List[ActorCategory]) -> None:
+        snapshot = MergedSnapshot(
+            items=dict(self._items),
+            timestamps=dict(self._timestamps),
+            updated_categories=updated,
+        )
+
+        for subscriber in self._subscribers:
+            try:
+                subscriber(snapshot)
+            except Exception:
+                LOG.exception(
+                    f"failed to send snapshot to subscriber {subscriber}"
+                )
@@ -0,0 +1,169 @@
+# coding: utf-8
+
+import logging
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .constants import ActorCategory
+from .constants import PositionsFormat, PositionsFormats
+from .exceptions import DeviceLinkError
+from .snapshots import ActorKey, ActorPositionItem
+from .snapshots import get_actor_key, index_snapshot
+
+
+LOG = logging.getLogger(__name__)
+
+
+class SelectiveRefresher:
+    """
+    Refresh positions of selected actors of a single category only.
+
+    Actors are selected by their keys (see ``get_actor_key()``) and mapped to
+    their Device Link indices using the last full snapshot. Indices of actors
+    shift when other actors are removed, so keys of answered actors are
+    compared with the requested ones. If any of them does not match or is not
+    answered, or if the key is not known at all, a full scan is made and
+    becomes the new last snapshot. Requested actors which are absent in a
+    full scan are treated as gone until the next full scan, so they do not
+    cause full scans by themselves.
+
+    Columnar format is not supported as selected actors are returned
+    individually.
+
+    Not thread-safe.
+
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        category: ActorCategory,
+        timeout: Optional[float]=None,
+        result_format: PositionsFormat=PositionsFormats.records,
+    ):
+        if result_format == PositionsFormats.columns:
+            raise ValueError("columnar format is not supported")
+
+        self._client = client
+        self._category = category
+        self._timeout = timeout
+        self._result_format = result_format
+
+        self._snapshot = {}
+        self._gone_keys = set()
+        self._full_scans_count = 0
+
+    @property
+    def snapshot(self) -> Dict[ActorKey, ActorPositionItem]:
+        return self._snapshot
+
+    @property
+    def full_scans_count(self) -> int:
+        return self._full_scans_count
+
+    def select(
+        self,
+        predicate: Callable[[ActorPositionItem], bool],
+    ) -> List[ActorKey]:
+        """
+        Get keys of actors from the last snapshot which match a predicate,
+        e.g. ``lambda x: x.is_human``.
+
+        """
+        return [
+            key
+            for key, item in self._snapshot.items()
+            if predicate(item)
+        ]
+
+    def reset(self) -> None:
+        self._snapshot = {}
+        self._gone_keys = set()
+
+    async def refresh_all(self) -> Dict[ActorKey, ActorPositionItem]:
+        items = await self._client.get_all_positions(
+            self._category,
+            timeout=self._timeout,
+            result_format=self._result_format,
+        )
+        self._snapshot = index_snapshot(items)
+        self._gone_keys = set()
+        self._full_scans_count += 1
+        return self._snapshot
+
+    async def refresh(
+        self,
+        keys: Iterable[ActorKey],
+    ) -> Dict[ActorKey, ActorPositionItem]:
+        """
+        Get current positions of actors with given keys. Actors which do not
+        exist anymore are absent in the result.
+
+        """
+        keys = list(keys)
+        snapshot = self._snapshot
+
+        if not keys:
+            return {}
+
+        gone_keys = self._gone_keys
+        known_keys = [key for key in keys if key in snapshot]
+
+        if all(key in gone_keys for key in keys if key not in snapshot):
+            if not known_keys:
+                return {}
+
+            result = await self._refresh_known(known_keys)
+            if result is not None:
+                return result
+
+        snapshot = await self.refresh_all()
+        self._gone_keys.update(key for key in keys if key not in snapshot)
+
+        return {
+            key: snapshot[key]
+            for key in keys
+            if key in snapshot
+        }
+
+    async def _refresh_known(
+        self,
+        keys: List[ActorKey],
+    ) -> Optional[Dict[ActorKey, ActorPositionItem]]:
+
+        snapshot = self._snapshot
+        expected = {snapshot[key].index: key for key in keys}
+
+        try:
+            items = await self._client.get_positions(
+                self._category,
+                indices=sorted(expected),
+                timeout=self._timeout,
+                partial=True,
+                result_format=self._result_format,
+            )
+        except DeviceLinkError as e:
+            LOG.warning(f"failed to refresh selected actors: {e}")
+            return None
+
+        items = items.items
+
+        result = {}
+
+        for item in items:
+            key = get_actor_key(item)
+
+            if expected.get(item.index) != key:
+                LOG.debug(
+                    f"actor index has shifted (index={item.index}), "
+                    f"fall back to full scan"
+                )
+                return None
+
+            result[key] = item
+
+        if len(result) != len(expected):
+            return None
+
+        snapshot.update(result)
+        return result
@@ -0,0 +1,190 @@
+# coding: utf-8
+
+from typing import Any, Dict, Hashable, Iterable, List, Tuple, Union
+
+from il2fb.commons.structures import BaseStructure
+
+from . import records
+from . import structures
+
+
+ActorPositionItem = Union[
+    structures.ActorPosition,
+    records.ActorPositionRecord,
+]
+ActorKey = Hashable
+
+
+def get_actor_key(item: ActorPositionItem) -> ActorKey:
+    """
+    Get identity of an actor which does not depend on its Device Link index.
+
+    Aircrafts and ground units are identified by their ID and member index,
+    other actors are identified by their ID only.
+
+    """
+    member_index = getattr(item, 'member_index', Ellipsis)
+
+    if member_index is Ellipsis:
+        return item.id
+
+    return (item.id, member_index)
+
+
+def get_actor_coordinates(item: ActorPositionItem) -> Tuple[float, ...]:
+    """
+    Get coordinates of an actor without creating points for records.
+
+    """
+    if isinstance(item, records.ActorPositionRecord):
+        source = item
+    else:
+        source = item.pos
+
+    z = getattr(source, 'z', None)
+
+    if z is None:
+        return (source.x, source.y)
+
+    return (source.x, source.y, z)
+
+
+def index_snapshot(
+    snapshot: Iterable[ActorPositionItem],
+) -> Dict[ActorKey, ActorPositionItem]:
+    return {
+        get_actor_key(item): item
+        for item in snapshot
+    }
+
+
+class SnapshotDiff(BaseStructure):
+    __slots__ = ['added', 'removed', 'moved', 'status_changed', ]
+
+    def __init__(
+        self,
+        added: List[ActorPositionItem],
+        removed: List[ActorPositionItem],
+        moved: List[ActorPositionItem],
+        status_changed: List[ActorPositionItem],
+    ):
+        self.added = added
+        self.removed = removed
+        self.moved = moved
+        self.status_changed = status_changed
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.added or self.removed or self.moved or self.status_changed
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} "
+            f"(added={len(self.added)}, removed={len(self.removed)}, "
+            f"moved={len(self.moved)}, "
+            f"status_changed={len(self.status_changed)})>"
+        )
+
+
+def diff_snapshots(
+    old: Union[Iterable[ActorPositionItem], Dict[ActorKey, Any]],
+    new: Union[Iterable[ActorPositionItem], Dict[ActorKey, Any]],
+    threshold: float=0.0,
+) -> SnapshotDiff:
+    """
+    Compare two snapshots of actors of the same category.
+
+    Snapshots can be given either as sequences of positions or as results of
+    ``index_snapshot()``. ``added`` and ``moved`` contain items of the new
+    snapshot, ``removed`` contains items of the old one. An actor is treated
+    as moved if it has been displaced by more than ``threshold`` meters.
+    ``status_changed`` contains items of the new snapshot which have status
+    (i.e. houses) different from the old one.
+
+    """
+    if not isinstance(old, dict):
+        old = index_snapshot(old)
+
+    if not isinstance(new, dict):
+        new = index_snapshot(new)
+
+    threshold = threshold ** 2
+
+    added = []
+    moved = []
+    status_changed = []
+
+    for key, item in new.items():
+        previous = old.get(key)
+
+        if previous is None:
+            added.append(item)
+            continue
+
+        a = get_actor_coordinates(previous)
+        b = get_actor_coordinates(item)
+        distance = sum((i - j) ** 2 for i, j in zip(a, b))
+
+        if distance > threshold:
+            moved.append(item)
+
+        status = getattr(item, 'status', None)
+
+        if status is not None and status != previous.status:
+            status_changed.append(item)
+
+    removed = [
+        item
+        for key, item in old.items()
+        if key not in new
+    ]
+
+    return SnapshotDiff(
+        added=added,
+        removed=removed,
+        moved=moved,
+        status_changed=status_changed,
+    )
+
+
+class SnapshotDiffer:
+    """
+    Keep the last snapshot of a category and compare new snapshots with it.
+
+    Displacement of actors is measured from their last reported positions,
+    so slow actors get reported as moved once they have accumulated enough
+    displacement.
+
+    Not thread-safe.
+
+    """
+
+    def __init__(self, threshold: float=0.0):
+        self.threshold = threshold
+        self._last = {}
+        self._reported = {}
+
+    @property
+    def last(self) -> Dict[ActorKey, ActorPositionItem]:
+        return self._last
+
+    def update(self, snapshot: Iterable[ActorPositionItem]) -> SnapshotDiff:
+        snapshot = index_snapshot(snapshot)
+        diff = diff_snapshots(self._reported, snapshot, self.threshold)
+
+        reported = {
+            key: self._reported.get(key, item)
+            for key, item in snapshot.items()
+        }
+        for item in diff.moved + diff.status_changed:
+            reported[get_actor_key(item)] = item
+
+        self._last = snapshot
+        self._reported = reported
+
+        return diff
+
+    def reset(self) -> None:
+        self._last = {}
+        self._reported = {}
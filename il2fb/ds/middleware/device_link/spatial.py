@@ -0,0 +1,258 @@
+# coding: utf-8
+
+import heapq
+import math
+
+from collections import defaultdict
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from .snapshots import ActorPositionItem, get_actor_coordinates
+
+
+Predicate = Callable[[ActorPositionItem], bool]
+Cell = Tuple[int, int]
+
+
+class GridIndex:
+    """
+    Uniform grid over horizontal (x, y) coordinates of actors.
+
+    Actors of different categories can be put into the same index. Distances
+    are horizontal. The index is meant to be cleared and filled again on every
+    tick, which costs a single pass over snapshots.
+
+    Not thread-safe.
+
+    """
+
+    def __init__(self, cell_size: float=1000.0):
+        if cell_size <= 0:
+            raise ValueError("cell size must be positive")
+
+        self.cell_size = cell_size
+        self._cells = defaultdict(list)
+        self._count = 0
+        self._bounds = None  # min_i, max_i, min_j, max_j
+
+    @classmethod
+    def from_snapshots(
+        cls,
+        *snapshots: Iterable[ActorPositionItem],
+        cell_size: float=1000.0
+    ) -> 'GridIndex':
+
+        index = cls(cell_size=cell_size)
+
+        for snapshot in snapshots:
+            index.extend(snapshot)
+
+        return index
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _get_cell(self, x: float, y: float) -> Cell:
+        return (
+            int(math.floor(x / self.cell_size)),
+            int(math.floor(y / self.cell_size)),
+        )
+
+    def add(self, item: ActorPositionItem) -> None:
+        x, y = get_actor_coordinates(item)[:2]
+        i, j = cell = self._get_cell(x, y)
+
+        self._cells[cell].append((x, y, item))
+        self._count += 1
+
+        bounds = self._bounds
+        if bounds is None:
+            self._bounds = (i, i, j, j)
+        elif not (bounds[0] <= i <= bounds[1] and bounds[2] <= j <= bounds[3]):
+            self._bounds = (
+                min(bounds[0], i), max(bounds[1], i),
+                min(bounds[2], j), max(bounds[3], j),
+            )
+
+    def extend(self, items: Iterable[ActorPositionItem]) -> None:
+        for item in items:
+            self.add(item)
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._count = 0
+        self._bounds = None
+
+    def _iter_cells(
+        self,
+        min_x: float,
+        min_y: float,
+        max_x: float,
+        max_y: float,
+    ) -> Iterable[List[Tuple[float, float, ActorPositionItem]]]:
+
+        min_i, min_j = self._get_cell(min_x, min_y)
+        max_i, max_j = self._get_cell(max_x, max_y)
+        cells = self._cells
+
+        if (max_i - min_i + 1) * (max_j - min_j + 1) > len(cells):
+            # the box covers more cells than exist, check existing ones only
+            for (i, j), entries in cells.items():
+                if min_i <= i <= max_i and min_j <= j <= max_j:
+                    yield entries
+            return
+
+        for i in range(min_i, max_i + 1):
+            for j in range(min_j, max_j + 1):
+                entries = cells.get((i, j))
+                if entries:
+                    yield entries
+
+    def within_bbox(
+        self,
+        min_x: float,
+        min_y: float,
+        max_x: float,
+        max_y: float,
+        predicate: Optional[Predicate]=None,
+    ) -> List[ActorPositionItem]:
+
+        return [
+            item
+            for entries in self._iter_cells(min_x, min_y, max_x, max_y)
+            for x, y, item in entries
+            if (
+                min_x <= x <= max_x
+                and min_y <= y <= max_y
+                and (predicate is None or predicate(item))
+            )
+        ]
+
+    def within_radius(
+        self,
+        x: float,
+        y: float,
+        radius: float,
+        predicate: Optional[Predicate]=None,
+    ) -> List[ActorPositionItem]:
+
+        radius_sq = radius ** 2
+        cells = self._iter_cells(
+            x - radius, y - radius, x + radius, y + radius,
+        )
+
+        return [
+            item
+            for entries in cells
+            for ix, iy, item in entries
+            if (
+                (ix - x) ** 2 + (iy - y) ** 2 <= radius_sq
+                and (predicate is None or predicate(item))
+            )
+        ]
+
+    def nearest(
+        self,
+        x: float,
+        y: float,
+        k: int=1,
+        max_distance: Optional[float]=None,
+        predicate: Optional[Predicate]=None,
+    ) -> List[Tuple[float, ActorPositionItem]]:
+        """
+        Find up to ``k`` nearest actors. Returns pairs of distance and actor
+        sorted by distance.
+
+        """
+        if k <= 0 or not self._count:
+            return []
+
+        cells = self._cells
+        ci, cj = self._get_cell(x, y)
+        cell_size = self.cell_size
+
+        bounds = self._bounds
+        min_i, max_i, min_j, max_j = bounds
+
+        # rings which do not reach the grid are empty
+        min_ring = max(min_i - ci, ci - max_i, min_j - cj, cj - max_j, 0)
+        max_ring = max(
+            abs(ci - min_i), abs(ci - max_i),
+            abs(cj - min_j), abs(cj - max_j),
+        )
+        if max_distance is not None:
+            max_ring = min(max_ring, int(math.ceil(max_distance / cell_size)))
+
+        max_distance_sq = (
+            max_distance ** 2
+            if max_distance is not None
+            else math.inf
+        )
+
+        # max-heap of k best candidates: (-distance_sq, counter, item)
+        best = []
+        counter = 0
+
+        for ring in range(min_ring, max_ring + 1):
+            # every point outside of the already scanned rings is farther
+            # than this distance from the origin
+            if len(best) == k:
+                ring_distance = (ring - 1) * cell_size
+                if ring_distance > 0 and ring_distance ** 2 >= -best[0][0]:
+                    break
+
+            for cell in self._iter_ring(ci, cj, ring, bounds):
+                for ix, iy, item in cells.get(cell, ()):
+                    distance_sq = (ix - x) ** 2 + (iy - y) ** 2
+
+                    if distance_sq > max_distance_sq:
+                        continue
+
+                    if predicate is not None and not predicate(item):
+                        continue
+
+                    counter += 1
+                    entry = (-distance_sq, counter, item)
+
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif distance_sq < -best[0][0]:
+                        heapq.heapreplace(best, entry)
+
+        return [
+            (math.sqrt(-distance_sq), item)
+            for distance_sq, counter, item in sorted(best, reverse=True)
+        ]
+
+    @staticmethod
+    def _iter_ring(
+        ci: int,
+        cj: int,
+        ring: int,
+        bounds: Tuple[int, int, int, int],
+    ) -> Iterable[Cell]:
+        """
+        Iterate over cells of a ring around a cell which are within bounds
+        of the grid.
+
+        """
+        min_i, max_i, min_j, max_j = bounds
+
+        # rows
+        i1 = max(ci - ring, min_i)
+        i2 = min(ci + ring, max_i)
+        rows = (cj - ring, cj + ring) if ring else (cj, )
+
+        for j in rows:
+            if min_j <= j <= max_j:
+                for i in range(i1, i2 + 1):
+                    yield (i, j)
+
+        # columns without corners
+        j1 = max(cj - ring + 1, min_j)
+        j2 = min(cj + ring - 1, max_j)
+        columns = (ci - ring, ci + ring) if ring else ()
+
+        for i in columns:
+            if min_i <= i <= max_i:
+                for j in range(j1, j2 + 1):
+                    yield (i, j)
@@ -1,7 +1,7 @@
 # coding: utf-8
 
 from collections import namedtuple
-from typing import Optional
+from typing import Dict, List, Optional
 
 from il2fb.commons.spatial import Point2D, Point3D
 from il2fb.commons.structures import BaseStructure
@@ -93,3 +93,55 @@ class HousePosition(ActorPosition):
         self.id = id
         self.pos = pos
         self.status = status
+
+
+class PartialActorPositions(BaseStructure):
+    """
+    Result of positions requests made with ``partial=True``. Indices of
+    actors which were not answered before timeout are listed in
+    ``missing_indices``, which is empty if the request has completed.
+
+    """
+    __slots__ = ['items', 'missing_indices', ]
+
+    def __init__(
+        self,
+        items: List[ActorPosition],
+        missing_indices: List[int],
+    ):
+        self.items = items
+        self.missing_indices = missing_indices
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing_indices
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} "
+            f"({len(self.items)} items, "
+            f"{len(self.missing_indices)} missing)>"
+        )
+
+
+class TimedActorPositions(BaseStructure):
+    """
+    Positions of actors along with monotonic time (see ``time.monotonic()``)
+    of receiving of datagrams which contained them, keyed by actor index.
+
+    """
+    __slots__ = ['items', 'receive_times', ]
+
+    def __init__(
+        self,
+        items: List[ActorPosition],
+        receive_times: Dict[int, float],
+    ):
+        self.items = items
+        self.receive_times = receive_times
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} "
+            f"({len(self.items)} items)>"
+        )
@@ -0,0 +1,330 @@
+# coding: utf-8
+
+import time
+
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .columns import check_numpy_is_available
+from .snapshots import ActorKey, ActorPositionItem
+from .snapshots import get_actor_coordinates, get_actor_key
+from .structures import TimedActorPositions
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+SAMPLE_FIELDS_COUNT = 4  # t, x, y, z
+RING_BUFFER_INITIAL_SIZE = 8
+
+
+class _RingBuffer:
+    """
+    Ring buffer of samples. Memory is allocated on the first push and grows
+    twice when needed, up to ``capacity`` rows.
+
+    """
+    __slots__ = ['data', 'capacity', 'start', 'count', ]
+
+    def __init__(self, capacity: int):
+        self.data = None
+        self.capacity = capacity
+        self.start = 0
+        self.count = 0
+
+    @property
+    def size(self) -> int:
+        return 0 if self.data is None else self.data.shape[0]
+
+    def _grow(self) -> None:
+        size = min(
+            max(self.size * 2, RING_BUFFER_INITIAL_SIZE),
+            self.capacity,
+        )
+        data = np.empty((size, SAMPLE_FIELDS_COUNT), dtype=np.float64)
+
+        if self.count:
+            data[:self.count] = self.to_array()
+
+        self.data = data
+        self.start = 0
+
+    def push(self, sample: Tuple[float, ...]) -> None:
+        """
+        Append a sample, overwriting the oldest one if the buffer is full.
+
+        """
+        if self.count == self.size and self.size < self.capacity:
+            self._grow()
+
+        size = self.size
+
+        if self.count < size:
+            self.data[(self.start + self.count) % size] = sample
+            self.count += 1
+        else:
+            self.data[self.start] = sample
+            self.start = (self.start + 1) % size
+
+    def peek(self) -> 'np.ndarray':
+        return self.data[self.start]
+
+    def pop(self) -> 'np.ndarray':
+        sample = self.data[self.start].copy()
+        self.start = (self.start + 1) % self.size
+        self.count -= 1
+        return sample
+
+    def to_array(self) -> 'np.ndarray':
+        if not self.count:
+            return np.empty((0, SAMPLE_FIELDS_COUNT), dtype=np.float64)
+
+        size = self.size
+        end = self.start + self.count
+
+        if end <= size:
+            return self.data[self.start:end].copy()
+
+        return np.concatenate((
+            self.data[self.start:],
+            self.data[:end - size],
+        ))
+
+
+class _Track:
+    __slots__ = ['recent', 'archive', 'demoted_count', ]
+
+    def __init__(self, capacity: int):
+        self.recent = _RingBuffer(capacity)
+        self.archive = None  # created on the first demotion
+        self.demoted_count = 0
+
+    def to_array(self) -> 'np.ndarray':
+        if self.archive is None or not self.archive.count:
+            return self.recent.to_array()
+
+        return np.concatenate((
+            self.archive.to_array(),
+            self.recent.to_array(),
+        ))
+
+
+class TrackStore:
+    """
+    Store history of positions of actors in ring buffers of bounded size.
+
+    Each actor is identified by its key (see ``get_actor_key()``) and has two
+    buffers: recent samples are kept at full rate. If ``decimation`` is set,
+    samples older than ``decimation_age`` seconds or pushed out of the full
+    buffer are moved to an archive buffer, and only every
+    ``decimation``-th of them is kept. Otherwise the oldest samples are
+    dropped. Buffers are allocated lazily and grow geometrically, so actors
+    with few samples take little memory.
+
+    Samples are rows of ``(t, x, y, z)``, where ``t`` is monotonic time of
+    receiving (see ``timestamped`` argument of positions getters of
+    ``DeviceLinkClient``). Z coordinates of 2D actors are equal to zero.
+
+    Not thread-safe.
+
+    """
+
+    def __init__(
+        self,
+        capacity: int=1024,
+        decimation: Optional[int]=None,
+        decimation_age: Optional[float]=None,
+        archive_capacity: int=4096,
+    ):
+        check_numpy_is_available()
+
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+
+        if decimation is not None and decimation <= 0:
+            raise ValueError("decimation must be positive")
+
+        self.capacity = capacity
+        self.decimation = decimation
+        self.decimation_age = decimation_age
+        self.archive_capacity = archive_capacity if decimation else 0
+
+        self._tracks = {}
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def __contains__(self, key: ActorKey) -> bool:
+        return key in self._tracks
+
+    @property
+    def keys(self) -> List[ActorKey]:
+        return list(self._tracks)
+
+    def append(
+        self,
+        snapshot: Union[TimedActorPositions, Iterable[ActorPositionItem]],
+        received_at: Optional[float]=None,
+    ) -> None:
+        """
+        Record positions of actors from a snapshot.
+
+        If the snapshot is not timestamped, all its actors are treated as
+        received at ``received_at``, which defaults to the current monotonic
+        time.
+
+        """
+        if isinstance(snapshot, TimedActorPositions):
+            items = snapshot.items
+            receive_times = snapshot.receive_times
+        else:
+            items = snapshot
+            receive_times = {}
+
+        if received_at is None:
+            received_at = time.monotonic()
+
+        for item in items:
+            coordinates = get_actor_coordinates(item)
+            if len(coordinates) == 2:
+                coordinates += (0.0, )
+
+            t = receive_times.get(item.index, received_at)
+            self.add_sample(get_actor_key(item), (t, ) + coordinates)
+
+    def add_sample(self, key: ActorKey, sample: Tuple[float, ...]) -> None:
+        track = self._tracks.get(key)
+
+        if track is None:
+            track = self._tracks[key] = _Track(capacity=self.capacity)
+
+        if self.archive_capacity:
+            self._demote(track, now=sample[0])
+
+        track.recent.push(sample)
+
+    def _demote(self, track: _Track, now: float) -> None:
+        recent = track.recent
+        decimation = self.decimation
+        max_time = (
+            now - self.decimation_age
+            if self.decimation_age is not None
+            else -np.inf
+        )
+
+        while recent.count and (
+            recent.count == recent.capacity
+            or recent.peek()[0] < max_time
+        ):
+            sample = recent.pop()
+
+            if track.demoted_count % decimation == 0:
+                if track.archive is None:
+                    track.archive = _RingBuffer(self.archive_capacity)
+
+                track.archive.push(sample)
+
+            track.demoted_count += 1
+
+    def get_track(
+        self,
+        key: ActorKey,
+        start: Optional[float]=None,
+        end: Optional[float]=None,
+    ) -> 'np.ndarray':
+        """
+        Get samples of an actor ordered by time, optionally limited by time
+        range ``[start, end]``. Result has shape ``(n, 4)``.
+
+        """
+        track = self._tracks.get(key)
+
+        if track is None:
+            return np.empty((0, SAMPLE_FIELDS_COUNT), dtype=np.float64)
+
+        samples = track.to_array()
+        return self._slice(samples, start, end)
+
+    @staticmethod
+    def _slice(
+        samples: 'np.ndarray',
+        start: Optional[float],
+        end: Optional[float],
+    ) -> 'np.ndarray':
+
+        if start is None and end is None:
+            return samples
+
+        t = samples[:, 0]
+        i = 0 if start is None else np.searchsorted(t, start, side='left')
+        j = len(t) if end is None else np.searchsorted(t, end, side='right')
+        return samples[i:j]
+
+    def export(
+        self,
+        start: Optional[float]=None,
+        end: Optional[float]=None,
+    ) -> Tuple[List[ActorKey], 'np.ndarray', 'np.ndarray']:
+        """
+        Export samples of all actors at once.
+
+        Returns a list of keys, an array of codes of keys (indices in the
+        list) and an array of samples of shape ``(n, 4)``. Samples of each
+        actor are contiguous and ordered by time.
+
+        """
+        keys = []
+        codes = []
+        chunks = []
+
+        for key, track in self._tracks.items():
+            samples = self._slice(track.to_array(), start, end)
+
+            if not len(samples):
+                continue
+
+            codes.append(np.full(len(samples), len(keys), dtype=np.int32))
+            chunks.append(samples)
+            keys.append(key)
+
+        if not chunks:
+            return (
+                keys,
+                np.empty(0, dtype=np.int32),
+                np.empty((0, SAMPLE_FIELDS_COUNT), dtype=np.float64),
+            )
+
+        return keys, np.concatenate(codes), np.concatenate(chunks)
+
+    def export_tracks(
+        self,
+        start: Optional[float]=None,
+        end: Optional[float]=None,
+    ) -> Dict[ActorKey, 'np.ndarray']:
+        return {
+            key: self.get_track(key, start, end)
+            for key in self._tracks
+        }
+
+    def remove(self, key: ActorKey) -> None:
+        self._tracks.pop(key, None)
+
+    def clear(self) -> None:
+        self._tracks.clear()
+
+    def get_memory_size(self) -> int:
+        """
+        Get number of bytes allocated for buffers.
+
+        """
+        size = 0
+
+        for track in self._tracks.values():
+            if track.recent.data is not None:
+                size += track.recent.data.nbytes
+
+            if track.archive is not None:
+                size += track.archive.data.nbytes
+
+        return size
@@ -0,0 +1,233 @@
+# coding: utf-8
+
+import asyncio
+import logging
+
+from typing import Any, Awaitable, Dict, Iterable, List, Optional
+
+from il2fb.commons.structures import BaseStructure
+
+from il2fb.ds.middleware.console import events
+from il2fb.ds.middleware.console import structures as console_structures
+from il2fb.ds.middleware.console.client import ConsoleClient
+from il2fb.ds.middleware.device_link.client import DeviceLinkClient
+from il2fb.ds.middleware.device_link.constants import PositionsFormat
+from il2fb.ds.middleware.device_link.constants import PositionsFormats
+
+
+LOG = logging.getLogger(__name__)
+
+
+class HumanState(BaseStructure):
+    """
+    Joined state of a human known from console and Device Link.
+
+    ``index`` and ``position`` are ``None`` while the human is not flying.
+
+    """
+    __slots__ = ['callsign', 'channel', 'human', 'index', 'position', ]
+
+    def __init__(
+        self,
+        callsign: str,
+        channel: Optional[int]=None,
+        human: Optional[console_structures.Human]=None,
+        index: Optional[int]=None,
+        position: Optional[Any]=None,
+    ):
+        self.callsign = callsign
+        self.channel = channel
+        self.human = human
+        self.index = index
+        self.position = position
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} "
+            f"(callsign='{self.callsign}', index={self.index})>"
+        )
+
+
+class Session:
+    """
+    Own console and Device Link clients of a server and keep an index of
+    humans by their callsigns.
+
+    IDs of aircraft of humans in Device Link are their callsigns, so positions
+    are joined with humans by hash lookups. The index is updated
+    incrementally: humans are added and removed by connection events of the
+    console and by lists of humans, indices and positions are updated by
+    snapshots of moving aircraft.
+
+    Not thread-safe.
+
+    """
+
+    def __init__(
+        self,
+        console_client: ConsoleClient,
+        device_link_client: DeviceLinkClient,
+        loop: asyncio.AbstractEventLoop=None,
+    ):
+        self._loop = loop
+        self.console = console_client
+        self.device_link = device_link_client
+
+        self._humans = {}
+        self._channels = {}
+        self._flying = set()
+
+        self.console.subscribe_to_human_connection_events(
+            self._on_human_connection_event,
+        )
+
+    def __len__(self) -> int:
+        return len(self._humans)
+
+    def __contains__(self, callsign: str) -> bool:
+        return callsign in self._humans
+
+    def get(self, callsign: str) -> Optional[HumanState]:
+        return self._humans.get(callsign)
+
+    def get_index(self, callsign: str) -> Optional[int]:
+        state = self._humans.get(callsign)
+        return state and state.index
+
+    def get_position(self, callsign: str) -> Optional[Any]:
+        state = self._humans.get(callsign)
+        return state and state.position
+
+    def get_humans(self) -> List[HumanState]:
+        return list(self._humans.values())
+
+    def get_flying_humans(self) -> List[HumanState]:
+        return [self._humans[callsign] for callsign in self._flying]
+
+    def _get_or_create(self, callsign: str) -> HumanState:
+        state = self._humans.get(callsign)
+
+        if state is None:
+            state = self._humans[callsign] = HumanState(callsign=callsign)
+
+        return state
+
+    def _remove(self, callsign: str) -> None:
+        state = self._humans.pop(callsign, None)
+        self._flying.discard(callsign)
+
+        if state is not None and state.channel is not None:
+            self._channels.pop(state.channel, None)
+
+    def _on_human_connection_event(
+        self,
+        event: events.HumanConnectionEvent,
+    ) -> None:
+
+        if isinstance(event, events.HumanHasConnected):
+            callsign = event.actor.callsign
+            state = self._get_or_create(callsign)
+            state.channel = event.channel
+            self._channels[event.channel] = callsign
+
+        elif isinstance(event, events.HumanHasDisconnected):
+            callsign = self._channels.pop(event.channel, None)
+
+            if callsign is not None:
+                self._remove(callsign)
+
+    def update_humans(
+        self,
+        humans: Iterable[console_structures.Human],
+    ) -> None:
+        """
+        Synchronize the index with a full list of humans from console.
+
+        """
+        callsigns = set()
+
+        for human in humans:
+            callsigns.add(human.callsign)
+            self._get_or_create(human.callsign).human = human
+
+        for callsign in set(self._humans) - callsigns:
+            self._remove(callsign)
+
+    def update_positions(self, items: Iterable[Any]) -> None:
+        """
+        Update indices and positions of humans from a full snapshot of moving
+        aircraft in any format. Humans absent in the snapshot are treated as
+        not flying.
+
+        """
+        flying = set()
+        humans = self._humans
+
+        for item in items:
+            if not item.is_human:
+                continue
+
+            state = humans.get(item.id)
+
+            if state is None:
+                # console has not reported the human yet
+                state = self._get_or_create(item.id)
+
+            state.index = item.index
+            state.position = item
+            flying.add(item.id)
+
+        for callsign in self._flying - flying:
+            state = humans.get(callsign)
+
+            if state is not None:
+                state.index = None
+                state.position = None
+
+        self._flying = flying
+
+    async def refresh_humans(
+        self,
+        timeout: Optional[float]=None,
+    ) -> Awaitable[None]:
+
+        humans = await self.console.get_humans_list(timeout=timeout)
+        self.update_humans(humans)
+
+    async def refresh_positions(
+        self,
+        timeout: Optional[float]=None,
+        result_format: PositionsFormat=PositionsFormats.records,
+    ) -> Awaitable[None]:
+
+        items = await self.device_link.get_all_moving_aircrafts_positions(
+            timeout=timeout,
+            result_format=result_format,
+        )
+        self.update_positions(items)
+
+    def clear(self) -> None:
+        """
+        Must be called when a mission is loaded or unloaded.
+
+        """
+        for state in self._humans.values():
+            state.index = None
+            state.position = None
+
+        self._flying = set()
+        self.device_link.clear_caches()
+
+    def close(self) -> None:
+        self.console.unsubscribe_from_human_connection_events(
+            self._on_human_connection_event,
+        )
+        self.console.close()
+        self.device_link.close()
+
+    async def wait_closed(self) -> Awaitable[None]:
+        await asyncio.gather(
+            self.console.wait_closed(),
+            self.device_link.wait_closed(),
+            loop=self._loop,
+        )
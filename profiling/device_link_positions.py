@@ -0,0 +1,172 @@
+#! /usr/bin/env python
+# coding: utf-8
+
+"""
+Compare parsing of Device Link positions answers done via generic messages
+with the single-pass scanner used by positions requests and with columnar
+results (if NumPy is available).
+
+Usage:
+
+    python profiling/device_link_positions.py [--count 10000] [--repeat 5]
+
+"""
+
+import argparse
+import operator
+import timeit
+
+from il2fb.ds.middleware.device_link import columns
+from il2fb.ds.middleware.device_link import parsers
+from il2fb.ds.middleware.device_link.constants import MESSAGE_GROUP_MAX_SIZE
+from il2fb.ds.middleware.device_link.filters import actor_index_is_valid
+from il2fb.ds.middleware.device_link.filters import actor_status_is_valid
+from il2fb.ds.middleware.device_link.helpers import decompose_data
+from il2fb.ds.middleware.device_link.helpers import scan_actor_positions
+
+
+def load_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark of Device Link positions parsing"
+    )
+    parser.add_argument(
+        '-c', '--count',
+        dest='count',
+        type=int,
+        default=10000,
+        help="Number of actors in a single answer. Default: 10000",
+    )
+    parser.add_argument(
+        '-r', '--repeat',
+        dest='repeat',
+        type=int,
+        default=5,
+        help="Number of repetitions. Default: 5",
+    )
+    return parser.parse_args()
+
+
+def make_aircraft_data(i):
+    return f"{i}:r01{i:03d}{i % 4};{i * 10.5};{i * 20.25};{1000 + i}"
+
+
+def make_escaped_aircraft_data(i):
+    # integer coordinates: generic decomposition of escaped data relies on them
+    return f"{i}:john\\/doe_{i};{i * 10};{i * 20};{1000 + i}"
+
+
+def make_house_data(i):
+    return f"{i}:{i}_bld;{i * 10.5};{i * 20.25};{'AD'[i % 2]}"
+
+
+def make_datagrams(opcode, count, make_data):
+    datagrams = []
+
+    for start in range(0, count, MESSAGE_GROUP_MAX_SIZE):
+        stop = min(start + MESSAGE_GROUP_MAX_SIZE, count)
+        body = '/'.join(
+            f"{opcode}\\{make_data(i)}"
+            for i in range(start, stop)
+        )
+        datagrams.append(f"A/{body}".encode())
+
+    return datagrams
+
+
+def parse_via_messages(datagrams, item_parser):
+    messages = []
+
+    for data in datagrams:
+        messages.extend(decompose_data(data))
+
+    items = map(operator.attrgetter('value'), messages)
+    items = map(parsers.preparse_actor_position, items)
+    items = filter(actor_index_is_valid, items)
+    items = filter(actor_status_is_valid, items)
+    items = map(item_parser, items)
+    items = filter(bool, items)
+    return list(items)
+
+
+def parse_via_scanner(datagrams, item_parser):
+    items = []
+
+    for data in datagrams:
+        items.extend(scan_actor_positions(data))
+
+    results = []
+
+    for item in items:
+        if actor_index_is_valid(item) and actor_status_is_valid(item):
+            result = item_parser(item)
+
+            if result:
+                results.append(result)
+
+    return results
+
+
+def parse_via_columns(datagrams, columns_builder):
+    items = []
+
+    for data in datagrams:
+        items.extend(scan_actor_positions(data))
+
+    items = [
+        item for item in items
+        if actor_index_is_valid(item) and actor_status_is_valid(item)
+    ]
+    return columns_builder(items)
+
+
+def run_case(title, datagrams, item_parser, columns_builder, repeat):
+    expected = parse_via_messages(datagrams, item_parser)
+    actual = parse_via_scanner(datagrams, item_parser)
+    assert actual == expected, "results of parsers differ"
+
+    cases = [
+        ('messages', parse_via_messages, item_parser),
+        ('scanner', parse_via_scanner, item_parser),
+    ]
+
+    if columns.np is not None:
+        actual = parse_via_columns(datagrams, columns_builder)
+        assert actual.to_structures() == expected, "columns differ"
+        cases.append(('columns', parse_via_columns, columns_builder))
+
+    print(f"{title} ({len(expected)} actors, {len(datagrams)} datagrams):")
+
+    for name, function, parser in cases:
+        timer = timeit.Timer(lambda: function(datagrams, parser))
+        best = min(timer.repeat(repeat=repeat, number=1))
+        print(f"  {name:<10} {best * 1000:10.3f} ms")
+
+
+def main():
+    args = load_args()
+
+    run_case(
+        "moving aircrafts",
+        make_datagrams(1004, args.count, make_aircraft_data),
+        parsers.parse_moving_aircraft_position,
+        columns.make_moving_aircrafts_columns,
+        args.repeat,
+    )
+    run_case(
+        "moving aircrafts with escaped IDs",
+        make_datagrams(1004, args.count, make_escaped_aircraft_data),
+        parsers.parse_moving_aircraft_position,
+        columns.make_moving_aircrafts_columns,
+        args.repeat,
+    )
+    run_case(
+        "houses",
+        make_datagrams(1020, args.count, make_house_data),
+        parsers.parse_house_position,
+        columns.make_houses_columns,
+        args.repeat,
+    )
+
+
+if __name__ == '__main__':
+    main()
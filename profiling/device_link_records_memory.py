@@ -0,0 +1,104 @@
+#! /usr/bin/env python
+# coding: utf-8
+
+"""
+Compare memory occupied by positions of actors represented as structures and
+as tuple-backed records.
+
+Usage:
+
+    python profiling/device_link_records_memory.py [--count 10000]
+
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from il2fb.ds.middleware.device_link import parsers
+from il2fb.ds.middleware.device_link.constants import HouseStatuses
+
+
+def load_args():
+    parser = argparse.ArgumentParser(
+        description="Memory usage of Device Link positions"
+    )
+    parser.add_argument(
+        '-c', '--count',
+        dest='count',
+        type=int,
+        default=10000,
+        help="Number of actors. Default: 10000",
+    )
+    return parser.parse_args()
+
+
+def make_aircraft_items(count):
+    return [
+        (i, f"r01{i:03d}{i % 4};{i * 10.5};{i * 20.25};{1000 + i}")
+        for i in range(count)
+    ]
+
+
+def make_house_items(count):
+    return [
+        (i, f"{i}_bld;{i * 10.5};{i * 20.25};{'AD'[i % 2]}")
+        for i in range(count)
+    ]
+
+
+def measure(items, parser):
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        results = [parser(item) for item in items]
+        size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return results, size
+
+
+def run_case(title, items, structure_parser, record_parser):
+    structures, structures_size = measure(items, structure_parser)
+    records, records_size = measure(items, record_parser)
+
+    assert [x.to_primitive() for x in records] == [
+        x.to_primitive() for x in structures
+    ], "primitives differ"
+
+    print(f"{title} ({len(items)} actors):")
+
+    for name, size in [
+        ('structures', structures_size),
+        ('records', records_size),
+    ]:
+        print(
+            f"  {name:<12} {size / 1024:10.1f} KiB "
+            f"({size / len(items):6.1f} B per actor)"
+        )
+
+
+def main():
+    args = load_args()
+
+    # make sure lazily created constants do not affect measurements
+    HouseStatuses.get_by_value(HouseStatuses.alive.value)
+
+    run_case(
+        "moving aircrafts",
+        make_aircraft_items(args.count),
+        parsers.parse_moving_aircraft_position,
+        parsers.parse_moving_aircraft_record,
+    )
+    run_case(
+        "houses",
+        make_house_items(args.count),
+        parsers.parse_house_position,
+        parsers.parse_house_record,
+    )
+
+
+if __name__ == '__main__':
+    main()
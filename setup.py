@@ -50,6 +50,9 @@ setup(
     ],
     include_package_data=True,
     install_requires=REQUIREMENTS,
+    extras_require={
+        'numpy': ['numpy>=1.13'],
+    },
     dependency_links=DEPENDENCIES,
     classifiers=[
         'Development Status :: 5 - Production/Stable',
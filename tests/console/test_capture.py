@@ -0,0 +1,112 @@
+# coding: utf-8
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.ds.middleware.console.capture import (  # noqa: E402
+    ConsoleCapture, ReplayTransport, load_inbound_chunks, read_capture,
+    replay_chunks,
+)
+from il2fb.ds.middleware.console.client import ConsoleClient  # noqa: E402
+from il2fb.ds.middleware.console.constants import (  # noqa: E402
+    ChunkDirections,
+)
+from il2fb.ds.middleware.console.exceptions import ConsoleError  # noqa: E402
+from il2fb.ds.middleware.device_link import capture as dl_capture  # noqa
+from il2fb.ds.middleware.device_link.constants import (  # noqa: E402
+    DatagramDirections,
+)
+from il2fb.ds.middleware.device_link.exceptions import (  # noqa: E402
+    DeviceLinkError,
+)
+
+
+# a message split between two reads
+CHUNKS = [
+    b"socket channel '3', ip 127.0.0.1:1234, john.doe, is com",
+    b"plete created\\n\r\n",
+    (
+        b"socketConnection with 127.0.0.1:1234 on channel 3 lost.  "
+        b"Reason: \\n\r\n"
+    ),
+]
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def connect(loop, **kwargs):
+    client = ConsoleClient(loop=loop, **kwargs)
+    client.connection_made(ReplayTransport())
+
+    events = []
+    client.subscribe_to_human_connection_events(events.append)
+
+    return client, events
+
+
+def stop(loop, client):
+    client.close()
+    loop.run_until_complete(client.wait_closed())
+
+
+def test_capture_round_trip(tmpdir):
+    path = str(tmpdir.join('session.csc'))
+
+    with ConsoleCapture(path) as capture:
+        capture.write(ChunkDirections.outbound, b"user\n")
+        capture.write(ChunkDirections.inbound, CHUNKS[0])
+
+    assert [(x.direction, x.data) for x in read_capture(path)] == [
+        (ChunkDirections.outbound, b"user\n"),
+        (ChunkDirections.inbound, CHUNKS[0]),
+    ]
+    assert load_inbound_chunks(path) == CHUNKS[:1]
+
+
+def test_replay_of_captured_chunks(loop, tmpdir):
+    path = str(tmpdir.join('session.csc'))
+
+    with ConsoleCapture(path) as capture:
+        client, expected = connect(loop, capture=capture)
+
+        for chunk in CHUNKS:
+            client.data_received(chunk)
+
+        stop(loop, client)
+
+    chunks = load_inbound_chunks(path)
+    assert chunks == CHUNKS
+
+    client, events = connect(loop)
+    assert replay_chunks(client, chunks) == 3
+    stop(loop, client)
+
+    assert [event.name for event in events] == [
+        "HumanHasConnected", "HumanHasDisconnected",
+    ]
+    assert events == expected
+
+
+def test_captures_of_subsystems_are_not_mixed(tmpdir):
+    console_path = str(tmpdir.join('session.csc'))
+    device_link_path = str(tmpdir.join('session.dlc'))
+
+    with ConsoleCapture(console_path) as capture:
+        capture.write(ChunkDirections.inbound, CHUNKS[0])
+
+    with dl_capture.DatagramCapture(device_link_path) as capture:
+        capture.write(DatagramDirections.sent, b"R/1002")
+
+    with pytest.raises(ConsoleError):
+        list(read_capture(device_link_path))
+
+    with pytest.raises(DeviceLinkError):
+        list(dl_capture.read_capture(console_path))
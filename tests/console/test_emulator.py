@@ -0,0 +1,146 @@
+# coding: utf-8
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.commons import MissionStatuses  # noqa: E402
+
+from il2fb.ds.middleware.console import events  # noqa: E402
+from il2fb.ds.middleware.console.client import ConsoleClient  # noqa: E402
+from il2fb.ds.middleware.console.emulator import (  # noqa: E402
+    ConsoleEmulator, format_message,
+)
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def run(loop, aw, timeout=2.0):
+    return loop.run_until_complete(asyncio.wait_for(aw, timeout, loop=loop))
+
+
+class Connection:
+
+    def __init__(self, loop, emulator):
+        self.loop = loop
+        self.emulator = emulator
+        self.server = run(loop, loop.create_server(
+            emulator.make_protocol, '127.0.0.1', 0,
+        ))
+        host, port = self.server.sockets[0].getsockname()[:2]
+
+        self.client = ConsoleClient(loop=loop)
+        run(loop, loop.create_connection(lambda: self.client, host, port))
+
+        self.events = []
+        self.client.subscribe_to_chat(self.events.append)
+        self.client.subscribe_to_human_connection_events(self.events.append)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.client.close()
+        run(self.loop, self.client.wait_closed())
+        self.emulator.close()
+        self.server.close()
+        run(self.loop, self.server.wait_closed())
+
+
+def test_requests(loop):
+    emulator = ConsoleEmulator(humans_count=3, server_name="Test", loop=loop)
+
+    with Connection(loop, emulator) as c:
+        assert run(loop, c.client.get_server_info()).name == "Test"
+
+        humans = run(loop, c.client.get_humans_list())
+        assert [x.callsign for x in humans] == ["User0", "User1", "User2"]
+
+        statistics = run(loop, c.client.get_humans_statistics())
+        assert [x.callsign for x in statistics] == ["User0", "User1", "User2"]
+
+        run(loop, c.client.load_mission("net/dogfight/test.mis"))
+        run(loop, c.client.begin_mission())
+        info = run(loop, c.client.get_mission_info())
+        assert info.status == MissionStatuses.playing
+        assert info.file_path == "net/dogfight/test.mis"
+
+        run(loop, c.client.kick_human_by_callsign("User1"))
+        assert run(loop, c.client.get_humans_count()) == 2
+        assert [x.callsign for x in emulator.humans] == ["User0", "User2"]
+        assert emulator.connections_count == 1
+
+    assert [type(x) for x in c.events] == [events.HumanHasDisconnected]
+    assert c.events[0].channel == 2
+
+
+def test_chat_and_floods(loop):
+    emulator = ConsoleEmulator(chunk_size=100, loop=loop)
+
+    with Connection(loop, emulator) as c:
+        run(loop, c.client.chat_to_all("hello"))
+
+        # output is ordered, so the answer follows the flood
+        run(loop, emulator.emit_connection_flood(10, batch_size=3))
+        run(loop, emulator.emit_chat_flood(5, body="spam"))
+        assert run(loop, c.client.get_humans_count()) == 0
+
+    chat = [
+        x for x in c.events
+        if isinstance(x, events.ChatMessageWasReceived)
+    ]
+    assert [x.body for x in chat] == (
+        ["hello"] + [f"spam {i}" for i in range(5)]
+    )
+
+    names = [x.name for x in c.events if x not in chat]
+    assert names == (
+        ["HumanHasStartedConnection", "HumanHasConnected"] * 10
+        + ["HumanHasDisconnected"] * 10
+    )
+
+
+def test_commands_of_connection_are_delayed(loop):
+    emulator = ConsoleEmulator(latency=0.1, loop=loop)
+
+    with Connection(loop, emulator) as c:
+        started_at = loop.time()
+        run(loop, c.client.get_humans_count())
+        run(loop, c.client.get_humans_count())
+
+        assert loop.time() - started_at >= 0.2
+
+
+def test_execute():
+    emulator = ConsoleEmulator()
+
+    assert emulator.execute("") == []
+    assert emulator.execute("foo bar") == ["Command not found: foo bar"]
+    assert emulator.execute("mission") == ["Mission NOT loaded"]
+    assert emulator.execute("mission BEGIN") == [
+        "ERROR mission: Mission NOT loaded",
+    ]
+
+    emulator.add_human("john.doe", emit=False)
+    emulator.add_human("jane.doe", emit=False)
+    emulator.execute("kick# 2")
+    assert [x.callsign for x in emulator.humans] == ["john.doe"]
+
+
+def test_iter_chunks_keeps_messages_whole():
+    emulator = ConsoleEmulator(chunk_size=20)
+    messages = [format_message(s) for s in ["aaaa", "bbbbbbbb", "c" * 30]]
+
+    chunks = list(emulator.iter_chunks(messages))
+
+    assert chunks == [
+        (messages[0] + messages[1]).encode(),
+        messages[2].encode(),
+    ]
@@ -0,0 +1,88 @@
+# coding: utf-8
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.ds.middleware.device_link import parsers  # noqa: E402
+from il2fb.ds.middleware.device_link.aggregation import (  # noqa: E402
+    GroundColumnsAggregator, aggregate_ground_columns, get_heading,
+)
+
+
+def make_units(positions, offset=(0.0, 0.0)):
+    dx, dy = offset
+    return [
+        parsers.parse_moving_ground_unit_record(
+            (index, f"{column}_Chief{member};{x + dx};{y + dy};0.0")
+        )
+        for index, (column, member, x, y) in enumerate(positions)
+    ]
+
+
+# column 0 moves north-east with its lead ahead, column 1 has a single unit
+POSITIONS = [
+    (0, 1, 10.0, 10.0),
+    (0, 0, 20.0, 20.0),
+    (0, 2, 0.0, 0.0),
+    (1, 0, 500.0, 500.0),
+]
+
+
+def test_get_heading():
+    assert get_heading(0, 1) == 0
+    assert get_heading(1, 0) == 90
+    assert get_heading(0, -1) == 180
+    assert get_heading(-1, 0) == 270
+    assert get_heading(0, 0) is None
+
+
+def test_aggregate_ground_columns():
+    column, single = aggregate_ground_columns(make_units(POSITIONS))
+
+    assert column.id == '0_Chief'
+    assert column.count == 3
+    assert (column.centroid.x, column.centroid.y) == (10.0, 10.0)
+    assert column.bbox == (0.0, 0.0, 20.0, 20.0)
+    assert column.heading == pytest.approx(45.0)
+    assert column.lead_member_index == 0
+    assert column.lead_index == 1
+    assert (column.lead_pos.x, column.lead_pos.y) == (20.0, 20.0)
+
+    assert single.count == 1
+    assert single.heading is None
+
+
+def test_lead_only_update_agrees_with_full_one():
+    aggregator = GroundColumnsAggregator()
+    aggregator.update(make_units(POSITIONS))
+    assert aggregator.lead_indices == [1, 3]
+
+    # leads move sideways, which must not turn columns
+    offset = (100.0, -50.0)
+    leads = [
+        item for item in make_units(POSITIONS, offset)
+        if item.index in aggregator.lead_indices
+    ]
+    shifted = aggregator.update_leads(leads)
+    assert not aggregator.needs_full_update
+
+    full = aggregate_ground_columns(make_units(POSITIONS, offset))
+
+    for a, b in zip(shifted, full):
+        assert a.to_primitive() == b.to_primitive()
+
+
+def test_shifted_lead_needs_full_update():
+    aggregator = GroundColumnsAggregator()
+    aggregator.update(make_units(POSITIONS))
+
+    # the lead of column 0 has been destroyed and indices have shifted
+    positions = [x for x in POSITIONS if x[:2] != (0, 0)]
+    leads = [
+        item for item in make_units(positions)
+        if item.index in aggregator.lead_indices
+    ]
+    aggregator.update_leads(leads)
+
+    assert aggregator.needs_full_update
@@ -0,0 +1,159 @@
+# coding: utf-8
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.ds.middleware.device_link import records  # noqa: E402
+from il2fb.ds.middleware.device_link.caches import (  # noqa: E402
+    MissionObjectsCache,
+)
+from il2fb.ds.middleware.device_link.constants import (  # noqa: E402
+    HOUSE_STATUS_ALIVE, HOUSE_STATUS_DEAD, HOUSE_STATUS_UNKNOWN,
+    HouseStatuses,
+)
+
+
+class FakeClient:
+
+    def __init__(self, houses, objects_count=0):
+        self.houses = houses
+        self.objects_count = objects_count
+        self.houses_downloads = 0
+        self.statuses_downloads = 0
+        self.objects_downloads = 0
+        self.statuses_counts = []
+
+    async def get_houses_count(self, timeout=None):
+        return len(self.houses)
+
+    async def get_all_houses_statuses(self, timeout=None, count=None):
+        self.statuses_downloads += 1
+        self.statuses_counts.append(count)
+        return bytearray(
+            HOUSE_STATUS_ALIVE if status else HOUSE_STATUS_DEAD
+            for status in self.houses
+        )
+
+    async def get_all_houses_positions(self, timeout=None, **kwargs):
+        self.houses_downloads += 1
+        return [
+            records.HouseRecord(
+                i, f"{i}_bld", 10.0 * i, 0.0,
+                HouseStatuses.alive if status else HouseStatuses.dead,
+            )
+            for i, status in enumerate(self.houses)
+        ]
+
+    async def get_stationary_objects_count(self, timeout=None):
+        return self.objects_count
+
+    async def get_all_stationary_objects_positions(self, timeout=None, **kw):
+        self.objects_downloads += 1
+        return [
+            records.StationaryObjectRecord(i, f"{i}_Static", 1.0, 2.0, 3.0)
+            for i in range(self.objects_count)
+        ]
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_refresh_houses_loads_geometry_once(loop):
+    client = FakeClient([True, True, False])
+    cache = MissionObjectsCache()
+
+    assert loop.run_until_complete(cache.refresh_houses(client)) == []
+    assert cache.houses_count == 3
+    assert client.houses_downloads == 1
+    assert client.statuses_downloads == 0
+
+    client.houses[1] = False
+    assert loop.run_until_complete(cache.refresh_houses(client)) == [1]
+    assert loop.run_until_complete(cache.refresh_houses(client)) == []
+
+    assert client.houses_downloads == 1
+    assert client.statuses_downloads == 2
+    assert client.statuses_counts == [3, 3]
+
+    house = cache.get_house(1)
+    assert house.id == "1_bld"
+    assert house.pos.x == 10.0
+    assert house.status == HouseStatuses.dead
+
+
+def test_refresh_houses_downloads_once_when_count_changes(loop):
+    client = FakeClient([True, True])
+    cache = MissionObjectsCache()
+    loop.run_until_complete(cache.refresh_houses(client))
+
+    client.houses.append(True)
+    assert loop.run_until_complete(cache.refresh_houses(client)) == []
+
+    assert cache.houses_count == 3
+    assert client.houses_downloads == 2
+    assert client.statuses_downloads == 0
+
+
+def test_update_houses_statuses_keeps_unknown_statuses():
+    cache = MissionObjectsCache()
+    cache.load_houses(
+        [
+            records.HouseRecord(0, "0_bld", 0.0, 0.0, HouseStatuses.alive),
+            records.HouseRecord(1, "1_bld", 0.0, 0.0, HouseStatuses.alive),
+        ],
+        count=2,
+    )
+
+    statuses = bytearray([HOUSE_STATUS_UNKNOWN, HOUSE_STATUS_DEAD])
+    assert cache.update_houses_statuses(statuses) == [1]
+    assert cache.houses_statuses == bytearray([
+        HOUSE_STATUS_ALIVE, HOUSE_STATUS_DEAD,
+    ])
+
+    with pytest.raises(ValueError):
+        cache.update_houses_statuses(bytearray([HOUSE_STATUS_ALIVE]))
+
+
+def test_set_mission_invalidates_cache(loop):
+    client = FakeClient([True], objects_count=2)
+    cache = MissionObjectsCache(mission="a.mis")
+    loop.run_until_complete(cache.refresh_houses(client))
+    loop.run_until_complete(cache.refresh_stationary_objects(client))
+
+    cache.set_mission("a.mis")
+    assert cache.houses_count == 1
+    assert cache.stationary_objects_count == 2
+
+    cache.set_mission("b.mis")
+    assert cache.houses_count == 0
+    assert cache.stationary_objects_count == 0
+    assert cache.get_houses() == []
+
+    loop.run_until_complete(cache.refresh_houses(client))
+    assert client.houses_downloads == 2
+
+
+def test_refresh_stationary_objects_reloads_on_count_change(loop):
+    client = FakeClient([], objects_count=2)
+    cache = MissionObjectsCache()
+
+    assert loop.run_until_complete(cache.refresh_stationary_objects(client))
+    assert not loop.run_until_complete(
+        cache.refresh_stationary_objects(client)
+    )
+    assert client.objects_downloads == 1
+
+    client.objects_count = 3
+    assert loop.run_until_complete(cache.refresh_stationary_objects(client))
+    assert client.objects_downloads == 2
+
+    item = cache.get_stationary_objects()[2]
+    assert item.id == "2_Static"
+    assert (item.pos.x, item.pos.y, item.pos.z) == (1.0, 2.0, 3.0)
@@ -0,0 +1,57 @@
+# coding: utf-8
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.ds.middleware.device_link.capture import (  # noqa: E402
+    DatagramCapture, read_capture,
+)
+from il2fb.ds.middleware.device_link.constants import (  # noqa: E402
+    DatagramDirections,
+)
+from il2fb.ds.middleware.device_link.exceptions import (  # noqa: E402
+    DeviceLinkError,
+)
+
+
+def test_capture_round_trip(tmpdir):
+    path = str(tmpdir.join('session.dlc'))
+
+    with DatagramCapture(path) as capture:
+        capture.write(DatagramDirections.sent, b"R/1002")
+        capture.write(DatagramDirections.received, b"A/1003\\5")
+
+    records = list(read_capture(path))
+
+    assert [(x.direction, x.data) for x in records] == [
+        (DatagramDirections.sent, b"R/1002"),
+        (DatagramDirections.received, b"A/1003\\5"),
+    ]
+    assert records[0].timestamp <= records[1].timestamp
+
+
+def test_read_capture_skips_incomplete_record(tmpdir):
+    path = str(tmpdir.join('session.dlc'))
+
+    with DatagramCapture(path) as capture:
+        capture.write(DatagramDirections.sent, b"R/1002")
+        capture.write(DatagramDirections.received, b"A/1003\\5")
+
+    with open(path, 'r+b') as f:
+        f.truncate(f.seek(0, 2) - 1)
+
+    assert [x.data for x in read_capture(path)] == [b"R/1002"]
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'IL2FBDLS\x01\x00\x00\x00\x00\x00\x00\x00',
+    b'IL2FBDLC\x02\x00\x00\x00\x00\x00\x00\x00',
+])
+def test_read_invalid_capture(tmpdir, data):
+    path = tmpdir.join('session.dlc')
+    path.write_binary(data)
+
+    with pytest.raises(DeviceLinkError):
+        list(read_capture(str(path)))
@@ -0,0 +1,121 @@
+# coding: utf-8
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+pytest.importorskip('numpy')
+
+from il2fb.ds.middleware.device_link import requests  # noqa: E402
+from il2fb.ds.middleware.device_link.constants import (  # noqa: E402
+    ACTOR_INDEX_ERROR, ACTOR_STATUS_ERROR, PositionsFormats,
+    STATIC_AIRCRAFT_WITH_HUMAN_SPAWNED_IN,
+)
+from il2fb.ds.middleware.device_link.exceptions import (  # noqa: E402
+    DeviceLinkValueError,
+)
+
+
+CATEGORIES = [
+    (
+        requests.GetMovingAircraftsPositionsRequest,
+        [
+            (0, "r01000;100.5;200.25;1000.0"),
+            (1, "r01001;-1.5;2.0;3.0"),
+            (2, "r01001;4.0;5.0;6.0"),
+            (3, "TheUser_0;7.0;8.0;9.0"),
+            (4, "TheUser_1;10.0;11.0;12.0"),
+            (5, ACTOR_INDEX_ERROR),
+        ],
+    ),
+    (
+        requests.GetMovingGroundUnitsPositionsRequest,
+        [
+            (0, "0_Chief0;1.0;2.0;3.0"),
+            (1, "0_Chief1;4.5;5.5;6.5"),
+            (2, "1_Chief0;7.0;8.0;0.0"),
+            (3, ACTOR_STATUS_ERROR),
+        ],
+    ),
+    (
+        requests.GetShipsPositionsRequest,
+        [
+            (0, "0_Chief;1.0;2.0"),
+            (1, "1_Static;3.5;4.5"),
+        ],
+    ),
+    (
+        requests.GetStationaryObjectsPositionsRequest,
+        [
+            (0, "0_Static;1.0;2.0;3.0"),
+            (1, STATIC_AIRCRAFT_WITH_HUMAN_SPAWNED_IN),
+            (2, "1_Static;4.0;5.0;6.0"),
+        ],
+    ),
+    (
+        requests.GetHousesPositionsRequest,
+        [
+            (0, "0_bld;1.0;2.0;A"),
+            (1, "1_bld;3.5;4.5;D"),
+            (2, "0_bld;5.0;6.0;A"),
+        ],
+    ),
+]
+
+
+def to_primitives(items):
+    return [x.to_primitive() for x in items]
+
+
+@pytest.mark.parametrize('request_class, items', CATEGORIES)
+def test_result_formats_are_equal(request_class, items):
+    structures = request_class.extract_items(
+        items, PositionsFormats.structures,
+    )
+    records = request_class.extract_items(items, PositionsFormats.records)
+    columns = request_class.extract_items(items, PositionsFormats.columns)
+
+    assert structures
+    assert to_primitives(records) == to_primitives(structures)
+    assert to_primitives(columns) == to_primitives(structures)
+    assert len(columns) == len(structures)
+
+
+@pytest.mark.parametrize('request_class, items', CATEGORIES)
+def test_empty_result_formats_are_equal(request_class, items):
+    for result_format in PositionsFormats.iterconstants():
+        assert not request_class.extract_items([], result_format)
+
+    result = request_class.make_empty_result(PositionsFormats.columns)
+    assert len(result) == 0
+    assert result.structure_class is (
+        request_class.extract_items([], PositionsFormats.columns)
+        .structure_class
+    )
+    assert to_primitives(result) == []
+
+    result = request_class.make_empty_result(
+        PositionsFormats.columns, timestamped=True,
+    )
+    assert len(result.items) == 0
+    assert result.receive_times == {}
+
+
+@pytest.mark.parametrize('result_format', [
+    PositionsFormats.structures,
+    PositionsFormats.records,
+    PositionsFormats.columns,
+])
+def test_unknown_house_status_is_rejected(result_format):
+    items = [(0, "0_bld;1.0;2.0;A"), (1, "1_bld;3.0;4.0;X")]
+
+    with pytest.raises(ValueError):
+        requests.GetHousesPositionsRequest.extract_items(items, result_format)
+
+
+def test_unknown_house_status_columns_error():
+    items = [(0, "0_bld;1.0;2.0;X")]
+
+    with pytest.raises(DeviceLinkValueError):
+        requests.GetHousesPositionsRequest.extract_items(
+            items, PositionsFormats.columns,
+        )
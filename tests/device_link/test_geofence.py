@@ -0,0 +1,212 @@
+# coding: utf-8
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+np = pytest.importorskip('numpy')
+
+from il2fb.ds.middleware.device_link import columns  # noqa: E402
+from il2fb.ds.middleware.device_link import parsers  # noqa: E402
+from il2fb.ds.middleware.device_link.constants import (  # noqa: E402
+    GeofenceEventTypes,
+)
+from il2fb.ds.middleware.device_link.geofence import (  # noqa: E402
+    Geofence, Zone,
+)
+
+
+SQUARE = Zone('square', [(0, 0), (100, 0), (100, 100), (0, 100)])
+
+# U-shaped polygon with a notch at 40 < x < 60, y > 20
+CONCAVE = Zone('concave', [
+    (0, 0), (100, 0), (100, 100), (60, 100),
+    (60, 20), (40, 20), (40, 100), (0, 100),
+])
+
+
+def make_aircrafts(positions):
+    return [
+        parsers.parse_moving_aircraft_record(
+            (i, f"r{i:03d}0;{x};{y};1000.0")
+        )
+        for i, (x, y) in enumerate(positions)
+    ]
+
+
+def key(i):
+    return (f"r{i:03d}", 0)
+
+
+def make_ground_units_columns(positions):
+    return columns.make_moving_ground_units_columns([
+        (i, f"0_Chief{i};{x};{y};0.0")
+        for i, (x, y) in enumerate(positions)
+    ])
+
+
+def get_events(events):
+    return sorted(
+        (event.type.value, event.zone.name, event.key)
+        for event in events
+    )
+
+
+def get_inside(geofence, zone, positions):
+    geofence.reset()
+    events = geofence.update(make_aircrafts(positions))
+    return sorted(
+        event.item.index
+        for event in events
+        if event.zone is zone
+    )
+
+
+def test_zone_requires_3_vertices():
+    with pytest.raises(ValueError):
+        Zone('line', [(0, 0), (1, 1)])
+
+
+def test_enter_and_leave():
+    geofence = Geofence([SQUARE], cell_size=30)
+
+    events = geofence.update(make_aircrafts([(10, 10), (500, 500)]))
+    assert get_events(events) == [('entered', 'square', key(0))]
+    assert events[0].item.index == 0
+    assert geofence.get_zones_of(key(0)) == [SQUARE]
+
+    # no changes of state, no events
+    assert geofence.update(make_aircrafts([(20, 20), (500, 500)])) == []
+
+    events = geofence.update(make_aircrafts([(200, 20), (50, 50)]))
+    assert get_events(events) == [
+        ('entered', 'square', key(1)),
+        ('left', 'square', key(0)),
+    ]
+
+    left = [
+        event for event in events
+        if event.type == GeofenceEventTypes.left
+    ][0]
+    assert left.item.pos.x == 200
+
+
+def test_disappeared_actors_leave_with_latest_position():
+    geofence = Geofence([SQUARE])
+    geofence.update(make_aircrafts([(10, 10)]))
+
+    events = geofence.update([])
+    assert get_events(events) == [('left', 'square', key(0))]
+    assert events[0].item.pos.x == 10
+    assert geofence.get_zones_of(key(0)) == []
+
+
+def test_columns_structures_are_created_for_events_only(monkeypatch):
+    geofence = Geofence([SQUARE])
+    created = []
+    get_structure = columns.ActorPositionsColumns.get_structure
+
+    def counting_get_structure(self, i):
+        created.append(i)
+        return get_structure(self, i)
+
+    monkeypatch.setattr(
+        columns.ActorPositionsColumns, 'get_structure',
+        counting_get_structure,
+    )
+
+    positions = [(10, 10), (20, 20), (500, 500), (30, 30)]
+    events = geofence.update(make_ground_units_columns(positions))
+    assert len(events) == 3
+    assert sorted(created) == [0, 1, 3]
+    assert events[0].item.id == '0_Chief'
+
+    del created[:]
+    positions = [(11, 11), (21, 21), (500, 500), (300, 30)]
+    events = geofence.update(make_ground_units_columns(positions))
+    assert get_events(events) == [('left', 'square', ('0_Chief', 3))]
+    assert created == [3]
+
+    del created[:]
+    events = geofence.update(make_aircrafts([]))
+    assert len(events) == 2
+    assert sorted(created) == [0, 1]
+    assert sorted(event.item.pos.x for event in events) == [11, 21]
+
+
+def test_mixed_snapshots():
+    geofence = Geofence([SQUARE])
+    events = geofence.update(
+        make_aircrafts([(10, 10)]),
+        [],
+        make_ground_units_columns([(500, 500), (20, 20)]),
+    )
+    assert get_events(events) == [
+        ('entered', 'square', ('0_Chief', 1)),
+        ('entered', 'square', key(0)),
+    ]
+    assert {event.item.pos.x for event in events} == {10, 20}
+
+
+def test_point_in_polygon_edges():
+    geofence = Geofence([SQUARE])
+
+    # the even-odd rule includes left and bottom edges only
+    assert get_inside(geofence, SQUARE, [
+        (0, 50), (100, 50), (50, 0), (50, 100), (0, 0), (100, 100),
+    ]) == [0, 2, 4]
+
+
+def test_point_in_concave_polygon():
+    geofence = Geofence([CONCAVE])
+
+    assert get_inside(geofence, CONCAVE, [
+        (20, 50), (50, 50), (80, 50), (50, 10), (50, 20), (120, 50),
+    ]) == [0, 2, 3]
+
+
+def test_zones_spanning_many_cells_and_negative_coordinates():
+    triangle = Zone('triangle', [(-5000, -5000), (5000, -5000), (0, 5000)])
+    geofence = Geofence([SQUARE, triangle], cell_size=1000)
+
+    events = geofence.update(make_aircrafts([
+        (-4000, -4999), (4500, 4500), (0, 4900), (50, 50), (-6000, 0),
+    ]))
+    assert get_events(events) == [
+        ('entered', 'square', key(3)),
+        ('entered', 'triangle', key(0)),
+        ('entered', 'triangle', key(2)),
+        ('entered', 'triangle', key(3)),
+    ]
+
+
+def test_matches_brute_force():
+    triangle = Zone('triangle', [(50, 50), (3000, 50), (50, 3000)])
+    zones = [SQUARE, CONCAVE, triangle]
+    geofence = Geofence(zones, cell_size=100)
+
+    rng = np.random.RandomState(0)
+    positions = rng.uniform(-100, 3100, (2000, 2)).tolist()
+    events = geofence.update(make_aircrafts(positions))
+
+    def contains(zone, x, y):
+        vertices = zone.vertices
+        result = False
+
+        for k, (x1, y1) in enumerate(vertices):
+            x2, y2 = vertices[(k + 1) % len(vertices)]
+            crosses = (y1 > y) != (y2 > y)
+
+            if crosses and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                result = not result
+
+        return result
+
+    expected = {
+        (zone.name, i)
+        for i, (x, y) in enumerate(positions)
+        for zone in zones
+        if contains(zone, x, y)
+    }
+    assert {(event.zone.name, event.item.index) for event in events} == (
+        expected
+    )
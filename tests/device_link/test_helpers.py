@@ -0,0 +1,154 @@
+# coding: utf-8
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.ds.middleware.device_link import messages as msg  # noqa: E402
+from il2fb.ds.middleware.device_link.exceptions import DeviceLinkError  # noqa
+from il2fb.ds.middleware.device_link.helpers import (  # noqa: E402
+    clear_actor_id_caches, compose_positions_requests, compose_request,
+    decompose_data, get_actor_id_caches_info, scan_actor_positions,
+    split_aircraft_id, split_ground_unit_id, split_messages,
+)
+
+
+def scan_with_messages(data):
+    results = []
+
+    for message in decompose_data(data):
+        index, value = message.value.split(':', 1)
+        results.append((int(index), value))
+
+    return results
+
+
+def test_scan_actor_positions_unescaped():
+    data = b'A/30\\0:r01000;1.5;2.5;3.0/30\\1:r01001;4.5;5.5;6.0'
+
+    assert scan_actor_positions(data) == [
+        (0, 'r01000;1.5;2.5;3.0'),
+        (1, 'r01001;4.5;5.5;6.0'),
+    ]
+    assert scan_actor_positions(data) == scan_with_messages(data)
+
+
+def test_scan_actor_positions_escaped_with_floats():
+    data = b'A/30\\0:foo\\/bar;1.5;2.5;3.0/30\\1:baz\\\\;4.5;5.5;6.0'
+
+    assert scan_actor_positions(data) == [
+        (0, 'foo/bar;1.5;2.5;3.0'),
+        (1, 'baz\\;4.5;5.5;6.0'),
+    ]
+    assert scan_actor_positions(data) == scan_with_messages(data)
+
+
+def test_scan_actor_positions_escaped_backslash_before_separator():
+    data = b'A/30\\0:foo\\/bar\\\\/30\\1:baz;1;2;3'
+
+    assert scan_actor_positions(data) == [
+        (0, 'foo/bar\\'),
+        (1, 'baz;1;2;3'),
+    ]
+    assert scan_actor_positions(data) == scan_with_messages(data)
+
+
+def test_scan_actor_positions_empty():
+    assert scan_actor_positions(b'A/') == []
+
+
+@pytest.mark.parametrize('data', [
+    b'A/30\\0:foo\\/bar;1;2;3\\',
+    b'A/30\\0:foo\\/bar;1;2;3//30\\1:baz;1;2;3',
+    b'A/30\\0foo;1;2;3',
+    b'A/junk',
+    b'X/30\\0:foo;1;2;3',
+])
+def test_scan_actor_positions_malformed(data):
+    with pytest.raises(DeviceLinkError):
+        scan_actor_positions(data)
+
+
+def test_split_messages():
+    assert split_messages(b'1\\a/2\\b') == [b'1\\a', b'2\\b']
+    assert split_messages(b'1\\a\\/b/2\\\\\\/') == [b'1\\a\\/b', b'2\\\\\\/']
+
+
+def test_split_aircraft_id():
+    assert split_aircraft_id("r01001") == ("r0100", 1, False)
+    assert split_aircraft_id("TheUser_0") == ("TheUser", None, True)
+
+
+def test_split_ground_unit_id():
+    assert split_ground_unit_id("12_Chief3") == ("12_Chief", 3)
+
+
+def test_split_actor_ids_are_memoized():
+    clear_actor_id_caches()
+
+    # build IDs at runtime, so they are not interned by the compiler
+    first = split_aircraft_id(''.join(["r0100", "1"]))
+    second = split_aircraft_id(''.join(["r0100", "1"]))
+    other = split_aircraft_id("r01002")
+
+    assert first is second
+    assert first[0] is other[0]
+
+    split_ground_unit_id("0_Chief1")
+    split_ground_unit_id("0_Chief1")
+
+    info = get_actor_id_caches_info()
+    assert info['aircrafts']['hits'] == 1
+    assert info['aircrafts']['misses'] == 2
+    assert info['aircrafts']['size'] == 2
+    assert info['aircrafts']['hit_rate'] == pytest.approx(1 / 3)
+    assert info['ground_units']['hits'] == 1
+    assert info['ground_units']['misses'] == 1
+
+    clear_actor_id_caches()
+
+    info = get_actor_id_caches_info()
+    assert info['aircrafts']['size'] == 0
+    assert info['aircrafts']['hit_rate'] == 0.0
+
+
+def compose_with_messages(opcode, indices, group_size):
+    indices = list(indices)
+    groups = [
+        indices[start:start + group_size]
+        for start in range(0, len(indices), group_size)
+    ]
+    return [
+        (
+            compose_request([msg.make_message(opcode, i) for i in group]),
+            len(group),
+        )
+        for group in groups
+    ]
+
+
+@pytest.mark.parametrize('indices', [
+    range(0),
+    range(1),
+    range(5, 95),
+    [3, 1, 4, 1, 5, 9, 2, 6],
+])
+def test_compose_positions_requests(indices):
+    opcode = msg.MovingAircraftPositionRequestMessage.opcode
+
+    assert compose_positions_requests(opcode, indices, group_size=40) == (
+        compose_with_messages(opcode, indices, group_size=40)
+    )
+
+
+def test_compose_positions_requests_reuses_full_groups():
+    opcode = msg.ShipPositionRequestMessage.opcode
+
+    first = compose_positions_requests(opcode, range(50), group_size=20)
+    second = compose_positions_requests(opcode, range(45), group_size=20)
+
+    assert [count for data, count in first] == [20, 20, 10]
+    assert [count for data, count in second] == [20, 20, 5]
+    assert first[0][0] is second[0][0]
+    assert first[1][0] is second[1][0]
+    assert first[2] != second[2]
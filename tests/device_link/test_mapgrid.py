@@ -0,0 +1,66 @@
+# coding: utf-8
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+np = pytest.importorskip('numpy')
+
+from il2fb.ds.middleware.device_link import records  # noqa: E402
+from il2fb.ds.middleware.device_link.mapgrid import (  # noqa: E402
+    MapGrid, format_map_grid_label, get_column_letters, label_positions,
+)
+
+
+POSITIONS = [
+    (15000.0, 25000.0),
+    (1000.0, 9000.0),
+    (-1.0, 0.0),
+    (15000.0, 25000.0),
+]
+
+
+def ships(positions):
+    return [
+        records.ShipRecord(index, f"{index}_Chief", False, x, y)
+        for index, (x, y) in enumerate(positions)
+    ]
+
+
+@pytest.mark.parametrize('i, letters', [
+    (0, 'A'),
+    (25, 'Z'),
+    (26, 'AA'),
+    (27, 'AB'),
+    (701, 'ZZ'),
+    (702, 'AAA'),
+])
+def test_get_column_letters(i, letters):
+    assert get_column_letters(i) == letters
+
+
+def test_format_map_grid_label():
+    assert format_map_grid_label(2, 6) == "C7"
+    assert format_map_grid_label(2, 6, (5, 1)) == "C7 kp5.1"
+
+
+def test_label_positions():
+    assert label_positions(ships(POSITIONS)) == [
+        "B3 kp5", "A1 kp7", None, "B3 kp5",
+    ]
+
+
+def test_label_positions_of_arrays():
+    x, y = np.array(POSITIONS).T
+    assert label_positions((x, y)) == label_positions(ships(POSITIONS))
+
+
+def test_label_positions_with_custom_grid():
+    grid = MapGrid(square_size=1000.0, origin_x=500.0, keypad_levels=2)
+    assert label_positions(ships([(1600.0, 900.0)]), grid) == ["B1 kp7.7"]
+
+    grid = MapGrid(keypad_levels=0)
+    assert label_positions(ships([(1600.0, 900.0)]), grid) == ["A1"]
+
+
+def test_label_positions_of_empty_snapshot():
+    assert label_positions([]) == []
@@ -0,0 +1,149 @@
+# coding: utf-8
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.ds.middleware.device_link.multiplexer import (  # noqa: E402
+    DeviceLinkMultiplexer,
+)
+
+
+class FakeServer(asyncio.DatagramProtocol):
+    """
+    Device Link which answers number of moving aircrafts.
+
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self.transport = None
+        self.requests = []
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.requests.append(data)
+        self.transport.sendto(f"A/1003\\{self.count}".encode(), addr)
+
+    @property
+    def address(self):
+        return self.transport.get_extra_info('sockname')
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def run(loop, aw, timeout=1.0):
+    return loop.run_until_complete(asyncio.wait_for(aw, timeout, loop=loop))
+
+
+def start_server(loop, protocol):
+    loop.run_until_complete(loop.create_datagram_endpoint(
+        lambda: protocol, local_addr=('127.0.0.1', 0),
+    ))
+    return protocol
+
+
+def start_multiplexer(loop):
+    mux = DeviceLinkMultiplexer(loop=loop)
+    loop.run_until_complete(loop.create_datagram_endpoint(
+        lambda: mux, local_addr=('127.0.0.1', 0),
+    ))
+    return mux
+
+
+def test_clients_share_socket(loop):
+    servers = [start_server(loop, FakeServer(count)) for count in (5, 7)]
+    mux = start_multiplexer(loop)
+
+    clients = [mux.add_client(server.address) for server in servers]
+
+    # a client added before the socket is opened is attached later
+    late_server = start_server(loop, FakeServer(9))
+    late_mux = DeviceLinkMultiplexer(loop=loop)
+    late_client = late_mux.add_client(late_server.address)
+    loop.run_until_complete(loop.create_datagram_endpoint(
+        lambda: late_mux, local_addr=('127.0.0.1', 0),
+    ))
+
+    results = run(loop, asyncio.gather(
+        *[
+            client.get_moving_aircrafts_count(timeout=1.0)
+            for client in clients + [late_client]
+        ],
+        loop=loop
+    ))
+
+    assert results == [5, 7, 9]
+    assert [len(server.requests) for server in servers] == [1, 1]
+    assert mux.get_client(servers[0].address) is clients[0]
+    assert set(mux.clients) == {server.address for server in servers}
+
+    for x in (mux, late_mux):
+        x.close()
+        run(loop, x.wait_closed())
+
+    for server in servers + [late_server]:
+        server.transport.close()
+
+
+def test_datagrams_are_routed_by_sender(loop):
+    server = start_server(loop, FakeServer(1))
+    stranger = start_server(loop, FakeServer(2))
+    mux = start_multiplexer(loop)
+    client = mux.add_client(server.address)
+
+    # the server does not answer, answers are injected instead
+    server.datagram_received = lambda data, addr: None
+
+    result = client.get_moving_aircrafts_count()
+    loop.run_until_complete(asyncio.sleep(0.05, loop=loop))
+
+    mux.datagram_received(b"A/1003\\2", stranger.address)
+    loop.run_until_complete(asyncio.sleep(0.05, loop=loop))
+    assert not result.done()
+
+    mux.datagram_received(b"A/1003\\1", server.address)
+    assert run(loop, result) == 1
+
+    mux.close()
+    run(loop, mux.wait_closed())
+
+    for x in (server, stranger):
+        x.transport.close()
+
+
+def test_add_client(loop):
+    mux = DeviceLinkMultiplexer(loop=loop)
+    mux.add_client(('127.0.0.1', 10000))
+
+    with pytest.raises(ValueError):
+        mux.add_client(('127.0.0.1', 10000))
+
+    mux.close()
+    assert mux.clients == {}
+
+    with pytest.raises(ConnectionAbortedError):
+        mux.add_client(('127.0.0.1', 10001))
+
+
+def test_close_waits_for_clients(loop):
+    server = start_server(loop, FakeServer(3))
+    mux = start_multiplexer(loop)
+    client = mux.add_client(server.address)
+
+    mux.close()
+    run(loop, mux.wait_closed())
+
+    assert client.wait_closed().done()
+    assert mux.clients == {}
+
+    server.transport.close()
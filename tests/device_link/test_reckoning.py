@@ -0,0 +1,79 @@
+# coding: utf-8
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+np = pytest.importorskip('numpy')
+
+from il2fb.ds.middleware.device_link import records  # noqa: E402
+from il2fb.ds.middleware.device_link.reckoning import (  # noqa: E402
+    DeadReckoner,
+)
+from il2fb.ds.middleware.device_link.structures import (  # noqa: E402
+    TimedActorPositions,
+)
+
+
+def ships(*positions):
+    return [
+        records.ShipRecord(index, f"{id}_Chief", False, x, y)
+        for index, (id, x, y) in enumerate(positions)
+    ]
+
+
+def test_position_at_extrapolates_velocity():
+    reckoner = DeadReckoner(horizon=2.0)
+    reckoner.update(ships((0, 0.0, 0.0), (1, 5.0, 5.0)), received_at=10.0)
+    reckoner.update(ships((0, 10.0, 20.0), (1, 5.0, 5.0)), received_at=11.0)
+
+    assert reckoner.keys == ["0_Chief", "1_Chief"]
+    assert reckoner.velocities.tolist() == [[10.0, 20.0, 0.0], [0, 0, 0]]
+
+    estimated = reckoner.position_at(11.5)
+    assert estimated.keys == ["0_Chief", "1_Chief"]
+    assert estimated.x.tolist() == [15.0, 5.0]
+    assert estimated.y.tolist() == [30.0, 5.0]
+    assert estimated.z.tolist() == [0.0, 0.0]
+
+    # positions are not extrapolated beyond the horizon or into the past
+    assert reckoner.position_at(20.0).x.tolist() == [30.0, 5.0]
+    assert reckoner.position_at(5.0).x.tolist() == [10.0, 5.0]
+
+
+def test_update_uses_receive_times():
+    reckoner = DeadReckoner()
+    reckoner.update(TimedActorPositions(
+        items=ships((0, 0.0, 0.0), (1, 0.0, 0.0)),
+        receive_times={0: 10.0, 1: 10.0},
+    ))
+    reckoner.update(TimedActorPositions(
+        items=ships((0, 10.0, 0.0), (1, 10.0, 0.0)),
+        receive_times={0: 11.0, 1: 12.0},
+    ))
+
+    assert reckoner.velocities[:, 0].tolist() == [10.0, 5.0]
+
+
+def test_update_keeps_velocity_of_too_close_observations():
+    reckoner = DeadReckoner(min_interval=0.1)
+    reckoner.update(ships((0, 0.0, 0.0)), received_at=10.0)
+    reckoner.update(ships((0, 10.0, 0.0)), received_at=11.0)
+    reckoner.update(ships((0, 50.0, 0.0)), received_at=11.01)
+
+    assert reckoner.velocities[:, 0].tolist() == [10.0]
+
+
+def test_update_forgets_absent_actors():
+    reckoner = DeadReckoner()
+    reckoner.update(ships((0, 0.0, 0.0), (1, 0.0, 0.0)), received_at=10.0)
+    reckoner.update(ships((1, 0.0, 0.0)), received_at=11.0)
+
+    assert reckoner.keys == ["1_Chief"]
+
+    # the actor is new again, so its velocity is unknown
+    reckoner.update(ships((1, 0.0, 0.0), (0, 100.0, 0.0)), received_at=12.0)
+    assert reckoner.velocities[:, 0].tolist() == [0.0, 0.0]
+
+    reckoner.reset()
+    assert len(reckoner) == 0
+    assert len(reckoner.position_at(0.0)) == 0
@@ -0,0 +1,172 @@
+# coding: utf-8
+
+import os
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+np = pytest.importorskip('numpy')
+
+from il2fb.ds.middleware.device_link import columns  # noqa: E402
+from il2fb.ds.middleware.device_link import parsers  # noqa: E402
+from il2fb.ds.middleware.device_link.constants import (  # noqa: E402
+    ActorCategories,
+)
+from il2fb.ds.middleware.device_link.exceptions import (  # noqa: E402
+    DeviceLinkError,
+)
+from il2fb.ds.middleware.device_link.recording import (  # noqa: E402
+    FILE_HEADER, FLAG_IS_ALIVE, FLAG_IS_HUMAN, NO_MEMBER_INDEX,
+    SnapshotReader, SnapshotRecorder,
+)
+
+
+AIRCRAFTS = ActorCategories.moving_aircrafts
+HOUSES = ActorCategories.houses
+
+
+def make_aircrafts(ids, offset=0.0):
+    return [
+        parsers.parse_moving_aircraft_record(
+            (i, f"{id};{10.0 * i + offset};20.5;1000.0")
+        )
+        for i, id in enumerate(ids)
+    ]
+
+
+def make_houses_columns():
+    return columns.make_houses_columns([
+        (0, "0_bld;1.5;2.5;A"),
+        (1, "1_bld;3.5;4.5;D"),
+    ])
+
+
+@pytest.fixture
+def path(tmpdir):
+    return str(tmpdir.join('snapshots.dls'))
+
+
+def test_round_trip(path):
+    with SnapshotRecorder(path) as recorder:
+        assert recorder.record(
+            AIRCRAFTS, make_aircrafts(['r0100', 'TheUser_0']), timestamp=1.0,
+        ) == 2
+        assert recorder.record(HOUSES, make_houses_columns(), 2.0) == 2
+        assert recorder.record(AIRCRAFTS, [], timestamp=3.0) == 0
+
+    with SnapshotReader(path) as reader:
+        assert len(reader) == 3
+        assert reader.timestamps.tolist() == [1.0, 2.0, 3.0]
+        assert reader.end == os.path.getsize(path)
+
+        aircrafts, houses = reader.query(end=2.0)
+
+        assert aircrafts.category == AIRCRAFTS
+        assert reader.get_ids(aircrafts.records) == ['r010', 'TheUser']
+        assert aircrafts.records['member_index'].tolist() == [
+            0, NO_MEMBER_INDEX,
+        ]
+        assert aircrafts.records['flags'].tolist() == [0, FLAG_IS_HUMAN]
+        assert aircrafts.records['x'].tolist() == [0.0, 10.0]
+        assert aircrafts.records['z'].tolist() == [1000.0, 1000.0]
+
+        assert houses.category == HOUSES
+        assert reader.get_ids(houses.records) == ['0_bld', '1_bld']
+        assert houses.records['flags'].tolist() == [FLAG_IS_ALIVE, 0]
+        assert houses.records['y'].tolist() == [2.5, 4.5]
+
+        assert len(reader.query(start=2.5)[0].records) == 0
+        assert len(reader.query(category=HOUSES)) == 1
+
+        del aircrafts, houses
+
+
+def test_reopen_appends(path):
+    with SnapshotRecorder(path) as recorder:
+        recorder.record(AIRCRAFTS, make_aircrafts(['r0100']), 1.0)
+
+    with SnapshotRecorder(path) as recorder:
+        recorder.record(AIRCRAFTS, make_aircrafts(['r0100', 'r0101']), 2.0)
+
+    with SnapshotReader(path) as reader:
+        assert len(reader) == 2
+        assert reader.ids == ['r010']
+
+        snapshot = reader.get_snapshot(1)
+        assert snapshot.records['id'].tolist() == [0, 0]
+        assert snapshot.records['member_index'].tolist() == [0, 1]
+        del snapshot
+
+
+def test_incomplete_trailing_chunk_is_dropped(path):
+    with SnapshotRecorder(path) as recorder:
+        recorder.record(AIRCRAFTS, make_aircrafts(['r0100']), 1.0)
+
+    complete_size = os.path.getsize(path)
+
+    with SnapshotRecorder(path) as recorder:
+        recorder.record(AIRCRAFTS, make_aircrafts(['r0200', 'r0300']), 2.0)
+
+    # simulate a crash in the middle of writing of the last chunk
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 4)
+
+    with SnapshotReader(path) as reader:
+        assert len(reader) == 1
+        assert reader.end == complete_size
+
+    with SnapshotRecorder(path) as recorder:
+        assert os.path.getsize(path) == complete_size
+        recorder.record(AIRCRAFTS, make_aircrafts(['r0400']), 3.0)
+
+    with SnapshotReader(path) as reader:
+        assert reader.timestamps.tolist() == [1.0, 3.0]
+
+        # IDs of the dropped chunk are not known
+        assert reader.ids == ['r010', 'r040']
+        assert reader.get_ids(reader.get_snapshot(1).records) == ['r040']
+
+
+def test_recorder_does_not_overwrite_foreign_files(path):
+    with open(path, 'wb') as f:
+        f.write(b'data')
+
+    with pytest.raises(DeviceLinkError):
+        SnapshotRecorder(path)
+
+    with open(path, 'rb') as f:
+        assert f.read() == b'data'
+
+
+def test_reader_closes_file_on_invalid_header(path, monkeypatch):
+    with open(path, 'wb') as f:
+        f.write(b'\0' * FILE_HEADER.size * 2)
+
+    closed = []
+    close = SnapshotReader.close
+
+    def recording_close(self):
+        closed.append(self)
+        close(self)
+
+    monkeypatch.setattr(SnapshotReader, 'close', recording_close)
+
+    with pytest.raises(DeviceLinkError):
+        SnapshotReader(path)
+
+    assert len(closed) == 1
+    assert closed[0]._file.closed
+
+
+def test_empty_file_is_not_a_recording(path):
+    open(path, 'wb').close()
+
+    with pytest.raises(DeviceLinkError):
+        SnapshotReader(path)
+
+    # empty files are overwritten
+    with SnapshotRecorder(path) as recorder:
+        recorder.record(AIRCRAFTS, [], 1.0)
+
+    with SnapshotReader(path) as reader:
+        assert len(reader) == 1
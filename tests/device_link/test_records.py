@@ -0,0 +1,77 @@
+# coding: utf-8
+
+import gc
+import tracemalloc
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.ds.middleware.device_link import parsers  # noqa: E402
+from il2fb.ds.middleware.device_link.constants import HouseStatuses  # noqa
+
+
+COUNT = 5000
+
+
+def make_aircraft_items(count):
+    return [
+        (i, f"r01{i:03d}{i % 4};{i * 10.5};{i * 20.25};{1000 + i}")
+        for i in range(count)
+    ]
+
+
+def make_house_items(count):
+    return [
+        (i, f"{i}_bld;{i * 10.5};{i * 20.25};{'AD'[i % 2]}")
+        for i in range(count)
+    ]
+
+
+def measure_peak(items, parser):
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        results = [parser(item) for item in items]
+        size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return results, peak
+
+
+@pytest.fixture(autouse=True)
+def warm_up():
+    # make sure lazily created objects do not affect measurements
+    HouseStatuses.get_by_value(HouseStatuses.alive.value)
+    parsers.parse_moving_aircraft_position(make_aircraft_items(1)[0])
+    parsers.parse_moving_aircraft_record(make_aircraft_items(1)[0])
+    parsers.parse_house_position(make_house_items(1)[0])
+    parsers.parse_house_record(make_house_items(1)[0])
+
+
+@pytest.mark.parametrize('make_items, structure_parser, record_parser', [
+    (
+        make_aircraft_items,
+        parsers.parse_moving_aircraft_position,
+        parsers.parse_moving_aircraft_record,
+    ),
+    (
+        make_house_items,
+        parsers.parse_house_position,
+        parsers.parse_house_record,
+    ),
+])
+def test_records_take_less_memory_than_structures(
+    make_items, structure_parser, record_parser,
+):
+    items = make_items(COUNT)
+
+    structures, structures_peak = measure_peak(items, structure_parser)
+    records, records_peak = measure_peak(items, record_parser)
+
+    assert [x.to_primitive() for x in records] == [
+        x.to_primitive() for x in structures
+    ]
+    assert records_peak < structures_peak
@@ -0,0 +1,124 @@
+# coding: utf-8
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.ds.middleware.capture import CapturedRecord  # noqa: E402
+from il2fb.ds.middleware.device_link.capture import (  # noqa: E402
+    DatagramCapture,
+)
+from il2fb.ds.middleware.device_link.client import (  # noqa: E402
+    DeviceLinkClient,
+)
+from il2fb.ds.middleware.device_link.constants import (  # noqa: E402
+    DatagramDirections,
+)
+from il2fb.ds.middleware.device_link.replay import (  # noqa: E402
+    DeviceLinkReplayServer,
+)
+
+
+class FakeServer(asyncio.DatagramProtocol):
+    """
+    Device Link which answers number of moving aircrafts.
+
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.transport.sendto(f"A/1003\\{self.count}".encode(), addr)
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def run(loop, aw, timeout=1.0):
+    return loop.run_until_complete(asyncio.wait_for(aw, timeout, loop=loop))
+
+
+def start_server(loop, protocol):
+    transport, protocol = loop.run_until_complete(
+        loop.create_datagram_endpoint(
+            lambda: protocol, local_addr=('127.0.0.1', 0),
+        )
+    )
+    return transport.get_extra_info('sockname')
+
+
+def connect(loop, address, **kwargs):
+    client = DeviceLinkClient(address, loop=loop, **kwargs)
+    loop.run_until_complete(loop.create_datagram_endpoint(
+        lambda: client, remote_addr=address,
+    ))
+    return client
+
+
+def stop(loop, client):
+    client.close()
+    run(loop, client.wait_closed())
+
+
+def test_replay_of_captured_session(loop, tmpdir):
+    path = str(tmpdir.join('session.dlc'))
+
+    server = FakeServer(5)
+    address = start_server(loop, server)
+
+    with DatagramCapture(path) as capture:
+        client = connect(loop, address, capture=capture)
+        counts = [run(loop, client.get_moving_aircrafts_count())]
+        server.count = 6
+        counts.append(run(loop, client.get_moving_aircrafts_count()))
+        stop(loop, client)
+
+    server.transport.close()
+    assert counts == [5, 6]
+
+    replay_server = DeviceLinkReplayServer(path, speed=None, loop=loop)
+    client = connect(loop, start_server(loop, replay_server))
+
+    # answers to repeated requests are replayed in order and start over
+    counts = [
+        run(loop, client.get_moving_aircrafts_count())
+        for i in range(3)
+    ]
+    assert counts == [5, 6, 5]
+
+    with pytest.raises(asyncio.TimeoutError):
+        run(loop, client.get_ships_count(timeout=0.1))
+
+    assert replay_server.requests_count == 4
+    assert replay_server.unknown_requests_count == 1
+
+    stop(loop, client)
+    replay_server.close()
+
+
+def test_replay_keeps_delays(loop):
+    capture = [
+        CapturedRecord(10.0, DatagramDirections.sent, b"R/1002"),
+        CapturedRecord(10.2, DatagramDirections.received, b"A/1003\\5"),
+    ]
+    replay_server = DeviceLinkReplayServer(capture, speed=2.0, loop=loop)
+    client = connect(loop, start_server(loop, replay_server))
+
+    started_at = time.monotonic()
+    assert run(loop, client.get_moving_aircrafts_count()) == 5
+    assert time.monotonic() - started_at >= 0.09
+
+    stop(loop, client)
+    replay_server.close()
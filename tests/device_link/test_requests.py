@@ -0,0 +1,365 @@
+# coding: utf-8
+
+import asyncio
+import concurrent.futures
+import pickle
+import time
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.ds.middleware.device_link import requests  # noqa: E402
+from il2fb.ds.middleware.device_link import structures  # noqa: E402
+from il2fb.ds.middleware.device_link.constants import (  # noqa: E402
+    PositionsFormats,
+)
+from il2fb.ds.middleware.device_link.helpers import (  # noqa: E402
+    decompose_data,
+)
+from il2fb.ds.middleware.device_link.rtt import RTTEstimator  # noqa: E402
+
+
+class FakeServer:
+    """
+    Writer of requests which answers positions of aircrafts. Only the first
+    ``answered_groups_count`` groups are answered if it is set.
+
+    """
+
+    def __init__(self, loop, answered_groups_count=None):
+        self.loop = loop
+        self.answered_groups_count = answered_groups_count
+        self.request = None
+        self.groups_count = 0
+
+    def __call__(self, data):
+        self.groups_count += 1
+
+        if (
+            self.answered_groups_count is not None
+            and self.groups_count > self.answered_groups_count
+        ):
+            return
+
+        answer = '/'.join(
+            f"1005\\{message.value}:r0100;{message.value};1.0;2.0"
+            for message in decompose_data(data)
+        )
+        self.loop.call_soon(
+            self.request.data_received, f"A/{answer}".encode(),
+        )
+
+    def execute(self, request, rtt_estimator=None):
+        self.request = request
+        self.loop.run_until_complete(
+            request.execute(self, rtt_estimator=rtt_estimator)
+        )
+        return request.result()
+
+
+class RecordingRTTEstimator(RTTEstimator):
+
+    def reset(self):
+        super().reset()
+        self.backoffs_count = 0
+
+    def backoff(self):
+        super().backoff()
+        self.backoffs_count += 1
+
+
+class PacingRTTEstimator(RTTEstimator):
+    """
+    Estimator which always asks for a fixed pause between groups.
+
+    """
+
+    def __init__(self, delay, **kwargs):
+        self.delay = delay
+        self.pacing_calls_count = 0
+        super().__init__(**kwargs)
+
+    def get_pacing_delay(self):
+        self.pacing_calls_count += 1
+        return self.delay
+
+
+class SlowExecutor(concurrent.futures.ThreadPoolExecutor):
+    """
+    Executor which delays every call.
+
+    """
+
+    def __init__(self, delay):
+        super().__init__(max_workers=1)
+        self.delay = delay
+        self.calls_count = 0
+
+    def submit(self, fn, *args, **kwargs):
+        self.calls_count += 1
+        return super().submit(self._call, fn, *args, **kwargs)
+
+    def _call(self, fn, *args, **kwargs):
+        time.sleep(self.delay)
+        return fn(*args, **kwargs)
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def make_request(loop, count, **kwargs):
+    return requests.GetMovingAircraftsPositionsRequest(
+        loop=loop,
+        indices=range(count),
+        **kwargs
+    )
+
+
+def test_complete_result(loop):
+    server = FakeServer(loop)
+    result = server.execute(make_request(loop, 100, timeout=1.0))
+
+    assert isinstance(result.result(), list)
+    assert [x.index for x in result.result()] == list(range(100))
+
+
+def test_timeout_without_partial_result(loop):
+    server = FakeServer(loop, answered_groups_count=1)
+    result = server.execute(make_request(loop, 100, timeout=0.05))
+
+    with pytest.raises((TimeoutError, asyncio.TimeoutError)):
+        result.result()
+
+
+def test_partial_result_of_complete_request(loop):
+    server = FakeServer(loop)
+    result = server.execute(
+        make_request(loop, 100, timeout=1.0, partial=True)
+    ).result()
+
+    assert isinstance(result, structures.PartialActorPositions)
+    assert result.complete
+    assert result.missing_indices == []
+    assert len(result.items) == 100
+
+
+def test_partial_result_of_timed_out_request(loop):
+    server = FakeServer(loop, answered_groups_count=1)
+    result = server.execute(
+        make_request(loop, 100, timeout=0.05, partial=True)
+    ).result()
+
+    assert isinstance(result, structures.PartialActorPositions)
+    assert not result.complete
+    assert [x.index for x in result.items] == list(range(40))
+    assert result.missing_indices == list(range(40, 100))
+
+
+def test_partial_timestamped_result(loop):
+    server = FakeServer(loop)
+    result = server.execute(make_request(
+        loop, 10, timeout=1.0, partial=True, timestamped=True,
+        result_format=PositionsFormats.records,
+    )).result()
+
+    assert result.complete
+    assert isinstance(result.items, structures.TimedActorPositions)
+    assert sorted(result.items.receive_times) == list(range(10))
+
+
+@pytest.mark.parametrize('partial', [False, True])
+def test_empty_result(partial):
+    result = requests.GetMovingAircraftsPositionsRequest.make_empty_result(
+        PositionsFormats.records, partial=partial,
+    )
+
+    if partial:
+        assert isinstance(result, structures.PartialActorPositions)
+        assert result.complete
+        assert result.items == []
+    else:
+        assert result == []
+
+
+def test_rtt_estimator_is_updated(loop):
+    server = FakeServer(loop)
+    estimator = RTTEstimator()
+    result = server.execute(make_request(loop, 100), rtt_estimator=estimator)
+
+    assert len(result.result()) == 100
+    assert estimator.srtt is not None
+    assert estimator.rto < estimator.initial_rto
+
+
+def test_rtt_estimator_backs_off_on_lost_group(loop):
+    server = FakeServer(loop, answered_groups_count=1)
+    estimator = RecordingRTTEstimator(initial_rto=0.05, min_rto=0.01)
+    result = server.execute(
+        make_request(loop, 100, partial=True),
+        rtt_estimator=estimator,
+    ).result()
+
+    assert estimator.srtt is not None
+    assert estimator.backoffs_count == 1
+    assert result.missing_indices == list(range(40, 100))
+    assert server.groups_count == 2
+
+
+def test_receive_times_of_groups(loop):
+    server = FakeServer(loop)
+    result = server.execute(make_request(
+        loop, 100, timeout=1.0, timestamped=True,
+        result_format=PositionsFormats.records,
+    )).result()
+
+    receive_times = result.receive_times
+    groups = [range(0, 40), range(40, 80), range(80, 100)]
+    times = [{receive_times[i] for i in group} for group in groups]
+
+    # items of a datagram share the time when the datagram was received
+    assert [len(x) for x in times] == [1, 1, 1]
+    assert times[0].pop() < times[1].pop() < times[2].pop()
+
+
+@pytest.mark.parametrize('result_format', [
+    PositionsFormats.structures,
+    PositionsFormats.records,
+])
+def test_extraction_in_executor(loop, result_format):
+    server = FakeServer(loop)
+    expected = server.execute(make_request(
+        loop, 100, result_format=result_format,
+    )).result()
+
+    with SlowExecutor(delay=0) as executor:
+        result = server.execute(make_request(
+            loop, 100, result_format=result_format, executor=executor,
+        )).result()
+
+    assert executor.calls_count == 1
+    assert result == expected
+
+
+def test_extraction_in_chunks(loop):
+    server = FakeServer(loop)
+    expected = server.execute(make_request(loop, 100)).result()
+    result = server.execute(make_request(
+        loop, 100, chunk_size=30, timestamped=True,
+    )).result()
+
+    assert result.items == expected
+    assert sorted(result.receive_times) == list(range(100))
+
+
+def test_extract_items_can_be_pickled():
+    extract_items = requests.GetMovingAircraftsPositionsRequest.extract_items
+    assert pickle.loads(pickle.dumps(extract_items)) == extract_items
+
+
+def test_slow_extraction_does_not_time_out(loop):
+    server = FakeServer(loop)
+
+    with SlowExecutor(delay=0.2) as executor:
+        result = server.execute(make_request(
+            loop, 100, timeout=0.1, executor=executor,
+        )).result()
+
+    assert len(result) == 100
+
+
+def test_slow_extraction_of_partial_result(loop):
+    server = FakeServer(loop, answered_groups_count=1)
+
+    with SlowExecutor(delay=0.2) as executor:
+        result = server.execute(make_request(
+            loop, 100, timeout=0.1, partial=True, executor=executor,
+        )).result()
+
+    assert len(result.items) == 40
+    assert result.missing_indices == list(range(40, 100))
+
+
+def test_groups_are_paced(loop):
+    server = FakeServer(loop)
+    estimator = PacingRTTEstimator(delay=0.05)
+
+    started_at = time.monotonic()
+    result = server.execute(make_request(loop, 100), rtt_estimator=estimator)
+    elapsed = time.monotonic() - started_at
+
+    assert len(result.result()) == 100
+    # there is no pause before the first group
+    assert estimator.pacing_calls_count == 2
+    assert elapsed >= 0.1
+
+
+def stream(loop, server, count, stop_after=None, rtt_estimator=None):
+    request = requests.StreamPositionsRequest(
+        positions_request_class=requests.GetMovingAircraftsPositionsRequest,
+        loop=loop,
+        indices=range(count),
+        timeout=1.0,
+    )
+    server.request = request
+
+    async def consume():
+        results = []
+        batches = request.iter_batches()
+
+        async for batch in batches:
+            results.append(([x.index for x in batch], server.groups_count))
+
+            if stop_after and len(results) == stop_after:
+                await batches.aclose()
+                break
+
+        return results
+
+    task = loop.create_task(request.execute(server, rtt_estimator))
+    results = loop.run_until_complete(consume())
+    loop.run_until_complete(task)
+    return request, results
+
+
+def test_stream_positions(loop):
+    server = FakeServer(loop)
+    request, results = stream(loop, server, 100)
+
+    assert [indices for indices, groups_count in results] == [
+        list(range(0, 40)), list(range(40, 80)), list(range(80, 100)),
+    ]
+    # next group is requested only after the previous batch is taken
+    assert [groups_count for indices, groups_count in results] == [1, 2, 3]
+    assert request.result().result() is None
+
+
+def test_stream_positions_stopped_by_consumer(loop):
+    server = FakeServer(loop)
+    request, results = stream(loop, server, 100, stop_after=1)
+
+    assert len(results) == 1
+    assert server.groups_count == 1
+    assert request.result().cancelled()
+
+
+def test_stream_positions_without_actors(loop):
+    server = FakeServer(loop)
+    request, results = stream(loop, server, 0)
+
+    assert results == []
+    assert server.groups_count == 0
+
+
+def test_stream_positions_do_not_estimate_rtt(loop):
+    server = FakeServer(loop)
+    estimator = PacingRTTEstimator(delay=0.05)
+    request, results = stream(loop, server, 100, rtt_estimator=estimator)
+
+    assert len(results) == 3
+    assert estimator.srtt is None
+    assert estimator.pacing_calls_count == 0
@@ -0,0 +1,93 @@
+# coding: utf-8
+
+import pytest
+
+from il2fb.ds.middleware.device_link.rtt import RTTEstimator
+
+
+def test_initial_state():
+    estimator = RTTEstimator(initial_rto=1.5)
+
+    assert estimator.srtt is None
+    assert estimator.rttvar is None
+    assert estimator.min_rtt is None
+    assert estimator.rto == 1.5
+    assert estimator.get_pacing_delay() == 0.0
+
+
+def test_first_sample():
+    estimator = RTTEstimator()
+    estimator.update(0.1)
+
+    assert estimator.srtt == 0.1
+    assert estimator.rttvar == 0.05
+    assert estimator.min_rtt == 0.1
+    assert estimator.rto == pytest.approx(0.3)
+
+
+def test_smoothing():
+    estimator = RTTEstimator(min_rto=0.0)
+    estimator.update(0.1)
+    estimator.update(0.2)
+
+    assert estimator.rttvar == pytest.approx(0.75 * 0.05 + 0.25 * 0.1)
+    assert estimator.srtt == pytest.approx(0.875 * 0.1 + 0.125 * 0.2)
+    assert estimator.min_rtt == 0.1
+    assert estimator.rto == pytest.approx(
+        estimator.srtt + 4 * estimator.rttvar
+    )
+
+
+def test_rto_is_clipped():
+    estimator = RTTEstimator(min_rto=0.2, max_rto=2.0)
+
+    estimator.update(0.001)
+    assert estimator.rto == 0.2
+
+    estimator.update(100.0)
+    assert estimator.rto == 2.0
+
+
+def test_backoff():
+    estimator = RTTEstimator(initial_rto=1.0, max_rto=5.0)
+
+    estimator.backoff()
+    assert estimator.rto == 2.0
+
+    estimator.backoff()
+    estimator.backoff()
+    assert estimator.rto == 5.0
+
+    # a new sample resets backoff
+    estimator.update(0.1)
+    assert estimator.rto == pytest.approx(0.3)
+
+
+def test_pacing_delay():
+    estimator = RTTEstimator(pacing_threshold=2.0, max_pacing_delay=0.5)
+    estimator.update(0.1)
+    assert estimator.get_pacing_delay() == 0.0
+
+    for i in range(10):
+        estimator.update(0.5)
+
+    assert estimator.srtt > 0.2
+    assert estimator.get_pacing_delay() == pytest.approx(
+        estimator.srtt - 0.1
+    )
+
+    for i in range(20):
+        estimator.update(5.0)
+
+    assert estimator.get_pacing_delay() == 0.5
+
+
+def test_reset():
+    estimator = RTTEstimator(initial_rto=1.0)
+    estimator.update(0.1)
+    estimator.backoff()
+    estimator.reset()
+
+    assert estimator.srtt is None
+    assert estimator.min_rtt is None
+    assert estimator.rto == 1.0
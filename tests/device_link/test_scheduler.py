@@ -0,0 +1,170 @@
+# coding: utf-8
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.ds.middleware.device_link import records  # noqa: E402
+from il2fb.ds.middleware.device_link.constants import (  # noqa: E402
+    ActorCategories, HouseStatuses,
+)
+from il2fb.ds.middleware.device_link.scheduler import (  # noqa: E402
+    AdaptivePollingScheduler, DEFAULT_POLLING_POLICIES, PollingPolicy,
+)
+
+
+AIRCRAFTS = ActorCategories.moving_aircrafts
+HOUSES = ActorCategories.houses
+
+
+class FakeClient:
+
+    def __init__(self):
+        self.snapshots = {}
+
+    async def refresh_radar(self):
+        pass
+
+    async def get_all_positions(self, category, **kwargs):
+        return list(self.snapshots[category])
+
+
+def make_aircrafts(count, offset=0.0):
+    return [
+        records.MovingAircraftRecord(
+            i, 'r0100', False, i, 100.0 * i + offset, 0.0, 1000.0,
+        )
+        for i in range(count)
+    ]
+
+
+def make_houses(count, dead_count=0):
+    return [
+        records.HouseRecord(
+            i, f"{i}_bld", 10.0 * i, 0.0,
+            HouseStatuses.dead if i < dead_count else HouseStatuses.alive,
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+def poll(loop, scheduler, category, items):
+    scheduler._client.snapshots[category] = items
+    loop.run_until_complete(scheduler._poll([category]))
+    return scheduler.get_periods()[category]
+
+
+def test_empty_policies_are_rejected(loop, client):
+    with pytest.raises(ValueError):
+        AdaptivePollingScheduler(client, policies={}, loop=loop)
+
+
+def test_default_policies_cover_all_categories(loop, client):
+    scheduler = AdaptivePollingScheduler(client, loop=loop)
+
+    assert set(scheduler.get_periods()) == set(
+        ActorCategories.iterconstants()
+    )
+    assert set(DEFAULT_POLLING_POLICIES) == set(
+        ActorCategories.iterconstants()
+    )
+
+
+def test_period_is_halved_on_activity(loop, client):
+    policy = PollingPolicy(period=4.0, min_period=1.0, max_period=16.0)
+    scheduler = AdaptivePollingScheduler(
+        client, policies={AIRCRAFTS: policy}, loop=loop,
+    )
+
+    # all actors have appeared
+    assert poll(loop, scheduler, AIRCRAFTS, make_aircrafts(10)) == 2.0
+    assert poll(loop, scheduler, AIRCRAFTS, make_aircrafts(10, 50)) == 1.0
+    assert poll(loop, scheduler, AIRCRAFTS, make_aircrafts(10, 100)) == 1.0
+
+
+def test_period_grows_without_activity(loop, client):
+    policy = PollingPolicy(period=4.0, min_period=1.0, max_period=3.0)
+    scheduler = AdaptivePollingScheduler(
+        client, policies={AIRCRAFTS: policy}, loop=loop,
+    )
+    items = make_aircrafts(10)
+
+    assert poll(loop, scheduler, AIRCRAFTS, items) == 2.0
+    assert poll(loop, scheduler, AIRCRAFTS, items) == 2.5
+    assert poll(loop, scheduler, AIRCRAFTS, items) == 3.0
+    assert poll(loop, scheduler, AIRCRAFTS, items) == 3.0
+
+
+def test_period_is_kept_on_low_activity(loop, client):
+    policy = PollingPolicy(
+        period=4.0, min_period=1.0, max_period=16.0,
+        activity_threshold=0.05,
+    )
+    scheduler = AdaptivePollingScheduler(
+        client, policies={AIRCRAFTS: policy}, loop=loop,
+    )
+    items = make_aircrafts(100)
+    poll(loop, scheduler, AIRCRAFTS, items)
+
+    items[0] = items[0]._replace(x=items[0].x + 50)
+
+    assert poll(loop, scheduler, AIRCRAFTS, items) == 2.0
+
+
+def test_house_status_changes_are_activity(loop, client):
+    scheduler = AdaptivePollingScheduler(
+        client, policies={HOUSES: DEFAULT_POLLING_POLICIES[HOUSES]}, loop=loop,
+    )
+
+    assert poll(loop, scheduler, HOUSES, make_houses(100)) == 15.0
+    assert poll(loop, scheduler, HOUSES, make_houses(100)) == 18.75
+    assert poll(loop, scheduler, HOUSES, make_houses(100, 1)) == 10.0
+
+    # destroyed houses are reported once
+    assert poll(loop, scheduler, HOUSES, make_houses(100, 1)) == 12.5
+
+
+def test_budget_stretches_periods(loop, client):
+    policy = PollingPolicy(period=1.0)
+    scheduler = AdaptivePollingScheduler(
+        client, policies={AIRCRAFTS: policy}, budget=1.5, loop=loop,
+    )
+
+    # a count request plus 2 groups of positions requests per second
+    assert poll(loop, scheduler, AIRCRAFTS, make_aircrafts(80)) == 2.0
+    assert scheduler.get_estimated_rate() == 1.5
+
+    state = scheduler._states[AIRCRAFTS]
+    assert state.period == 1.0
+    assert state.due_time == state.last_time + 2.0
+
+    # factor is recomputed from adaptive periods which stay unchanged
+    assert poll(loop, scheduler, AIRCRAFTS, make_aircrafts(80)) == 2.0
+    assert poll(loop, scheduler, AIRCRAFTS, make_aircrafts(30)) == (
+        pytest.approx(2 / 1.5)
+    )
+    assert scheduler.get_estimated_rate() == pytest.approx(1.5)
+
+
+def test_budget_does_not_shorten_periods(loop, client):
+    policy = PollingPolicy(period=1.0)
+    scheduler = AdaptivePollingScheduler(
+        client, policies={AIRCRAFTS: policy}, budget=100.0, loop=loop,
+    )
+
+    assert poll(loop, scheduler, AIRCRAFTS, make_aircrafts(80)) == 1.0
+    assert scheduler.get_estimated_rate() == 3.0
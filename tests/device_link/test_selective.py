@@ -0,0 +1,103 @@
+# coding: utf-8
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.ds.middleware.device_link import records  # noqa: E402
+from il2fb.ds.middleware.device_link.constants import (  # noqa: E402
+    ActorCategories,
+)
+from il2fb.ds.middleware.device_link.selective import (  # noqa: E402
+    SelectiveRefresher,
+)
+from il2fb.ds.middleware.device_link.structures import (  # noqa: E402
+    PartialActorPositions,
+)
+
+
+class FakeClient:
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.requested_indices = []
+
+    def get_items(self):
+        return [
+            records.ShipRecord(i, id, False, 10.0 * i, 0.0)
+            for i, id in enumerate(self.ids)
+        ]
+
+    async def get_all_positions(self, category, **kwargs):
+        return self.get_items()
+
+    async def get_positions(self, category, indices, **kwargs):
+        self.requested_indices.append(list(indices))
+        items = self.get_items()
+        answered = [items[i] for i in indices if i < len(items)]
+        missing = [i for i in indices if i >= len(items)]
+        return PartialActorPositions(items=answered, missing_indices=missing)
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_refresh_known_actors(loop):
+    client = FakeClient(['0_Chief', '1_Chief', '2_Chief'])
+    refresher = SelectiveRefresher(client, ActorCategories.ships)
+
+    result = loop.run_until_complete(refresher.refresh(['2_Chief']))
+    assert list(result) == ['2_Chief']
+    assert refresher.full_scans_count == 1
+
+    result = loop.run_until_complete(refresher.refresh(['2_Chief']))
+    assert result['2_Chief'].index == 2
+    assert refresher.full_scans_count == 1
+    assert client.requested_indices == [[2]]
+
+
+def test_refresh_after_index_shift(loop):
+    client = FakeClient(['0_Chief', '1_Chief', '2_Chief'])
+    refresher = SelectiveRefresher(client, ActorCategories.ships)
+    loop.run_until_complete(refresher.refresh_all())
+
+    client.ids = ['1_Chief', '2_Chief']
+
+    result = loop.run_until_complete(refresher.refresh(['2_Chief']))
+    assert result['2_Chief'].index == 1
+    assert refresher.full_scans_count == 2
+
+
+def test_gone_actors_do_not_cause_full_scans(loop):
+    client = FakeClient(['0_Chief', '1_Chief', '2_Chief'])
+    refresher = SelectiveRefresher(client, ActorCategories.ships)
+    loop.run_until_complete(refresher.refresh_all())
+
+    client.ids = ['0_Chief', '1_Chief']
+    keys = ['0_Chief', '2_Chief']
+
+    result = loop.run_until_complete(refresher.refresh(keys))
+    assert list(result) == ['0_Chief']
+    assert refresher.full_scans_count == 2
+
+    for i in range(3):
+        result = loop.run_until_complete(refresher.refresh(keys))
+        assert list(result) == ['0_Chief']
+
+    assert refresher.full_scans_count == 2
+
+    result = loop.run_until_complete(refresher.refresh(['2_Chief']))
+    assert result == {}
+    assert refresher.full_scans_count == 2
+
+    # unknown actors still cause a full scan
+    client.ids = ['0_Chief', '1_Chief', '3_Chief']
+    result = loop.run_until_complete(refresher.refresh(['3_Chief']))
+    assert list(result) == ['3_Chief']
+    assert refresher.full_scans_count == 3
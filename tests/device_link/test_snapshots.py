@@ -0,0 +1,123 @@
+# coding: utf-8
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.commons.spatial import Point2D  # noqa: E402
+
+from il2fb.ds.middleware.device_link import records  # noqa: E402
+from il2fb.ds.middleware.device_link import structures  # noqa: E402
+from il2fb.ds.middleware.device_link.constants import (  # noqa: E402
+    HouseStatuses,
+)
+from il2fb.ds.middleware.device_link.snapshots import (  # noqa: E402
+    SnapshotDiffer, diff_snapshots, get_actor_coordinates, get_actor_key,
+    index_snapshot,
+)
+
+
+def aircraft(index, id, member_index, x, y=0.0):
+    return records.MovingAircraftRecord(
+        index, id, False, member_index, x, y, 100.0,
+    )
+
+
+def house(index, id, status):
+    return records.HouseRecord(index, id, 0.0, 0.0, status)
+
+
+def test_get_actor_key():
+    assert get_actor_key(aircraft(7, "r0100", 1, 0.0)) == ("r0100", 1)
+    assert get_actor_key(
+        records.MovingAircraftRecord(0, "TheUser", True, None, 0, 0, 0)
+    ) == ("TheUser", None)
+    assert get_actor_key(records.ShipRecord(3, "0_Chief", False, 0, 0)) == (
+        "0_Chief"
+    )
+
+
+def test_get_actor_coordinates():
+    assert get_actor_coordinates(aircraft(0, "r0100", 0, 1.0, 2.0)) == (
+        1.0, 2.0, 100.0,
+    )
+    item = structures.HousePosition(
+        index=0, id="0_bld", pos=Point2D(3.0, 4.0), status=HouseStatuses.alive,
+    )
+    assert get_actor_coordinates(item) == (3.0, 4.0)
+
+
+def test_diff_snapshots_ignores_indices():
+    old = [aircraft(0, "r0100", 0, 0.0), aircraft(1, "r0100", 1, 0.0)]
+    new = [aircraft(0, "r0100", 1, 0.0), aircraft(1, "r0101", 0, 0.0)]
+
+    diff = diff_snapshots(old, new)
+
+    assert diff.added == [new[1]]
+    assert diff.removed == [old[0]]
+    assert diff.moved == []
+    assert diff.status_changed == []
+    assert diff
+
+
+def test_diff_snapshots_threshold():
+    old = [aircraft(0, "r0100", 0, 0.0), aircraft(1, "r0100", 1, 0.0)]
+    new = [aircraft(0, "r0100", 0, 3.0), aircraft(1, "r0100", 1, 10.0)]
+
+    assert diff_snapshots(old, new, threshold=5.0).moved == [new[1]]
+    assert diff_snapshots(old, new).moved == new
+    assert not diff_snapshots(index_snapshot(old), index_snapshot(old))
+
+
+def test_diff_snapshots_status_changed():
+    old = [
+        house(0, "0_bld", HouseStatuses.alive),
+        house(1, "1_bld", HouseStatuses.alive),
+    ]
+    new = [
+        house(0, "0_bld", HouseStatuses.dead),
+        house(1, "1_bld", HouseStatuses.alive),
+    ]
+
+    diff = diff_snapshots(old, new)
+
+    assert diff.status_changed == [new[0]]
+    assert diff.moved == []
+    assert diff
+
+
+def test_snapshot_differ_accumulates_displacement():
+    differ = SnapshotDiffer(threshold=5.0)
+
+    diff = differ.update([aircraft(0, "r0100", 0, 0.0)])
+    assert len(diff.added) == 1
+
+    for x in (2.0, 4.0):
+        diff = differ.update([aircraft(0, "r0100", 0, x)])
+        assert not diff
+
+    diff = differ.update([aircraft(0, "r0100", 0, 6.0)])
+    assert [item.x for item in diff.moved] == [6.0]
+
+    # displacement is measured from the last reported position
+    diff = differ.update([aircraft(0, "r0100", 0, 8.0)])
+    assert not diff
+    assert differ.last[("r0100", 0)].x == 8.0
+
+    diff = differ.update([])
+    assert [item.x for item in diff.removed] == [6.0]
+
+
+def test_snapshot_differ_reports_status_changes_once():
+    differ = SnapshotDiffer()
+    differ.update([house(0, "0_bld", HouseStatuses.alive)])
+
+    diff = differ.update([house(0, "0_bld", HouseStatuses.dead)])
+    assert len(diff.status_changed) == 1
+
+    diff = differ.update([house(0, "0_bld", HouseStatuses.dead)])
+    assert not diff
+
+    differ.reset()
+    assert differ.last == {}
+    assert len(differ.update([house(0, "0_bld", HouseStatuses.dead)]).added)
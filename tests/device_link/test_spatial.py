@@ -0,0 +1,148 @@
+# coding: utf-8
+
+import math
+import random
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.ds.middleware.device_link import records  # noqa: E402
+from il2fb.ds.middleware.device_link.spatial import GridIndex  # noqa: E402
+
+
+def make_ships(positions):
+    return [
+        records.ShipRecord(i, f"{i}_Chief", False, x, y)
+        for i, (x, y) in enumerate(positions)
+    ]
+
+
+@pytest.fixture
+def ships():
+    rng = random.Random(0)
+    return make_ships(
+        (rng.uniform(-5000, 5000), rng.uniform(-5000, 5000))
+        for i in range(500)
+    )
+
+
+@pytest.fixture
+def index(ships):
+    return GridIndex.from_snapshots(ships, cell_size=700)
+
+
+def get_indices(items):
+    return sorted(item.index for item in items)
+
+
+def test_cell_size_must_be_positive():
+    with pytest.raises(ValueError):
+        GridIndex(cell_size=0)
+
+
+def test_len_and_clear(index):
+    assert len(index) == 500
+
+    index.clear()
+
+    assert len(index) == 0
+    assert index.nearest(0, 0) == []
+    assert index.within_radius(0, 0, 1e6) == []
+
+
+def test_within_bbox(index, ships):
+    expected = [
+        item.index for item in ships
+        if -1000 <= item.x <= 2500 and 100 <= item.y <= 3000
+    ]
+    result = index.within_bbox(-1000, 100, 2500, 3000)
+
+    assert get_indices(result) == expected
+
+    # a box which covers much more cells than exist
+    assert len(index.within_bbox(-1e7, -1e7, 1e7, 1e7)) == 500
+
+
+def test_within_radius(index, ships):
+    expected = [
+        item.index for item in ships
+        if math.hypot(item.x - 300, item.y + 200) <= 1500
+    ]
+    result = index.within_radius(300, -200, 1500)
+
+    assert get_indices(result) == expected
+
+
+def test_within_radius_with_predicate(index, ships):
+    predicate = lambda item: item.index % 2 == 0  # noqa: E731
+    result = index.within_radius(0, 0, 3000, predicate=predicate)
+
+    assert result
+    assert all(item.index % 2 == 0 for item in result)
+
+
+@pytest.mark.parametrize('x, y', [
+    (0, 0),
+    (4999, -4999),
+    (123.4, 2345.6),
+])
+@pytest.mark.parametrize('k', [1, 5, 50])
+def test_nearest(index, ships, x, y, k):
+    expected = sorted(
+        (math.hypot(item.x - x, item.y - y), item.index)
+        for item in ships
+    )[:k]
+    result = index.nearest(x, y, k=k)
+
+    assert [item.index for distance, item in result] == [
+        i for distance, i in expected
+    ]
+    assert [distance for distance, item in result] == pytest.approx([
+        distance for distance, i in expected
+    ])
+
+
+def test_nearest_with_max_distance(index, ships):
+    result = index.nearest(0, 0, k=1000, max_distance=800)
+    expected = [
+        item.index for item in ships
+        if math.hypot(item.x, item.y) <= 800
+    ]
+
+    assert get_indices(item for distance, item in result) == expected
+    assert index.nearest(1e6, 1e6, max_distance=10) == []
+
+
+def test_nearest_out_of_bounds(index, ships, monkeypatch):
+    cells_count = [0]
+    iter_ring = GridIndex._iter_ring
+
+    def counting_iter_ring(*args):
+        for cell in iter_ring(*args):
+            cells_count[0] += 1
+            yield cell
+
+    monkeypatch.setattr(
+        GridIndex, '_iter_ring', staticmethod(counting_iter_ring),
+    )
+
+    x, y = 1e9, -1e9
+    expected = min(ships, key=lambda item: math.hypot(item.x - x, item.y - y))
+    result = index.nearest(x, y)
+
+    assert result[0][1] is expected
+
+    # rings do not overlap and only cells of the grid (16 x 16) are visited
+    assert 0 < cells_count[0] <= 16 * 16
+
+
+def test_nearest_in_empty_index():
+    index = GridIndex()
+
+    assert index.nearest(0, 0) == []
+    assert index.within_bbox(-1, -1, 1, 1) == []
+
+
+def test_nearest_with_non_positive_k(index):
+    assert index.nearest(0, 0, k=0) == []
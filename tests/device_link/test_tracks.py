@@ -0,0 +1,123 @@
+# coding: utf-8
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+np = pytest.importorskip('numpy')
+
+from il2fb.ds.middleware.device_link import records  # noqa: E402
+from il2fb.ds.middleware.device_link.structures import (  # noqa: E402
+    TimedActorPositions,
+)
+from il2fb.ds.middleware.device_link.tracks import (  # noqa: E402
+    RING_BUFFER_INITIAL_SIZE, TrackStore,
+)
+
+
+def push(store, key, times):
+    for t in times:
+        store.add_sample(key, (t, t * 10, 0.0, 0.0))
+
+
+def get_times(store, key, **kwargs):
+    return store.get_track(key, **kwargs)[:, 0].tolist()
+
+
+def test_append_snapshots():
+    store = TrackStore()
+    store.append(
+        [records.ShipRecord(0, "0_Chief", False, 1.0, 2.0)],
+        received_at=10.0,
+    )
+    store.append(TimedActorPositions(
+        items=[records.MovingGroundUnitRecord(5, "1_Chief", 0, 1, 2, 3)],
+        receive_times={5: 11.0},
+    ))
+
+    assert store.keys == ["0_Chief", ("1_Chief", 0)]
+    assert "0_Chief" in store
+    assert store.get_track("0_Chief").tolist() == [[10.0, 1.0, 2.0, 0.0]]
+    assert store.get_track(("1_Chief", 0)).tolist() == [[11, 1, 2, 3]]
+    assert store.get_track("unknown").shape == (0, 4)
+
+
+def test_ring_buffer_drops_oldest_samples():
+    store = TrackStore(capacity=20)
+    push(store, "a", range(50))
+
+    assert get_times(store, "a") == list(range(30, 50))
+    assert get_times(store, "a", start=35, end=40) == list(range(35, 41))
+
+
+def test_buffers_are_allocated_lazily_and_grow():
+    store = TrackStore(capacity=20)
+    store.add_sample("a", (0.0, 0.0, 0.0, 0.0))
+
+    assert store.get_memory_size() == RING_BUFFER_INITIAL_SIZE * 4 * 8
+
+    push(store, "a", range(1, 12))
+    assert store.get_memory_size() == 16 * 4 * 8
+    assert get_times(store, "a") == list(range(12))
+
+    push(store, "a", range(12, 25))
+    assert store.get_memory_size() == 20 * 4 * 8
+    assert get_times(store, "a") == list(range(5, 25))
+
+
+def test_decimation_of_overflowing_samples():
+    store = TrackStore(capacity=10, decimation=3, archive_capacity=100)
+    push(store, "a", range(30))
+
+    # the oldest samples which did not fit are decimated
+    assert get_times(store, "a") == list(range(0, 19, 3)) + list(range(20, 30))
+
+
+def test_decimation_by_age():
+    store = TrackStore(capacity=100, decimation=2, decimation_age=5.0)
+    push(store, "a", range(20))
+
+    assert get_times(store, "a") == list(range(0, 14, 2)) + list(range(14, 20))
+
+
+def test_archive_is_created_on_first_demotion():
+    store = TrackStore(capacity=10, decimation=2, decimation_age=100.0)
+    push(store, "a", range(5))
+
+    assert store.get_memory_size() == RING_BUFFER_INITIAL_SIZE * 4 * 8
+
+    push(store, "a", [200.0])
+
+    assert store.get_memory_size() == RING_BUFFER_INITIAL_SIZE * 4 * 8 * 2
+    assert get_times(store, "a") == [0.0, 2.0, 4.0, 200.0]
+
+
+def test_export():
+    store = TrackStore()
+    push(store, "a", [1.0, 2.0, 3.0])
+    push(store, "b", [2.5])
+    push(store, "c", [10.0])
+
+    keys, codes, samples = store.export(start=2.0, end=5.0)
+
+    assert keys == ["a", "b"]
+    assert codes.tolist() == [0, 0, 1]
+    assert samples[:, 0].tolist() == [2.0, 3.0, 2.5]
+
+    keys, codes, samples = store.export(start=100.0)
+    assert keys == []
+    assert samples.shape == (0, 4)
+
+    store.remove("c")
+    assert list(store.export_tracks()) == ["a", "b"]
+
+    store.clear()
+    assert len(store) == 0
+
+
+@pytest.mark.parametrize('kwargs', [
+    dict(capacity=0),
+    dict(decimation=0),
+])
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        TrackStore(**kwargs)
@@ -0,0 +1,43 @@
+# coding: utf-8
+
+import os
+import runpy
+import sys
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+
+PROFILING_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'profiling',
+)
+
+
+def run_script(monkeypatch, name, *args):
+    path = os.path.join(PROFILING_DIR, name)
+    monkeypatch.setattr(sys, 'argv', [path, *args])
+    runpy.run_path(path, run_name='__main__')
+
+
+def test_device_link_positions(monkeypatch, capsys):
+    run_script(
+        monkeypatch, 'device_link_positions.py', '--count', '100',
+        '--repeat', '1',
+    )
+    output = capsys.readouterr().out
+
+    assert "moving aircrafts (100 actors, 3 datagrams):" in output
+    assert "moving aircrafts with escaped IDs" in output
+    assert "houses (100 actors, 3 datagrams):" in output
+    assert "scanner" in output
+
+
+def test_device_link_records_memory(monkeypatch, capsys):
+    run_script(monkeypatch, 'device_link_records_memory.py', '--count', '100')
+    output = capsys.readouterr().out
+
+    assert "moving aircrafts (100 actors):" in output
+    assert "houses (100 actors):" in output
+    assert "records" in output
@@ -0,0 +1,188 @@
+# coding: utf-8
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('il2fb.commons')
+
+from il2fb.ds.middleware.console import events  # noqa: E402
+from il2fb.ds.middleware.console.structures import Human  # noqa: E402
+from il2fb.ds.middleware.device_link import records  # noqa: E402
+from il2fb.ds.middleware.session import Session  # noqa: E402
+
+
+class FakeConsoleClient:
+
+    def __init__(self, humans=()):
+        self.humans = list(humans)
+        self.subscribers = []
+        self.is_closed = False
+
+    def subscribe_to_human_connection_events(self, cb):
+        self.subscribers.append(cb)
+
+    def unsubscribe_from_human_connection_events(self, cb):
+        self.subscribers.remove(cb)
+
+    def emit(self, s):
+        for event_class in (
+            events.HumanHasConnected,
+            events.HumanHasDisconnected,
+        ):
+            event = event_class.from_s(s)
+            if event:
+                break
+
+        for cb in self.subscribers:
+            cb(event)
+
+    async def get_humans_list(self, timeout=None):
+        return self.humans
+
+    def close(self):
+        self.is_closed = True
+
+    async def wait_closed(self):
+        pass
+
+
+class FakeDeviceLinkClient:
+
+    def __init__(self, items=()):
+        self.items = list(items)
+        self.caches_cleared_count = 0
+        self.is_closed = False
+
+    async def get_all_moving_aircrafts_positions(self, **kwargs):
+        return self.items
+
+    def clear_caches(self):
+        self.caches_cleared_count += 1
+
+    def close(self):
+        self.is_closed = True
+
+    async def wait_closed(self):
+        pass
+
+
+def connect(channel, callsign):
+    return (
+        f"socket channel '{channel}', ip 127.0.0.1:1234, {callsign}, "
+        f"is complete created"
+    )
+
+
+def disconnect(channel):
+    return (
+        f"socketConnection with 127.0.0.1:1234 on channel {channel} lost.  "
+        f"Reason: "
+    )
+
+
+def human(callsign):
+    return Human(
+        callsign=callsign, ping=0, score=0, belligerent=None, aircraft=None,
+    )
+
+
+def aircraft(index, id, is_human=True):
+    return records.MovingAircraftRecord(
+        index, id, is_human, None if is_human else 0, 1.0, 2.0, 3.0,
+    )
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def make_session(loop, humans=(), items=()):
+    return Session(
+        console_client=FakeConsoleClient(humans),
+        device_link_client=FakeDeviceLinkClient(items),
+        loop=loop,
+    )
+
+
+def test_connection_events(loop):
+    session = make_session(loop)
+
+    session.console.emit(connect(3, "john.doe"))
+    assert "john.doe" in session
+    assert session.get("john.doe").channel == 3
+
+    session.console.emit(disconnect(5))
+    assert len(session) == 1
+
+    session.console.emit(disconnect(3))
+    assert len(session) == 0
+
+
+def test_update_humans(loop):
+    session = make_session(loop, humans=[human("john.doe"), human("foo")])
+    session.console.emit(connect(3, "bar"))
+
+    loop.run_until_complete(session.refresh_humans())
+
+    assert sorted(x.callsign for x in session.get_humans()) == [
+        "foo", "john.doe",
+    ]
+    assert session.get("foo").human.callsign == "foo"
+
+    # the channel of a removed human is forgotten as well
+    session.console.emit(connect(3, "baz"))
+    session.console.emit(disconnect(3))
+    assert len(session) == 2
+
+
+def test_update_positions(loop):
+    session = make_session(loop, humans=[human("john.doe"), human("foo")])
+    loop.run_until_complete(session.refresh_humans())
+
+    session.device_link.items = [
+        aircraft(0, "r0100", is_human=False),
+        aircraft(1, "john.doe"),
+        aircraft(2, "bar"),
+    ]
+    loop.run_until_complete(session.refresh_positions())
+
+    assert session.get_index("john.doe") == 1
+    assert session.get_position("john.doe").index == 1
+    assert session.get_index("foo") is None
+    assert session.get_index("r0100") is None
+    assert sorted(x.callsign for x in session.get_flying_humans()) == [
+        "bar", "john.doe",
+    ]
+
+    session.update_positions([aircraft(4, "bar")])
+
+    assert session.get_index("john.doe") is None
+    assert session.get_position("john.doe") is None
+    assert session.get_index("bar") == 4
+
+
+def test_clear(loop):
+    session = make_session(loop, humans=[human("john.doe")])
+    loop.run_until_complete(session.refresh_humans())
+    session.update_positions([aircraft(1, "john.doe")])
+
+    session.clear()
+
+    assert "john.doe" in session
+    assert session.get_index("john.doe") is None
+    assert session.get_flying_humans() == []
+    assert session.device_link.caches_cleared_count == 1
+
+
+def test_close(loop):
+    session = make_session(loop)
+    session.close()
+    loop.run_until_complete(session.wait_closed())
+
+    assert session.console.subscribers == []
+    assert session.console.is_closed
+    assert session.device_link.is_closed